@@ -0,0 +1,194 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import io
+import os
+import shutil
+from typing import BinaryIO, Optional
+import zlib
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from file import atomic_write
+
+# The fixed timestamp assigned to every archive entry, the earliest date supported by the zip format
+ARCHIVE_ENTRY_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+# The fixed permissions assigned to the archive file and directory entries
+ARCHIVE_FILE_MODE = 0o644
+ARCHIVE_DIRECTORY_MODE = 0o755
+
+# The zip "version made by" system value for UNIX, used for every entry so the archive does not depend on the host platform
+ARCHIVE_CREATE_SYSTEM = 3
+
+# The MS-DOS directory attribute flag
+ARCHIVE_DIRECTORY_ATTRIBUTE = 0x10
+
+# The extensions of the already compressed formats which are stored in the archive without compression
+ARCHIVE_STORED_EXTENSIONS = frozenset([ '.jar', '.zip', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ogg', '.mp3', '.gz', '.xz', '.bz2', '.7z' ])
+
+# The prefix of the builder internal files (manifest, temporary files) which are not packed into the archive
+ARCHIVE_EXCLUDED_FILE_PREFIX = '.bonclok-'
+
+# The size of the chunks in which the files are read while being compressed
+ARCHIVE_READ_CHUNK_SIZE = 1024 * 1024
+
+# Class that is representing a single file or directory packed into the archive
+class ArchiveEntry():
+    def __init__(self, archiveName: str, filePath: str, isDirectory: bool):
+        self.archiveName = archiveName
+        self.filePath = filePath
+        self.isDirectory = isDirectory
+
+    # Check if the entry content should be compressed
+    def is_compressed(self) -> bool:
+        if self.isDirectory:
+            return False
+
+        return os.path.splitext(self.archiveName)[1].lower() not in ARCHIVE_STORED_EXTENSIONS
+
+# Class used to store the content of an entry compressed ahead of writing it to the archive
+class CompressedArchiveEntry():
+    def __init__(self, content: bytes, crc: int, size: int):
+        self.content = content
+        self.crc = crc
+        self.size = size
+
+# Helper function used to list the build directory entries sorted by their archive name, the archive names are relative to the build directory
+def collect_archive_entries(buildDirectoryPath: str) -> list[ArchiveEntry]:
+    entries = []
+    for dirName, directories, files in os.walk(buildDirectoryPath):
+        relativeDirName = os.path.relpath(dirName, buildDirectoryPath)
+        for directoryName in directories:
+            archiveName = os.path.normpath(os.path.join(relativeDirName, directoryName)).replace(os.sep, '/') + '/'
+            entries.append(ArchiveEntry(archiveName, os.path.join(dirName, directoryName), True))
+
+        for fileName in files:
+            if fileName.startswith(ARCHIVE_EXCLUDED_FILE_PREFIX):
+                continue
+
+            archiveName = os.path.normpath(os.path.join(relativeDirName, fileName)).replace(os.sep, '/')
+            entries.append(ArchiveEntry(archiveName, os.path.join(dirName, fileName), False))
+
+    return sorted(entries, key=lambda entry: entry.archiveName)
+
+# Helper function used to create the zip entry header with fixed metadata, so the archive content only depends on the entry names and file content
+def create_archive_entry_info(entry: ArchiveEntry) -> ZipInfo:
+    entryInfo = ZipInfo(entry.archiveName, date_time=ARCHIVE_ENTRY_TIMESTAMP)
+    entryInfo.create_system = ARCHIVE_CREATE_SYSTEM
+
+    if entry.isDirectory:
+        entryInfo.compress_type = ZIP_STORED
+        entryInfo.external_attr = (0o40000 | ARCHIVE_DIRECTORY_MODE) << 16 | ARCHIVE_DIRECTORY_ATTRIBUTE
+    else:
+        entryInfo.compress_type = ZIP_DEFLATED if entry.is_compressed() else ZIP_STORED
+        entryInfo.external_attr = (0o100000 | ARCHIVE_FILE_MODE) << 16
+
+    return entryInfo
+
+# Compress the content read from the file object into a raw deflate stream with the same settings the ZipFile uses, so the archive content does not depend on where the entry was compressed
+def compress_archive_stream(sourceFile: BinaryIO) -> CompressedArchiveEntry:
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressedChunks = []
+    crc = 0
+    size = 0
+    while True:
+        chunk = sourceFile.read(ARCHIVE_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        compressedChunks.append(compressor.compress(chunk))
+
+    compressedChunks.append(compressor.flush())
+    return CompressedArchiveEntry(b''.join(compressedChunks), crc, size)
+
+# Compress the file content into a raw deflate stream, the function is executed by the worker threads (zlib releases the GIL while compressing)
+def compress_archive_entry(filePath: str) -> CompressedArchiveEntry:
+    with open(filePath, 'rb') as sourceFile:
+        return compress_archive_stream(sourceFile)
+
+# Write an entry which content was already compressed by a worker thread
+def write_compressed_archive_entry(zipArchive: ZipFile, entryInfo: ZipInfo, compressedEntry: CompressedArchiveEntry) -> None:
+    entryInfo.file_size = compressedEntry.size
+    entryInfo.compress_size = len(compressedEntry.content)
+    entryInfo.CRC = compressedEntry.crc
+
+    # NOTE: The ZipFile API can not accept precompressed content, so the local header and data are written the same way as ZipFile.writestr does internally.
+    # These are private details of the standard library, the entries are only written this way if the PRECOMPRESSED_ENTRIES_SUPPORTED check succeeded.
+    zipArchive.fp.seek(zipArchive.start_dir)
+    entryInfo.header_offset = zipArchive.fp.tell()
+    zipArchive._writecheck(entryInfo)
+    zipArchive._didModify = True
+    zipArchive.fp.write(entryInfo.FileHeader())
+    zipArchive.fp.write(compressedEntry.content)
+    zipArchive.filelist.append(entryInfo)
+    zipArchive.NameToInfo[entryInfo.filename] = entryInfo
+    zipArchive.start_dir = zipArchive.fp.tell()
+
+# Write an entry streamed from the file through the public ZipFile API, the content is compressed by the ZipFile if the entry is compressed
+def write_streamed_archive_entry(zipArchive: ZipFile, entryInfo: ZipInfo, filePath: str) -> None:
+    entryInfo.file_size = os.path.getsize(filePath)
+    with open(filePath, 'rb') as sourceFile, zipArchive.open(entryInfo, 'w') as entryFile:
+        shutil.copyfileobj(sourceFile, entryFile, ARCHIVE_READ_CHUNK_SIZE)
+
+# Check if the ZipFile internals used to write the precompressed entries are present and produce a valid archive, a small archive is written and read back in memory.
+# The internals are not a public API of the standard library, so the entries are compressed serially through the public API if they changed.
+def is_precompressed_writing_supported() -> bool:
+    content = b'bonclok archive check\n' * 64
+    archiveBuffer = io.BytesIO()
+    try:
+        with ZipFile(archiveBuffer, 'w', ZIP_DEFLATED) as zipArchive:
+            if not all(hasattr(zipArchive, name) for name in ('fp', 'start_dir', 'filelist', 'NameToInfo', '_writecheck', '_didModify')):
+                return False
+
+            entryInfo = create_archive_entry_info(ArchiveEntry('check.txt', None, False))
+            write_compressed_archive_entry(zipArchive, entryInfo, compress_archive_stream(io.BytesIO(content)))
+            zipArchive.writestr(create_archive_entry_info(ArchiveEntry('next.txt', None, False)), content)
+
+        with ZipFile(archiveBuffer, 'r') as zipArchive:
+            return zipArchive.testzip() == None and zipArchive.namelist() == [ 'check.txt', 'next.txt' ] and zipArchive.read('check.txt') == content
+    except Exception:
+        return False
+
+# The result of the check of the ZipFile internals, performed once when the module is imported
+PRECOMPRESSED_ENTRIES_SUPPORTED = is_precompressed_writing_supported()
+
+# Helper function used to create a reproducible .zip archive out of a specified directory. The entries are sorted, have fixed timestamps and paths relative to the build directory,
+# the already compressed formats are stored and the remaining files are compressed in parallel by the specified number of worker threads
+def put_directory_into_archive(buildDirectoryPath: str, zipFileName: str, jobs: Optional[int] = None) -> None:
+    put_entries_into_archive(collect_archive_entries(buildDirectoryPath), zipFileName, jobs)
+
+# Helper function used to create a .zip archive out of the specified entries written in the given order with fixed metadata, the archive is written to a temporary file and renamed, so a partial archive never appears under the target path
+def put_entries_into_archive(entries: list[ArchiveEntry], zipFileName: str, jobs: Optional[int] = None) -> None:
+    workersCount = jobs if jobs != None else (os.cpu_count() or 1)
+
+    with atomic_write(zipFileName, 'w+b', ARCHIVE_EXCLUDED_FILE_PREFIX, '.zip') as archiveFile:
+        with ThreadPoolExecutor(max_workers=workersCount) as executor, ZipFile(archiveFile, 'w', ZIP_DEFLATED) as zipArchive:
+            # NOTE: The compression is scheduled a limited number of entries ahead, so the memory use is bound while the entries are still written in the sorted order
+            pendingEntries: deque[tuple[ArchiveEntry, Optional[Future]]] = deque()
+            entryIterator = iter(entries)
+
+            def schedule_next_entry() -> None:
+                entry = next(entryIterator, None)
+                if entry == None:
+                    return
+
+                future = executor.submit(compress_archive_entry, entry.filePath) if entry.is_compressed() and PRECOMPRESSED_ENTRIES_SUPPORTED else None
+                pendingEntries.append((entry, future))
+
+            for _ in range(workersCount * 2):
+                schedule_next_entry()
+
+            while len(pendingEntries) > 0:
+                entry, future = pendingEntries.popleft()
+                schedule_next_entry()
+
+                entryInfo = create_archive_entry_info(entry)
+                if entry.isDirectory:
+                    zipArchive.writestr(entryInfo, b'')
+                elif future != None:
+                    write_compressed_archive_entry(zipArchive, entryInfo, future.result())
+                else:
+                    write_streamed_archive_entry(zipArchive, entryInfo, entry.filePath)
+
+__all__ = [ 'ArchiveEntry', 'collect_archive_entries', 'put_directory_into_archive', 'put_entries_into_archive' ]
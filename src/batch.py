@@ -0,0 +1,219 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import time
+from typing import Optional
+
+from logger import Logger
+from file import atomic_write
+from builder import FetchOutcome, ModpackBuilder, ModpackBuilderException, ModpackBuilderOptions, get_build_directory
+from instrumentation import BuildTrace
+from models import ModpackTarget
+from registry import ResourceRegistry
+from scheduler import BandwidthLimiter, HostLimiter
+
+# The default number of modpacks built concurrently
+DEFAULT_BATCH_JOBS = 4
+
+# Exception base class implementation used to raise batch build related exceptions
+class BatchBuilderException(Exception):
+    def __init__(self, message: str = "Unexpected batch build failure."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Class used to store the result of a single modpack built in the batch
+class BatchPackResult():
+    def __init__(self, modpackFilePath: str):
+        self.modpackFilePath = modpackFilePath
+        self.name: Optional[str] = None
+        self.succeeded = False
+        self.errorMessage: Optional[str] = None
+        self.duration = 0.0
+        self.downloadedCount = 0
+        self.downloadedBytes = 0
+        self.linkedCount = 0
+        self.cachedCount = 0
+
+    # Collect the statistics of the fetched resources from the builder trace, only the downloads which passed the verification and were moved into place are counted
+    def collect_statistics(self, trace: BuildTrace) -> None:
+        with trace.eventsLock:
+            events = list(trace.events)
+
+        for event in events:
+            if event.phase != 'fetch':
+                continue
+
+            outcome = event.attributes.get('outcome')
+            if outcome == FetchOutcome.DOWNLOADED.value:
+                self.downloadedCount += 1
+                self.downloadedBytes += event.bytes
+            elif outcome == FetchOutcome.LINKED.value:
+                self.linkedCount += 1
+            elif outcome == FetchOutcome.CACHED.value:
+                self.cachedCount += 1
+
+    # Convert the result to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        return {
+            'modpackFilePath': self.modpackFilePath,
+            'name': self.name,
+            'succeeded': self.succeeded,
+            'error': self.errorMessage,
+            'duration': self.duration,
+            'downloadedCount': self.downloadedCount,
+            'downloadedBytes': self.downloadedBytes,
+            'linkedCount': self.linkedCount,
+            'cachedCount': self.cachedCount,
+        }
+
+# Class used to build many modpacks in a single run, the modpacks are built in parallel and share the fetched resources, so a resource required by many modpacks is downloaded only once
+class BatchBuilder():
+    def __init__(self, modpackFilePaths: list[str], options: ModpackBuilderOptions, logger: Logger, jobs: int = DEFAULT_BATCH_JOBS):
+        if logger == None:
+            raise BatchBuilderException("The provided logger instance is not initialzied.")
+
+        self.logger = logger
+
+        if modpackFilePaths == None or len(modpackFilePaths) == 0:
+            raise BatchBuilderException("No modpack files provided.")
+
+        if jobs < 1:
+            raise BatchBuilderException("The number of concurrently built modpacks must be greater than zero.")
+
+        self.options = options
+        self.jobs = jobs
+        self.resourceRegistry = ResourceRegistry()
+
+        # NOTE: The connection and bandwidth limits apply to the whole run, so building many modpacks in parallel does not multiply them
+        self.hostLimiter = HostLimiter(options.maxHostConnections)
+        self.bandwidthLimiter = None
+        if options.bandwidthLimitMb != None:
+            if options.bandwidthLimitMb <= 0:
+                raise BatchBuilderException("The bandwidth limit must be greater than zero.")
+
+            self.bandwidthLimiter = BandwidthLimiter(options.bandwidthLimitMb * 1024 * 1024)
+        self.trace = BuildTrace()
+        self.results: list[BatchPackResult] = []
+        self.elapsedTime = 0.0
+        self.builders: list[tuple[BatchPackResult, ModpackBuilder]] = []
+
+        buildDirectories = {}
+        for modpackFilePath in modpackFilePaths:
+            result = BatchPackResult(modpackFilePath)
+            self.results.append(result)
+
+            try:
+                builder = ModpackBuilder(modpackFilePath, options, logger, self.resourceRegistry, self.hostLimiter, self.bandwidthLimiter)
+            except (ModpackBuilderException, OSError, ValueError) as exception:
+                self.logger.log_failure("Parsing of the modpack file: {} failed: {}.".format(modpackFilePath, exception))
+                result.errorMessage = str(exception)
+                continue
+
+            result.name = builder.modpackData.name.strip()
+
+            # NOTE: The build directory is derived from the modpack name and version, two modpack files producing the same build directory can not be built in the same run
+            buildDirectory = get_build_directory(builder.modpackData.name, builder.modpackData.version, ModpackTarget.CLIENT)
+            if buildDirectory in buildDirectories:
+                self.logger.log_failure("The modpack file: {} has the same name and version as: {}.".format(modpackFilePath, buildDirectories[buildDirectory]))
+                result.errorMessage = "The modpack name and version are not unique."
+                continue
+
+            buildDirectories[buildDirectory] = modpackFilePath
+            self.builders.append((result, builder))
+
+    # Get the number of the resource references of all modpacks and the number of the unique resources
+    def get_resource_statistics(self) -> tuple[int, int]:
+        referenceCount = 0
+        uniqueResources = set()
+        for _, builder in self.builders:
+            resources = [ builder.modpackData.api ]
+            resources.extend(mod for mod in builder.modpackData.mods if (ModpackTarget.CLIENT in builder.buildTargets and mod.includeClient) or (ModpackTarget.SERVER in builder.buildTargets and mod.includeServer))
+
+            referenceCount += len(resources)
+            uniqueResources.update(builder.get_resource_key(resource.resourceUrl, resource.checksum) for resource in resources)
+
+        return referenceCount, len(uniqueResources)
+
+    # Build all parsed modpacks, the return Boolean value is indicating if all modpacks were built
+    def build(self) -> bool:
+        referenceCount, uniqueCount = self.get_resource_statistics()
+        self.logger.log_success("Batch build of: {} modpacks started, {} resource references of {} unique resources.".format(len(self.builders), referenceCount, uniqueCount))
+
+        startTime = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for future in [ executor.submit(self._build_modpack, result, builder) for result, builder in self.builders ]:
+                future.result()
+        self.elapsedTime = time.monotonic() - startTime
+
+        for result, builder in self.builders:
+            self.trace.extend(builder.trace, modpack=result.name)
+
+        for line in self.format_report():
+            self.logger.log_info(line)
+
+        return all(result.succeeded for result in self.results)
+
+    # Verify the existing builds of all parsed modpacks, the return Boolean value is indicating if all builds are matching their modpacks
+    def verify(self, jobs: Optional[int] = None) -> bool:
+        buildsValid = all(result.errorMessage == None for result in self.results)
+        for _, builder in self.builders:
+            try:
+                if not builder.verify(jobs):
+                    buildsValid = False
+            except ModpackBuilderException as exception:
+                self.logger.log_error(exception)
+                buildsValid = False
+
+        return buildsValid
+
+    # Plan the fetch of the resources of all parsed modpacks without building them
+    def plan(self) -> None:
+        for _, builder in self.builders:
+            builder.plan()
+
+    # Build a single modpack, the failure is stored in the result so the other modpacks are still built
+    def _build_modpack(self, result: BatchPackResult, builder: ModpackBuilder) -> None:
+        startTime = time.monotonic()
+        try:
+            builder.build()
+            result.succeeded = True
+        except Exception as exception:
+            self.logger.log_failure("Modpack: {} build failed: {}".format(result.name, exception))
+            result.errorMessage = str(exception)
+        finally:
+            result.duration = time.monotonic() - startTime
+            result.collect_statistics(builder.trace)
+
+    # Format the aggregated report of the batch build as a list of text lines
+    def format_report(self) -> list[str]:
+        lineFormat = "{:<24} {:>8} {:>10} {:>10} {:>14} {:>8} {:>8}"
+        lines = [ lineFormat.format('Modpack', 'Status', 'Time (s)', 'Downloads', 'Bytes', 'Linked', 'Cached') ]
+        for result in self.results:
+            name = result.name if result.name != None else os.path.basename(result.modpackFilePath)
+            lines.append(lineFormat.format(name[:24], 'ok' if result.succeeded else 'failed', "{:.2f}".format(result.duration), result.downloadedCount, result.downloadedBytes, result.linkedCount, result.cachedCount))
+
+        lines.append(lineFormat.format('Total', "{}/{}".format(sum(1 for result in self.results if result.succeeded), len(self.results)), "{:.2f}".format(self.elapsedTime), sum(result.downloadedCount for result in self.results), sum(result.downloadedBytes for result in self.results), sum(result.linkedCount for result in self.results), sum(result.cachedCount for result in self.results)))
+        return lines
+
+    # Write the aggregated report to the JSON file, the return Boolean value is indicating if the operation succeeded
+    def save_report(self, reportFilePath: str) -> bool:
+        referenceCount, uniqueCount = self.get_resource_statistics()
+        report = {
+            'duration': self.elapsedTime,
+            'resourceReferences': referenceCount,
+            'uniqueResources': uniqueCount,
+            'modpacks': [ result.to_dict() for result in self.results ],
+        }
+
+        try:
+            with atomic_write(reportFilePath, 'w', '.bonclok-report-') as temporaryFile:
+                json.dump(report, temporaryFile, indent=2)
+
+            return True
+        except OSError:
+            return False
+
+__all__ = [ 'DEFAULT_BATCH_JOBS', 'BatchBuilderException', 'BatchPackResult', 'BatchBuilder' ]
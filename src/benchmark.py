@@ -0,0 +1,355 @@
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from archive import put_directory_into_archive
+from builder import DEFAULT_DOWNLOAD_JOBS, ModpackBuilder, ModpackBuilderOptions, get_build_directory
+from logger import Logger
+from models import ModpackTarget
+
+# The supported distributions of the synthetic mod sizes
+SIZE_DISTRIBUTIONS = [ 'fixed', 'uniform', 'lognormal' ]
+
+# The audit events counted as file-system operations
+FILE_SYSTEM_AUDIT_EVENTS = frozenset([ 'open', 'os.remove', 'os.rename', 'os.link', 'os.mkdir', 'os.rmdir', 'os.scandir', 'os.listdir', 'os.utime', 'os.truncate', 'shutil.copyfile', 'shutil.copystat', 'shutil.rmtree' ])
+
+# Class used to count the file-system operations performed by the process, the counting is based on the Python audit events
+class FileSystemOperationCounter():
+    def __init__(self):
+        self.counts = {}
+        self.enabled = False
+        sys.addaudithook(self._audit_hook)
+
+    def _audit_hook(self, event: str, _) -> None:
+        if self.enabled and event in FILE_SYSTEM_AUDIT_EVENTS:
+            self.counts[event] = self.counts.get(event, 0) + 1
+
+    # Reset the counters and start counting
+    def start(self) -> None:
+        self.counts = {}
+        self.enabled = True
+
+    # Stop counting and return the counted operations
+    def stop(self) -> dict[str, int]:
+        self.enabled = False
+        return dict(sorted(self.counts.items()))
+
+# HTTP server used as a stand-in for the mod hosting, the resources are served from memory with an artificial latency and support for range requests
+class ModHostingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, resources: dict[str, bytes], latency: float):
+        self.resources = resources
+        self.latency = latency
+        self.requestCount = 0
+        self.headCount = 0
+        self.servedBytes = 0
+        self.statsLock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), ModHostingRequestHandler)
+
+    # Get the base URL of the server
+    def get_base_url(self) -> str:
+        return "http://{}:{}".format(self.server_address[0], self.server_address[1])
+
+# Request handler of the mod hosting stand-in server
+class ModHostingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+        content = self.server.resources.get(self.path)
+        self.send_response(200 if content != None else 404)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(content) if content != None else 0))
+        self.end_headers()
+
+        with self.server.statsLock:
+            self.server.headCount += 1
+
+    def do_GET(self) -> None:
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+        content = self.server.resources.get(self.path)
+        if content == None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        start = 0
+        rangeHeader = self.headers.get('Range')
+        if rangeHeader != None and rangeHeader.startswith('bytes='):
+            start = int(rangeHeader[len('bytes='):].split('-')[0])
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, len(content) - 1, len(content)))
+        else:
+            self.send_response(200)
+
+        body = content[start:]
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Type', 'application/java-archive')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        with self.server.statsLock:
+            self.server.requestCount += 1
+            self.server.servedBytes += len(body)
+
+# Helper function used to draw the synthetic mod size from the specified distribution, the sizes are in bytes
+def draw_resource_size(generator: random.Random, distribution: str, meanSize: int) -> int:
+    if distribution == 'fixed':
+        return meanSize
+
+    if distribution == 'uniform':
+        return generator.randint(1, meanSize * 2)
+
+    # NOTE: The lognormal distribution resembles real modpacks, many small mods and a few very large ones
+    sigma = 1.0
+    return max(1, int(generator.lognormvariate(0, sigma) * meanSize / (2.718281828 ** (sigma * sigma / 2))))
+
+# Generate the synthetic mod resources, the config files and the modpack JSON file in the working directory, the returned dictionary contains the served resources
+def generate_modpack(workingDirectory: str, baseUrl: str, arguments: argparse.Namespace) -> tuple[str, dict[str, bytes]]:
+    generator = random.Random(arguments.seed)
+    resources = {}
+
+    def create_resource(path: str, size: int) -> str:
+        content = generator.randbytes(size)
+        resources[path] = content
+        return hashlib.sha256(content).hexdigest()
+
+    apiChecksum = create_resource('/api/modding-api.jar', arguments.apiSize)
+
+    mods = []
+    for index in range(arguments.mods):
+        resourcePath = '/mods/mod-{}.jar'.format(index)
+        checksum = create_resource(resourcePath, draw_resource_size(generator, arguments.sizeDistribution, arguments.meanSize))
+
+        configFiles = []
+        for configIndex in range(arguments.configsPerMod):
+            sourcePath = os.path.join('configs', 'mod-{}'.format(index), 'config-{}.toml'.format(configIndex))
+            os.makedirs(os.path.join(workingDirectory, os.path.dirname(sourcePath)), exist_ok=True)
+            with open(os.path.join(workingDirectory, sourcePath), 'w') as configFile:
+                configFile.write("# Synthetic config file\n" + "option{} = {}\n".format(configIndex, index) * 64)
+
+            configFiles.append({ 'sourcePath': sourcePath, 'destinationPath': 'config/mod-{}/config-{}.toml'.format(index, configIndex) })
+
+        mods.append({
+            'name': 'Benchmark mod {}'.format(index),
+            'checksum': checksum,
+            'resourceUrl': baseUrl + resourcePath,
+            'sourceUrl': baseUrl + resourcePath,
+            'includeClient': index % 10 != 1,
+            'includeServer': index % 10 != 2,
+            'configFiles': configFiles,
+        })
+
+    modpackName = 'benchmark'
+    modpackVersion = '1.0.0'
+    modpack = {
+        'name': modpackName,
+        'version': modpackVersion,
+        'api': { 'name': 'benchmark-api', 'checksum': apiChecksum, 'resourceUrl': baseUrl + '/api/modding-api.jar', 'sourceUrl': baseUrl + '/api/modding-api.jar' },
+        'mods': mods,
+        'installation': [ { 'sourcePath': get_build_directory(modpackName, modpackVersion, ModpackTarget.CLIENT), 'destinationPath': 'install/client' } ],
+        'devInstallation': None,
+    }
+
+    modpackFilePath = os.path.join(workingDirectory, 'benchmark-pack.json')
+    with open(modpackFilePath, 'w') as modpackFile:
+        json.dump(modpack, modpackFile, indent=2)
+
+    return modpackFilePath, resources
+
+# Helper function used to get the peak resident set size of the process in bytes, None is returned on platforms without the resource module
+def get_peak_resident_memory() -> int:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peakResidentMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peakResidentMemory if sys.platform == 'darwin' else peakResidentMemory * 1024
+
+# Class used to run the benchmark phases and collect the measurements
+class BenchmarkRunner():
+    def __init__(self, server: ModHostingServer, arguments: argparse.Namespace):
+        self.server = server
+        self.arguments = arguments
+        self.operationCounter = FileSystemOperationCounter()
+        self.results = []
+
+    # Run the phase function and record the wall time, transferred bytes, memory and file-system operations
+    def run_phase(self, name: str, phaseFunction, processedBytes: int = None) -> None:
+        requestCountBefore = self.server.requestCount
+        headCountBefore = self.server.headCount
+        servedBytesBefore = self.server.servedBytes
+
+        if self.arguments.traceMemory:
+            tracemalloc.start()
+
+        self.operationCounter.start()
+        startTime = time.perf_counter()
+        phaseFunction()
+        wallTime = time.perf_counter() - startTime
+        fileOperations = self.operationCounter.stop()
+
+        peakTracedMemory = None
+        if self.arguments.traceMemory:
+            _, peakTracedMemory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        downloadedBytes = self.server.servedBytes - servedBytesBefore
+        measuredBytes = processedBytes if processedBytes != None else downloadedBytes
+        self.results.append({
+            'name': name,
+            'wallTime': wallTime,
+            # NOTE: The size probes are requests of the phase as well, they are reported separately too, so the probe overhead is visible
+            'requests': self.server.requestCount - requestCountBefore + self.server.headCount - headCountBefore,
+            'headRequests': self.server.headCount - headCountBefore,
+            'downloadedBytes': downloadedBytes,
+            'processedBytes': measuredBytes,
+            'throughput': measuredBytes / wallTime if wallTime > 0 else None,
+            'peakTracedMemory': peakTracedMemory,
+            'peakResidentMemory': get_peak_resident_memory(),
+            'fileOperations': fileOperations,
+            'fileOperationsTotal': sum(fileOperations.values()),
+        })
+
+        print("{:<24} {:>9.3f}s {:>12} bytes {:>7} requests {:>8} fs ops".format(name, wallTime, measuredBytes, self.results[-1]['requests'], self.results[-1]['fileOperationsTotal']))
+
+# Helper function used to calculate the total size of the files in the directory tree
+def get_directory_size(directoryPath: str) -> int:
+    totalSize = 0
+    for dirName, _, files in os.walk(directoryPath):
+        for fileName in files:
+            totalSize += os.path.getsize(os.path.join(dirName, fileName))
+
+    return totalSize
+
+# Run all the benchmark phases in a temporary working directory and return the results document
+def run_benchmark(arguments: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix='bonclok-benchmark-') as workingDirectory:
+        server = ModHostingServer({}, arguments.latency / 1000.0)
+        serverThread = threading.Thread(target=server.serve_forever, daemon=True)
+        serverThread.start()
+
+        previousWorkingDirectory = os.getcwd()
+        try:
+            modpackFilePath, resources = generate_modpack(workingDirectory, server.get_base_url(), arguments)
+            server.resources = resources
+
+            # NOTE: The build directories are created relative to the current working directory
+            os.chdir(workingDirectory)
+
+            logger = Logger(open(os.devnull, 'w'), False)
+            cacheDirectory = os.path.join(workingDirectory, 'cache') if arguments.cache else None
+
+            def create_builder(buildTarget: str) -> ModpackBuilder:
+                options = ModpackBuilderOptions(skipChecksum=False, forceBuild=False, packToZip=False, buildTarget=buildTarget, jobs=arguments.jobs, cacheDirectory=cacheDirectory)
+                return ModpackBuilder(modpackFilePath, options, logger)
+
+            runner = BenchmarkRunner(server, arguments)
+            runner.run_phase('parse', lambda: create_builder(None), os.path.getsize(modpackFilePath))
+            runner.run_phase('build-cold', lambda: create_builder(None).build())
+            runner.run_phase('build-incremental', lambda: create_builder(None).build())
+
+            clientBuildDirectory = get_build_directory('benchmark', '1.0.0', ModpackTarget.CLIENT)
+            clientBuildSize = get_directory_size(clientBuildDirectory)
+            runner.run_phase('install', lambda: create_builder('client').install(False), clientBuildSize)
+            runner.run_phase('install-unchanged', lambda: create_builder('client').install(False), clientBuildSize)
+            runner.run_phase('zip', lambda: put_directory_into_archive(clientBuildDirectory, clientBuildDirectory + '.zip', arguments.jobs), clientBuildSize)
+        finally:
+            os.chdir(previousWorkingDirectory)
+            server.shutdown()
+            server.server_close()
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+        },
+        'parameters': {
+            'mods': arguments.mods,
+            'meanSize': arguments.meanSize,
+            'sizeDistribution': arguments.sizeDistribution,
+            'apiSize': arguments.apiSize,
+            'configsPerMod': arguments.configsPerMod,
+            'latency': arguments.latency,
+            'jobs': arguments.jobs,
+            'cache': arguments.cache,
+            'seed': arguments.seed,
+            'totalResourceBytes': sum(len(content) for content in resources.values()),
+        },
+        'phases': runner.results,
+    }
+
+# Helper function used to define all supported benchmark CLI flags and --help docs
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Run the end-to-end modpack build benchmark against a local HTTP server.')
+
+    parser.add_argument('-n', '--mods', action='store', dest='mods', type=int, default=200, required=False,
+        help='The number of synthetic mods in the generated modpack.')
+
+    parser.add_argument('--mean-size', action='store', dest='meanSize', type=int, default=512 * 1024, required=False,
+        help='The mean size of the synthetic mod resources in bytes.')
+
+    parser.add_argument('--size-distribution', action='store', dest='sizeDistribution', choices=SIZE_DISTRIBUTIONS, default='lognormal', required=False,
+        help='The distribution of the synthetic mod resource sizes.')
+
+    parser.add_argument('--api-size', action='store', dest='apiSize', type=int, default=8 * 1024 * 1024, required=False,
+        help='The size of the synthetic modding api resource in bytes.')
+
+    parser.add_argument('--configs-per-mod', action='store', dest='configsPerMod', type=int, default=1, required=False,
+        help='The number of config files of every synthetic mod.')
+
+    parser.add_argument('--latency', action='store', dest='latency', type=float, default=20.0, required=False,
+        help='The artificial latency of every request in milliseconds.')
+
+    parser.add_argument('-j', '--jobs', action='store', dest='jobs', type=int, default=DEFAULT_DOWNLOAD_JOBS, required=False,
+        help='The number of concurrent jobs used by the builder.')
+
+    parser.add_argument('--cache', action='store_true', dest='cache', required=False,
+        help='Use a local artifact cache in the benchmark working directory.')
+
+    parser.add_argument('--trace-memory', action='store_true', dest='traceMemory', required=False,
+        help='Measure the peak Python heap memory of every phase (slows down the measured phases).')
+
+    parser.add_argument('--seed', action='store', dest='seed', type=int, default=0, required=False,
+        help='The seed of the synthetic content generator.')
+
+    parser.add_argument('-o', '--output', action='store', dest='outputFilePath', default='benchmark-results.json', required=False,
+        help='The path to the JSON file the results are written to.')
+
+    return parser
+
+if __name__ == "__main__":
+    try:
+        arguments = create_argument_parser().parse_args()
+        results = run_benchmark(arguments)
+
+        with open(arguments.outputFilePath, 'w') as outputFile:
+            json.dump(results, outputFile, indent=2)
+
+        print("Benchmark results written to: {}.".format(arguments.outputFilePath))
+        exit(0)
+    except Exception as ex:
+        print("Benchmark failed: {}".format(ex), file=sys.stderr)
+        exit(1)
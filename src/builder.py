@@ -1,21 +1,33 @@
-from collections import OrderedDict
-import hashlib
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from enum import Enum
 import os
+import tempfile
+import time
 from urllib.parse import urlparse
-from zipfile import ZIP_DEFLATED, ZipFile
 import requests
 from pathlib import Path
+from typing import Hashable, Optional, Union
 from logger import Logger
 
-from models import Modpack, ModpackTarget
-from file import copy_file, copy_file_tree, remove_file_tree, create_directory
-
-HTTP_HEADERS: OrderedDict = OrderedDict({
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive",
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",
-})
+from models import Mod, ModConfigFile, ModdingApi, Modpack, ModpackTarget
+from loader import ModpackLoaderException, load_modpack
+from file import calculate_file_checksum, place_file, remove_file, remove_file_tree, create_directory
+from archive import put_directory_into_archive
+from cache import DEFAULT_CACHE_MAX_SIZE_MB, ArtifactCache
+from bundle import ArtifactBundle, BundleException, write_artifact_bundle
+from manifest import BuildManifest, ManifestConfigFile, ManifestResource, get_manifest_path, is_config_file_up_to_date, is_resource_up_to_date, load_build_manifest, save_build_manifest
+from sync import SyncException, SyncMode, SyncOptions, synchronize
+from instrumentation import BuildTrace
+from verify import VerifyException, verify_build_directory
+from delta import DeltaException, create_delta_package, get_build_file_checksums
+from serve import DEFAULT_SERVE_WORKERS, PackIndex, PackServer, ServeException
+from mirrors import MirrorSelector
+from registry import ResourceRegistry
+from scheduler import DEFAULT_ESTIMATED_BANDWIDTH, BandwidthLimiter, HostLimiter, ScheduledTransfer, TransferScheduler, estimate_transfer_duration, order_transfers, probe_transfer_sizes
+from download import DEFAULT_DOWNLOAD_RETRIES, DEFAULT_RETRY_BACKOFF, DownloadResult, RetryPolicy, create_http_session, discard_temporary_file, download_resource, get_conditional_headers
+
+DEFAULT_DOWNLOAD_JOBS = 4
+DEFAULT_MAX_HOST_CONNECTIONS = 8
 
 # Exception base class implementation used to raise builder related exceptions
 class ModpackBuilderException(Exception):
@@ -26,13 +38,39 @@ class ModpackBuilderException(Exception):
     def __str__(self):
         return self.message
 
+# Enum class that is representing how a fetched resource was written to the build directory
+class FetchOutcome(str, Enum):
+    # The resource content was downloaded from the resource URL or one of its mirrors
+    DOWNLOADED = 'downloaded'
+    # The resource was already fetched for another build target or modpack and was placed from that file
+    LINKED = 'linked'
+    # The resource was restored from the local artifact cache
+    CACHED = 'cached'
+    # The resource was restored from the artifact bundle
+    BUNDLED = 'bundled'
+    # The server confirmed that the existing resource file did not change
+    NOT_MODIFIED = 'not-modified'
+
 # Class used to store builder options
 class ModpackBuilderOptions():
-    def __init__(self, skipChecksum: bool, forceBuild: bool, packToZip: bool, buildTarget: str):
+    def __init__(self, skipChecksum: bool, forceBuild: bool, packToZip: bool, buildTarget: str, jobs: int = DEFAULT_DOWNLOAD_JOBS, maxHostConnections: int = DEFAULT_MAX_HOST_CONNECTIONS, cacheDirectory: str = None, cacheMaxSizeMb: int = DEFAULT_CACHE_MAX_SIZE_MB, cleanBuild: bool = False, retries: int = DEFAULT_DOWNLOAD_RETRIES, retryBackoff: float = DEFAULT_RETRY_BACKOFF, installMode: str = SyncMode.UPDATE, installChecksum: bool = False, installHardlinks: bool = False, revalidate: bool = False, bandwidthLimitMb: Optional[float] = None, bundleFilePath: str = None):
         self.skipChecksum = skipChecksum
         self.forceBuild = forceBuild
         self.packToZip = packToZip
         self.buildTarget = buildTarget
+        self.jobs = jobs
+        self.maxHostConnections = maxHostConnections
+        self.cacheDirectory = cacheDirectory
+        self.cacheMaxSizeMb = cacheMaxSizeMb
+        self.cleanBuild = cleanBuild
+        self.retries = retries
+        self.retryBackoff = retryBackoff
+        self.installMode = installMode
+        self.installChecksum = installChecksum
+        self.installHardlinks = installHardlinks
+        self.revalidate = revalidate
+        self.bandwidthLimitMb = bandwidthLimitMb
+        self.bundleFilePath = bundleFilePath
 
 # Helper function used to extract the mod name from the url or alternatively combine it from other known mod properties
 def parse_remote_resource_file_name(name: str, version: str, resourceUrl: str) -> str:
@@ -46,24 +84,29 @@ def parse_remote_resource_file_name(name: str, version: str, resourceUrl: str) -
 
     return "{}-{}.jar".format(name.lower(), escapedVersion)
 
-# Helper function used to calculate the SHA-256 checksum from the remote resource and return the haxadecimal representation of the hash
-def calculate_resource_checksum(resource: bytes) -> str:
-    sha256 = hashlib.sha256(resource)
-    return sha256.hexdigest()
+# Helper function used to combine the build directory name of the specified modpack and build target
+def get_build_directory(name: str, version: str, buildTarget: ModpackTarget) -> str:
+    return "{}-{}-{}-build".format(name, version, ModpackTarget(buildTarget).value)
+
+# Helper function used to get the files of the modpack build for the specified target indexed by the path relative to the build directory (using "/" separators) and mapped to their expected checksum.
+# The config files have no checksum in the modpack file, they are mapped to the source checksum recorded by the build manifest or to None if it is not available.
+def get_expected_build_files(modpack: Modpack, buildTarget: ModpackTarget, manifest: Optional[BuildManifest]) -> dict[str, Optional[str]]:
+    expectedFiles = { parse_remote_resource_file_name(modpack.api.name, modpack.version, modpack.api.resourceUrl): modpack.api.checksum }
+    for mod in modpack.mods:
+        if not (mod.includeClient if buildTarget == ModpackTarget.CLIENT else mod.includeServer):
+            continue
 
-# Helper function used to create a .zip archive out of a specified directory
-def put_directory_into_archive(buildDirectoryPath: str, zipFileName: str) -> None:
-    zipArchive = ZipFile(zipFileName, 'w', ZIP_DEFLATED) 
-    for dirName, _, files in os.walk(buildDirectoryPath):
-        zipArchive.write(dirName)
-        for fileName in files:
-            zipArchive.write(os.path.join(dirName, fileName))
+        expectedFiles[Path("mods", parse_remote_resource_file_name(mod.name, modpack.version, mod.resourceUrl)).as_posix()] = mod.checksum
+        for configFile in mod.configFiles:
+            configFilePath = Path(configFile.destinationPath).as_posix()
+            configEntry = manifest.configFiles.get(configFilePath) if manifest is not None else None
+            expectedFiles[configFilePath] = configEntry.sourceChecksum if configEntry is not None else None
 
-    zipArchive.close()
+    return expectedFiles
 
 # Class used to parse and perform all the modpack build instructions required to obtain a read-to-use pack of mods
 class ModpackBuilder:
-    def __init__(self, modpackFilePath: str, options: ModpackBuilderOptions, logger: Logger):
+    def __init__(self, modpackFilePath: str, options: ModpackBuilderOptions, logger: Logger, resourceRegistry: ResourceRegistry = None, hostLimiter: HostLimiter = None, bandwidthLimiter: BandwidthLimiter = None):
         if logger == None:
             raise ModpackBuilderException("The provided logger instance is not initialzied.")
         
@@ -76,187 +119,852 @@ class ModpackBuilder:
             raise ModpackBuilderException("Invalid modpack builder options provided.")
         
         self.options = options
+
+        # NOTE: The registry is shared when multiple modpacks are built in a single run, so a resource required by many modpacks is fetched only once
+        self.sharedResourceRegistry = resourceRegistry
+
+        if options.jobs < 1:
+            raise ModpackBuilderException("The number of download jobs must be greater than zero.")
+
+        if options.maxHostConnections < 1:
+            raise ModpackBuilderException("The number of connections per host must be greater than zero.")
+
+        if options.retries < 0 or options.retryBackoff < 0:
+            raise ModpackBuilderException("The download retry options can not be negative.")
+
+        self.retryPolicy = RetryPolicy(options.retries, options.retryBackoff)
+
+        # NOTE: A failing mirror is not retried when another mirror can be used, the retries are only spent on the last mirror
+        self.mirrorRetryPolicy = RetryPolicy(0, options.retryBackoff)
+        self.mirrorSelector = MirrorSelector()
+
+        # NOTE: The limiters are shared when multiple modpacks are built in a single run, so the limits apply to the whole run instead of every modpack
+        self.hostLimiter = hostLimiter if hostLimiter != None else HostLimiter(options.maxHostConnections)
+        self.bandwidthLimiter = bandwidthLimiter
+        if self.bandwidthLimiter == None and options.bandwidthLimitMb != None:
+            if options.bandwidthLimitMb <= 0:
+                raise ModpackBuilderException("The bandwidth limit must be greater than zero.")
+
+            self.bandwidthLimiter = BandwidthLimiter(options.bandwidthLimitMb * 1024 * 1024)
+
+        if options.installMode not in [ mode.value for mode in SyncMode ]:
+            raise ModpackBuilderException("Invalid installation mode specified.")
+
+        self.artifactCache = None
+        if options.cacheDirectory != None:
+            if options.cacheMaxSizeMb < 0:
+                raise ModpackBuilderException("The artifact cache size limit can not be negative.")
+
+            try:
+                self.artifactCache = ArtifactCache(options.cacheDirectory, options.cacheMaxSizeMb * 1024 * 1024)
+                self.logger.log_verbose("Using the artifact cache directory: {}.", options.cacheDirectory)
+            except OSError:
+                self.logger.log_verbose("Failed to create the artifact cache directory: {}.", options.cacheDirectory)
+                raise ModpackBuilderException("Failed to create the artifact cache directory.")
+
+        self.artifactBundle = None
+        if options.bundleFilePath != None:
+            try:
+                self.artifactBundle = ArtifactBundle(options.bundleFilePath)
+                self.logger.log_verbose("Using the artifact bundle: {} ({} artifacts).", options.bundleFilePath, self.artifactBundle.entryCount)
+            except BundleException as exception:
+                self.logger.log_verbose("{}", exception)
+                raise ModpackBuilderException("Failed to open the artifact bundle.")
         
-        formatedBuildTarget = options.buildTarget.strip().lower()
+        formatedBuildTarget = options.buildTarget.strip().lower() if options.buildTarget != None else ''
         if (formatedBuildTarget == 'client'):
             self.logger.log_verbose('Selected build target is: client.')
-            self.buildTarget = ModpackTarget.CLIENT
+            self.buildTargets = [ ModpackTarget.CLIENT ]
         elif (formatedBuildTarget == 'server'):
             self.logger.log_verbose('Selected build target is: server.')
-            self.buildTarget = ModpackTarget.SERVER
+            self.buildTargets = [ ModpackTarget.SERVER ]
+        elif (len(formatedBuildTarget) == 0):
+            self.logger.log_verbose('No build target specified, selected build targets are: client and server.')
+            self.buildTargets = [ ModpackTarget.CLIENT, ModpackTarget.SERVER ]
         else:
-            self.logger.log_verbose("Invalid build target specified: {}.".format(options.buildTarget))
+            self.logger.log_verbose("Invalid build target specified: {}.", options.buildTarget)
             raise ModpackBuilderException("Invalid build target specified.")
 
-        with open(modpackFilePath, "r") as modpackFile:
-            self.logger.log_verbose("Modpack config file opened.")
-            self.modpackFilePath = modpackFilePath
+        self.buildTarget = self.buildTargets[0]
 
-            modpackFileContent = modpackFile.read()
-            if len(modpackFileContent) == 0:
-                self.logger.log_verbose("The length of the modpack file content is zero.")
-                raise ModpackBuilderException("The modpack file can not be accessed or is corrupted.")
-
-            modpackContentDictionary = json.loads(modpackFileContent)
-            self.logger.log_verbose("Modpack config file content JSON parsed successful.")
-
-            self.modpackData = Modpack(**modpackContentDictionary)
-            self.logger.log_verbose("Modpack config file content deserialzied successful.")
+        self.trace = BuildTrace()
+        self.modpackFilePath = modpackFilePath
+        self.modpackData = self._load_modpack()
         
         self.logger.log_success("Parsing of the modpack file succeeded.")
+
+    # Parse the modpack file again, the currently loaded modpack is kept if the file can not be parsed
+    def reload(self) -> None:
+        self.modpackData = self._load_modpack()
+        self.logger.log_success("Parsing of the modpack file succeeded.")
+
+    # Read, deserialize and validate the modpack file
+    def _load_modpack(self) -> Modpack:
+        with self.trace.measure('parse', self.modpackFilePath) as parseEvent:
+            try:
+                modpackData = load_modpack(self.modpackFilePath)
+            except ModpackLoaderException as exception:
+                self.logger.log_verbose("{}", exception)
+                raise ModpackBuilderException(exception.message)
+
+            parseEvent.bytes = os.path.getsize(self.modpackFilePath)
+            self.logger.log_verbose("Modpack config file content deserialzied successful, {} mods loaded.", len(modpackData.mods))
+
+        return modpackData
         
-    # Start the interpretation process of the parsed mod pack instruction file    
+    # Start the interpretation process of the parsed mod pack instruction file for all selected build targets
     def build(self) -> None:
-        self.logger.log_success("Modpack: {} ({}) build process started.".format(self.modpackData.name.strip(), self.buildTarget))
+        # NOTE: Verified resources are shared between the build targets, so a mod included in both the client and the server is fetched only once
+        self.resourceRegistry = self.sharedResourceRegistry if self.sharedResourceRegistry != None else ResourceRegistry()
+        self.resourceValidators = {}
+
+        session = create_http_session(self.options.maxHostConnections)
+        try:
+            for buildTarget in self.buildTargets:
+                self.buildTarget = buildTarget
+                with self.trace.measure('target', buildTarget.value):
+                    self._build_target(session)
+        finally:
+            session.close()
+
+        if self.artifactCache != None:
+            with self.trace.measure('cache-trim'):
+                evictedCount = self.artifactCache.trim()
+            self.logger.log_verbose("Artifact cache trimmed, {} least recently used entries evicted.", evictedCount)
+
+    # Plan the fetch of the resources of the selected build targets without fetching them or changing the build directories (a dry run), the sizes of the transfers are learned with HEAD requests.
+    # The transfers are logged in the scheduled order together with the total size and the estimated transfer time, the returned list contains the transfers in that order.
+    def plan(self) -> list[ScheduledTransfer]:
+        transfers = []
+        plannedResourceKeys = set()
+        upToDateCount = 0
+        for buildTarget in self.buildTargets:
+            self.buildTarget = buildTarget
+            self.buildDirectory = get_build_directory(self.modpackData.name, self.modpackData.version, buildTarget)
+            self.previousManifest = load_build_manifest(self.buildDirectory) if not self.options.cleanBuild else None
+
+            for resource, resourceKind, filePath in self._get_target_resources():
+                if is_resource_up_to_date(self.buildDirectory, self._get_previous_entry(resource), resource.resourceUrl, resource.checksum, filePath) and not self.options.revalidate:
+                    upToDateCount += 1
+                    continue
+
+                # NOTE: A resource required by both build targets is fetched once, the same as during the build
+                resourceKey = self.get_resource_key(resource.resourceUrl, resource.checksum)
+                if resourceKey not in plannedResourceKeys:
+                    plannedResourceKeys.add(resourceKey)
+                    transfers.append(ScheduledTransfer(resource.name.strip(), resource.get_resource_urls(), (resource, resourceKind, filePath, None)))
+
+        session = create_http_session(self.options.maxHostConnections)
+        try:
+            self._probe_transfer_sizes(session, transfers, True)
+        finally:
+            session.close()
+
+        transfers = order_transfers(transfers)
+        cachedTransferIds = set(id(transfer) for transfer in transfers if self._is_artifact_available(transfer.payload[0].checksum))
+        cachedCount = len(cachedTransferIds)
+        unknownCount = sum(1 for transfer in transfers if transfer.size == None)
+        totalBytes = sum(transfer.size or 0 for transfer in transfers)
+
+        self.logger.log_info("Modpack: {} fetch plan ({}): {} transfers, {} bytes ({:.1f} MB).".format(self.modpackData.name.strip(), ", ".join(target.value for target in self.buildTargets), len(transfers), totalBytes, totalBytes / (1024 * 1024)))
+        for index, transfer in enumerate(transfers):
+            sizeDescription = "cached" if id(transfer) in cachedTransferIds else "unknown size" if transfer.size == None else "{} bytes".format(transfer.size)
+            self.logger.log_info("{:>4}. {} ({}, {})".format(index + 1, transfer.name, sizeDescription, transfer.get_host()))
+
+        bandwidth = self.bandwidthLimiter.bytesPerSecond if self.bandwidthLimiter != None else DEFAULT_ESTIMATED_BANDWIDTH
+        estimatedDuration = estimate_transfer_duration(transfers, self.options.jobs, bandwidth)
+        self.logger.log_info("Estimated transfer time: {:.1f}s at {:.1f} MB/s{} with {} workers, {} resources restored from the cache or bundle, {} of an unknown size, {} up to date.".format(estimatedDuration, bandwidth / (1024 * 1024), "" if self.bandwidthLimiter != None else " (assumed)", self.options.jobs, cachedCount, unknownCount, upToDateCount))
+
+        return transfers
+
+    # Fetch the resources of the selected build targets and write them into a single artifact bundle file indexed by their checksums, the bundle can be used as the artifact source of a build without network access.
+    # The resources are fetched to a staging directory next to the bundle file (the artifact cache is used the same as during the build), the return value is the number of the bundled artifacts.
+    def prefetch(self, bundleFilePath: str) -> int:
+        if self.options.skipChecksum:
+            raise ModpackBuilderException("The artifact bundle can not be created with the checksum verification skipped.")
+
+        transfers = []
+        bundledChecksums = set()
+        for buildTarget in self.buildTargets:
+            self.buildTarget = buildTarget
+            for resource, resourceKind, _ in self._get_target_resources():
+                # NOTE: The artifacts are identified by the checksum alone, so a resource required by both build targets or referenced by different URLs is bundled once
+                checksum = resource.checksum.strip().lower()
+                if checksum not in bundledChecksums:
+                    bundledChecksums.add(checksum)
+                    transfers.append(ScheduledTransfer(resource.name.strip(), resource.get_resource_urls(), (resource, resourceKind, checksum, None)))
+
+        self.logger.log_success("Modpack: {} ({}) prefetch process started.".format(self.modpackData.name.strip(), ", ".join(target.value for target in self.buildTargets)))
+
+        bundleDirectory = os.path.dirname(os.path.abspath(bundleFilePath))
+        try:
+            stagingDirectory = tempfile.mkdtemp(prefix='.bonclok-prefetch-', dir=bundleDirectory)
+        except OSError:
+            self.logger.log_verbose("Failed to create the prefetch staging directory in: {}.", bundleDirectory)
+            raise ModpackBuilderException("Failed to create the prefetch staging directory.")
+
+        self.buildDirectory = stagingDirectory
+        self.resourceRegistry = ResourceRegistry()
+        self.resourceValidators = {}
+        session = create_http_session(self.options.maxHostConnections)
+        try:
+            fetchedTransfers = self._fetch_resources(session, transfers)
+            if len(fetchedTransfers) != len(transfers) and not self.options.forceBuild:
+                raise ModpackBuilderException("Not all resources of the modpack could be fetched.")
+
+            artifactPaths = { transfer.payload[2]: os.path.join(stagingDirectory, transfer.payload[2]) for transfer in fetchedTransfers }
+            with self.trace.measure('bundle', bundleFilePath) as bundleEvent:
+                try:
+                    bundleEvent.bytes = write_artifact_bundle(bundleFilePath, artifactPaths)
+                except (BundleException, OSError) as exception:
+                    self.logger.log_verbose("Failed to write the artifact bundle: {}: {}", bundleFilePath, exception)
+                    raise ModpackBuilderException("Failed to write the artifact bundle.")
+        finally:
+            session.close()
+            if not remove_file_tree(stagingDirectory):
+                self.logger.log_verbose("Failed to remove the prefetch staging directory: {}.", stagingDirectory)
+
+        self.logger.log_success("Modpack: {} ({}) artifact bundle: {} written, {} artifacts, {} bytes.".format(self.modpackData.name.strip(), ", ".join(target.value for target in self.buildTargets), bundleFilePath, len(artifactPaths), bundleEvent.bytes))
+        return len(artifactPaths)
+
+    # Build the modpack for the current build target
+    def _build_target(self, session: requests.Session) -> None:
+        self.logger.log_success("Modpack: {} ({}) build process started.".format(self.modpackData.name.strip(), self.buildTarget.value))
+
+        buildDirectory = get_build_directory(self.modpackData.name, self.modpackData.version, self.buildTarget)
+        self.buildDirectory = buildDirectory
+        with self.trace.measure('prepare', self.buildTarget.value):
+            self.previousManifest = self._prepare_build_directory(buildDirectory)
+        self.buildManifest = BuildManifest()
+
+        modsDirectory = os.path.join(buildDirectory, "mods")
+        if not os.path.isdir(modsDirectory):
+            self.logger.log_verbose("Creating mods directory.")
+            if not create_directory(modsDirectory):
+                self.logger.log_verbose("Failed to create mods directory: {}.", modsDirectory)
+                raise ModpackBuilderException("Failed to create mods directory.")
+            else:
+                self.logger.log_verbose("Mods directory created.")
+
+        # NOTE: The modding api is fetched together with the mods, so a large api resource is scheduled by its size instead of delaying all mod downloads
+        targetResources = self._get_target_resources()
+        transfers = []
+        for resource, resourceKind, filePath in targetResources:
+            previousEntry = self._get_previous_entry(resource)
+            resourceUpToDate = is_resource_up_to_date(buildDirectory, previousEntry, resource.resourceUrl, resource.checksum, filePath)
+            if resourceUpToDate and not self.options.revalidate:
+                self.logger.log_verbose("({}) The {} resource is up to date, skipping the download.", resource.name.strip(), resourceKind)
+                self._set_manifest_entry(resource, previousEntry)
+                self.resourceRegistry.register(self.get_resource_key(resource.resourceUrl, resource.checksum), os.path.join(buildDirectory, filePath))
+            else:
+                conditionalHeaders = self._get_revalidation_headers(previousEntry) if resourceUpToDate else None
+                transfers.append(ScheduledTransfer(resource.name.strip(), resource.get_resource_urls(), (resource, resourceKind, filePath, conditionalHeaders)))
+
+        for transfer in self._fetch_resources(session, transfers):
+            resource, _, filePath, _ = transfer.payload
+            self._set_manifest_entry(resource, self._create_manifest_resource(resource.resourceUrl, resource.checksum, filePath))
+
+        targetMods = [ resource for resource, _, _ in targetResources if resource is not self.modpackData.api ]
+
+        # NOTE: The config files are copied sequentially in the modpack file order, so overlapping destination paths are resolved the same way on every build
+        for mod in targetMods:
+            if mod.name in self.buildManifest.mods:
+                self._copy_mod_config_files(mod, buildDirectory)
 
-        buildDirectory = "{}-{}-{}-build".format(self.modpackData.name, self.modpackData.version, self.buildTarget)
+        with self.trace.measure('cleanup', self.buildTarget.value):
+            self._remove_stale_build_files(buildDirectory)
+
+        with self.trace.measure('manifest', self.buildTarget.value):
+            manifestSaved = save_build_manifest(buildDirectory, self.buildManifest)
+
+        if not manifestSaved:
+            self.logger.log_verbose("Failed to write the build manifest to: {}.", get_manifest_path(buildDirectory))
+            raise ModpackBuilderException("Failed to write the build manifest.")
+        else:
+            self.logger.log_verbose("Build manifest written.")
+
+        self.logger.log_success("Modpack: {} ({}) build process finished.".format(self.modpackData.name.strip(), self.buildTarget.value))
+
+        if self.options.packToZip:
+            self._pack_build_directory(buildDirectory)
+
+    # Pack the build directory into the .zip archive placed next to it
+    def _pack_build_directory(self, buildDirectory: str) -> None:
+        self.logger.log_verbose("Starting to packing build directory to zip archive.")
+        archiveName = "{}.zip".format(buildDirectory)
+        with self.trace.measure('zip', archiveName) as zipEvent:
+            put_directory_into_archive(buildDirectory, archiveName, self.options.jobs)
+            zipEvent.bytes = os.path.getsize(archiveName)
+        self.logger.log_verbose("Packing build directory to zip archive succeed.")
+
+    # Prepare the build directory for the build, the returned manifest of the previous build is used to perform an incremental build and is None for a clean build
+    def _prepare_build_directory(self, buildDirectory: str) -> Optional[BuildManifest]:
         if os.path.isdir(buildDirectory):
-            if self.options.forceBuild:
-                self.logger.log_verbose("Force build flag is enabled, removing the existing build.")
+            previousManifest = None if self.options.cleanBuild else load_build_manifest(buildDirectory)
+            if previousManifest is not None:
+                self.logger.log_verbose("The build directory: {} contains a build manifest, performing an incremental build.", buildDirectory)
+                return previousManifest
+
+            if self.options.forceBuild or self.options.cleanBuild:
+                self.logger.log_verbose("Force or clean build flag is enabled, removing the existing build.")
                 
                 self.logger.log_verbose("Removing the build directory tree.")
                 if not remove_file_tree(buildDirectory):
-                    self.logger.log_verbose("Failed to remove the build directory: {}.".format(buildDirectory))
+                    self.logger.log_verbose("Failed to remove the build directory: {}.", buildDirectory)
                     raise ModpackBuilderException("Failed to remove the build directory.")
                 else:
                     self.logger.log_verbose("Build directory tree removed successful.")
 
             else:
-                self.logger.log_verbose("The build directory: {} already exists. The previous build may be corrupted.".format(buildDirectory))
+                self.logger.log_verbose("The build directory: {} already exists and has no build manifest. The previous build may be corrupted.", buildDirectory)
                 raise ModpackBuilderException("The build directory already exists. The previous build may be corrupted.")
 
         self.logger.log_verbose("Creating build directory.")
         if not create_directory(buildDirectory):
-            self.logger.log_verbose("Failed to create build directory: {}.".format(buildDirectory))
+            self.logger.log_verbose("Failed to create build directory: {}.", buildDirectory)
             raise ModpackBuilderException("Failed to create build directory.")
         else:
             self.logger.log_verbose("Build directory created.")
 
-        apiLoggingPrefix = "({})".format(self.modpackData.api.name.strip())
+        return None
+
+    # Remove the files produced by the previous build that are not part of the current build
+    def _remove_stale_build_files(self, buildDirectory: str) -> None:
+        if self.previousManifest is None:
+            return
+
+        currentFilePaths = set(entry.filePath for entry in self.buildManifest.mods.values())
+        currentFilePaths.update(self.buildManifest.configFiles.keys())
+        if self.buildManifest.api is not None:
+            currentFilePaths.add(self.buildManifest.api.filePath)
+
+        previousFilePaths = set(entry.filePath for entry in self.previousManifest.mods.values())
+        previousFilePaths.update(self.previousManifest.configFiles.keys())
+        if self.previousManifest.api is not None:
+            previousFilePaths.add(self.previousManifest.api.filePath)
+
+        for staleFilePath in sorted(previousFilePaths - currentFilePaths):
+            self.logger.log_verbose("Removing the file: {} which is no longer part of the build.", staleFilePath)
+            if not remove_file(os.path.join(buildDirectory, staleFilePath)):
+                self.logger.log_verbose("Failed to remove the file: {}.", staleFilePath)
+                raise ModpackBuilderException("Failed to remove a file from the previous build.")
+
+    # Get the conditional request headers used to revalidate the resource which is up to date according to the previous build manifest, the resources without stored validators are downloaded unconditionally
+    def _get_revalidation_headers(self, entry: ManifestResource) -> dict:
+        # NOTE: The stored validators are kept if the server does not repeat them in the 304 response
+        self.resourceValidators[(entry.resourceUrl, entry.checksum)] = (entry.entityTag, entry.lastModified)
+        return get_conditional_headers(entry.entityTag, entry.lastModified)
+
+    # Create the manifest entry of the fetched resource, the validators returned by the server are stored to revalidate the resource on the next build
+    def _create_manifest_resource(self, resourceUrl: str, checksum: str, filePath: str) -> ManifestResource:
+        entityTag, lastModified = self.resourceValidators.get((resourceUrl, checksum), (None, None))
+        return ManifestResource(resourceUrl=resourceUrl, checksum=checksum, filePath=filePath, size=os.path.getsize(os.path.join(self.buildDirectory, filePath)), entityTag=entityTag, lastModified=lastModified)
+
+    # Get the path of the mod resource file relative to the build directory
+    def _get_mod_file_path(self, mod: Mod) -> str:
+        return Path("mods", parse_remote_resource_file_name(mod.name, self.modpackData.version, mod.resourceUrl)).as_posix()
+
+    # Check if the mod should be included in the current build target
+    def _is_mod_included(self, mod: Mod) -> bool:
+        modLoggingPrefix = "({})".format(mod.name.strip())
+
+        if self.buildTarget == ModpackTarget.CLIENT and not mod.includeClient:
+            self.logger.log_verbose("{} Skipping the mod. Current build target is CLIENT and the mod has been flagged for exclusion from the CLIENT.", modLoggingPrefix)
+            return False
+
+        if self.buildTarget == ModpackTarget.SERVER and not mod.includeServer:
+            self.logger.log_verbose("{} Skipping the mod. Current build target is SERVER and the mod has been flagged for exclusion from the SERVER.", modLoggingPrefix)
+            return False
+
+        return True
+
+    # Get the resources (the modding api followed by the included mods) of the current build target together with their kind and file path relative to the build directory
+    def _get_target_resources(self) -> list[tuple[Union[ModdingApi, Mod], str, str]]:
+        api = self.modpackData.api
+        resources = [ (api, "modding api", parse_remote_resource_file_name(api.name, self.modpackData.version, api.resourceUrl)) ]
+        resources.extend((mod, "mod", self._get_mod_file_path(mod)) for mod in self.modpackData.mods if self._is_mod_included(mod))
+        return resources
+
+    # Get the entry of the resource in the manifest of the previous build, None is returned for a clean build or a resource which was not part of the previous build
+    def _get_previous_entry(self, resource: Union[ModdingApi, Mod]) -> Optional[ManifestResource]:
+        if self.previousManifest is None:
+            return None
+
+        if resource is self.modpackData.api:
+            return self.previousManifest.api
+
+        return self.previousManifest.mods.get(resource.name)
+
+    # Store the entry of the resource in the manifest of the current build
+    def _set_manifest_entry(self, resource: Union[ModdingApi, Mod], entry: ManifestResource) -> None:
+        if resource is self.modpackData.api:
+            self.buildManifest.api = entry
+        else:
+            self.buildManifest.mods[resource.name] = entry
+
+    # Check if the artifact with the specified checksum can be restored from the artifact bundle or cache without a download
+    def _is_artifact_available(self, checksum: str) -> bool:
+        if self.artifactBundle != None and self.artifactBundle.contains(checksum):
+            return True
+
+        return self.artifactCache != None and self.artifactCache.contains(checksum)
+
+    # Learn the sizes of the transfers with HEAD requests, so the largest transfers can be started first. The sizes are only probed if the order matters (there are more transfers than workers) or if requested,
+    # the resources available in the artifact bundle or cache are restored without a download and the revalidated resources are usually answered with an empty 304 response, so they are scheduled last without a request.
+    def _probe_transfer_sizes(self, session: requests.Session, transfers: list[ScheduledTransfer], force: bool = False) -> None:
+        if len(transfers) <= self.options.jobs and not force:
+            return
+
+        for transfer in transfers:
+            resource, _, _, conditionalHeaders = transfer.payload
+            if conditionalHeaders != None or self._is_artifact_available(resource.checksum):
+                transfer.size = 0
+
+        with self.trace.measure('size-probe') as probeEvent:
+            probe_transfer_sizes(session, transfers, self.options.jobs)
+            probeEvent.attributes['transfers'] = len(transfers)
+            probeEvent.attributes['unknown'] = sum(1 for transfer in transfers if transfer.size == None)
+
+    # Fetch the resources using a pool of workers, every worker takes the largest pending transfer which host is below the connection limit, the returned list contains the transfers that were fetched (in the original order)
+    def _fetch_resources(self, session: requests.Session, transfers: list[ScheduledTransfer]) -> list[ScheduledTransfer]:
+        if len(transfers) == 0:
+            return []
+
+        self.logger.log_verbose("Starting to fetch {} resources using {} workers.", len(transfers), self.options.jobs)
+        self._probe_transfer_sizes(session, transfers)
+        scheduler = TransferScheduler(transfers, self.hostLimiter)
+
+        def run_worker() -> list[ScheduledTransfer]:
+            fetchedTransfers = []
+            while True:
+                transfer = scheduler.acquire()
+                if transfer == None:
+                    return fetchedTransfers
+
+                try:
+                    if self._fetch_transfer(session, transfer):
+                        fetchedTransfers.append(transfer)
+                finally:
+                    scheduler.release(transfer)
+
+        fetchedTransferIds = set()
+        with ThreadPoolExecutor(max_workers=min(self.options.jobs, len(transfers))) as executor:
+            futures = [ executor.submit(run_worker) for _ in range(min(self.options.jobs, len(transfers))) ]
+            try:
+                for future in as_completed(futures):
+                    fetchedTransferIds.update(id(transfer) for transfer in future.result())
+            except:
+                # NOTE: Fail fast, the pending transfers are dropped and only the already running ones are awaited
+                self.logger.log_verbose("Resource fetch failed, cancelling the pending transfers.")
+                scheduler.cancel()
+                raise
+
+        return [ transfer for transfer in transfers if id(transfer) in fetchedTransferIds ]
+
+    # Fetch a single scheduled resource into the build directory, the resource is revalidated if the conditional headers are specified, the return Boolean value is indicating if the resource was fetched
+    def _fetch_transfer(self, session: requests.Session, transfer: ScheduledTransfer) -> bool:
+        resource, resourceKind, filePath, conditionalHeaders = transfer.payload
+        loggingPrefix = "({})".format(transfer.name)
+
+        with self.trace.measure('fetch', transfer.name) as fetchEvent:
+            fetchOutcome = self._fetch_resource(session, loggingPrefix, resourceKind, transfer.resourceUrls, resource.checksum, os.path.join(self.buildDirectory, filePath), conditionalHeaders)
+            fetchEvent.attributes['outcome'] = fetchOutcome.value if fetchOutcome != None else None
+            if fetchOutcome == FetchOutcome.DOWNLOADED:
+                fetchEvent.bytes = os.path.getsize(os.path.join(self.buildDirectory, filePath))
+
+        if fetchOutcome == None:
+            return False
+
+        resourceName = "{} resource: {}".format(resourceKind.capitalize(), transfer.name)
+        if fetchOutcome == FetchOutcome.DOWNLOADED:
+            self.logger.log_success("{} downloaded successful.".format(resourceName))
+        elif fetchOutcome == FetchOutcome.LINKED:
+            self.logger.log_success("{} placed from the already fetched file.".format(resourceName))
+        elif fetchOutcome == FetchOutcome.CACHED:
+            self.logger.log_success("{} restored from the artifact cache.".format(resourceName))
+        elif fetchOutcome == FetchOutcome.BUNDLED:
+            self.logger.log_success("{} restored from the artifact bundle.".format(resourceName))
+        else:
+            self.logger.log_success("{} did not change on the server, the existing file is kept.".format(resourceName))
 
-        self.logger.log_verbose("{} Starting to download the remote modding api resource.".format(apiLoggingPrefix))
-        resourceResult = requests.get(self.modpackData.api.resourceUrl, headers=HTTP_HEADERS)
-        if resourceResult.status_code != 200:
-            if self.options.forceBuild:
-                self.logger.log_verbose("{} Force build flag is enabled, skipping operations on the modding api.".format(apiLoggingPrefix))
-            else:
-                self.logger.log_verbose("{} The request returned a: {} status code.".format(apiLoggingPrefix, resourceResult.status_code))
-                raise ModpackBuilderException("The requested resource returned a non-2** status code.")
-                
-        self.logger.log_verbose("{} Remote modding api resource downloaded successful.".format(apiLoggingPrefix))
-            
+        return True
+
+    # Get the key identifying the resource content in the resource registry, the verified resources are identified by the checksum alone, so the same content is fetched once even if it is referenced by different URLs
+    def get_resource_key(self, resourceUrl: str, checksum: str) -> Hashable:
         if self.options.skipChecksum:
-            self.logger.log_verbose("{} Checksum verification skipped due to the builder options.".format(apiLoggingPrefix))
-        else:
-            self.logger.log_verbose("{} Starting checksum verification.".format(apiLoggingPrefix))
+            return (resourceUrl, checksum)
+
+        return checksum.strip().lower()
+
+    # Fetch the resource once per build run, a resource already fetched for another build target or modpack is linked instead of being fetched again, the return value is the way the resource was written or None if it was skipped due to the force build flag.
+    # The first URL is the primary resource URL identifying the resource, the remaining URLs are its mirrors.
+    def _fetch_resource(self, session: requests.Session, loggingPrefix: str, resourceKind: str, resourceUrls: list[str], expectedChecksum: str, filePath: str, conditionalHeaders: Optional[dict] = None) -> Optional[FetchOutcome]:
+        resourceKey = self.get_resource_key(resourceUrls[0], expectedChecksum)
+        fetchedResourcePath = self.resourceRegistry.claim(resourceKey)
+        if fetchedResourcePath != None:
+            with self.trace.measure('link', loggingPrefix.strip('()')) as linkEvent:
+                placementMethod = place_file(fetchedResourcePath, filePath)
+                linkEvent.attributes['method'] = placementMethod.value if placementMethod != None else None
+
+            if placementMethod != None:
+                self.logger.log_verbose("{} The {} resource was already fetched, placed from: {} ({}).", loggingPrefix, resourceKind, fetchedResourcePath, placementMethod.value)
+                return FetchOutcome.LINKED
+            else:
+                self.logger.log_verbose("{} Failed to link the already fetched {} resource.", loggingPrefix, resourceKind)
+
+        try:
+            fetchOutcome = self._obtain_resource(session, loggingPrefix, resourceKind, resourceUrls, expectedChecksum, filePath, conditionalHeaders)
+        except:
+            self.resourceRegistry.release(resourceKey)
+            raise
+
+        if fetchOutcome == None:
+            self.resourceRegistry.release(resourceKey)
+            return None
+
+        self.resourceRegistry.register(resourceKey, filePath)
+        return fetchOutcome
+
+    # Restore the resource from the artifact bundle or cache or stream the remote resource to a temporary file, verify the checksum and move it into place, the return value is the way the resource was written or None if it was skipped due to the force build flag.
+    # When the conditional headers are specified the existing resource file is revalidated instead, it is kept if the server responds that the resource did not change.
+    def _obtain_resource(self, session: requests.Session, loggingPrefix: str, resourceKind: str, resourceUrls: list[str], expectedChecksum: str, filePath: str, conditionalHeaders: Optional[dict] = None) -> Optional[FetchOutcome]:
+        resourceName = loggingPrefix.strip('()')
+        resourceKey = (resourceUrls[0], expectedChecksum)
+        isRevalidation = conditionalHeaders != None
+
+        # NOTE: The artifact bundle and cache can only tell if the content matching the checksum is available, they can not tell if the remote resource changed
+        if self.artifactBundle != None and not isRevalidation:
+            with self.trace.measure('bundle-restore', resourceName) as bundleEvent:
+                resourceRestored = self.artifactBundle.restore(expectedChecksum, filePath)
+                bundleEvent.bytes = os.path.getsize(filePath) if resourceRestored else 0
+                bundleEvent.attributes['hit'] = resourceRestored
+
+            if resourceRestored:
+                self.logger.log_verbose("{} The {} resource restored from the artifact bundle.", loggingPrefix, resourceKind)
+                return FetchOutcome.BUNDLED
+            else:
+                self.logger.log_verbose("{} The {} resource is not present in the artifact bundle.", loggingPrefix, resourceKind)
 
-            calculatedChecksum = calculate_resource_checksum(resourceResult.content)
-            if calculatedChecksum != self.modpackData.api.checksum:
-                self.logger.log_verbose("{} The expected and calculated checksums are not matching.".format(apiLoggingPrefix))
-                raise ModpackBuilderException("The expected and calculated checksums are not matching.")
+        if self.artifactCache != None and not isRevalidation:
+            with self.trace.measure('cache-restore', resourceName) as cacheEvent:
+                resourceRestored = self.artifactCache.restore(expectedChecksum, filePath)
+                cacheEvent.bytes = os.path.getsize(filePath) if resourceRestored else 0
+                cacheEvent.attributes['hit'] = resourceRestored
+
+            if resourceRestored:
+                self.logger.log_verbose("{} The {} resource restored from the artifact cache.", loggingPrefix, resourceKind)
+                return FetchOutcome.CACHED
             else:
-                self.logger.log_verbose("{} Checksums are matching. Verification succeed.".format(apiLoggingPrefix))
+                self.logger.log_verbose("{} The {} resource is not present in the artifact cache.", loggingPrefix, resourceKind)
 
-        self.logger.log_verbose("{} Preparing modding api resource file name and path.".format(apiLoggingPrefix))
-        apiFileName = parse_remote_resource_file_name(self.modpackData.api.name, self.modpackData.version, self.modpackData.api.resourceUrl)
-        apiFilePath = os.path.join(buildDirectory, apiFileName)
-            
-        self.logger.log_verbose("{} Preparing modding api resource file.".format(apiLoggingPrefix))
-        with open(apiFilePath, 'wb') as apiFile:
-            self.logger.log_verbose("{} Writing downloaded modding api resource content to file.".format(apiLoggingPrefix))
-            apiFile.write(resourceResult.content)
+        downloadResult = self._download_resource(session, loggingPrefix, resourceKind, resourceUrls, expectedChecksum, conditionalHeaders)
+        if downloadResult.is_not_modified():
+            self.logger.log_verbose("{} The remote {} resource did not change, keeping the existing file.", loggingPrefix, resourceKind)
+            previousEntityTag, previousLastModified = self.resourceValidators.get(resourceKey, (None, None))
+            self.resourceValidators[resourceKey] = (downloadResult.entityTag or previousEntityTag, downloadResult.lastModified or previousLastModified)
+            return FetchOutcome.NOT_MODIFIED
 
-        self.logger.log_success("Modding api resource: {} downloaded successful.".format(self.modpackData.api.name.strip()))
+        if not downloadResult.succeeded():
+            self.logger.log_verbose("{} Force build flag is enabled, skipping operations on the {}.", loggingPrefix, resourceKind)
+            return None
 
-        self.logger.log_verbose("Creating mods directory.")
-        modsDirectory = os.path.join(buildDirectory, "mods")
-        if not create_directory(modsDirectory):
-            self.logger.log_verbose("Failed to create mods directory: {}.".format(modsDirectory))
-            raise ModpackBuilderException("Failed to create mods directory.")
-        else:
-            self.logger.log_verbose("Mods directory created.")
+        self.resourceValidators[resourceKey] = (downloadResult.entityTag, downloadResult.lastModified)
 
-        for mod in self.modpackData.mods:
-            modLoggingPrefix = "({})".format(mod.name.strip())
+        if self.artifactCache != None:
+            with self.trace.measure('cache-store', resourceName, bytes=downloadResult.size):
+                resourceStored = self.artifactCache.store(downloadResult.checksum, downloadResult.temporaryFilePath)
 
-            if self.buildTarget == ModpackTarget.CLIENT and not mod.includeClient:
-                self.logger.log_verbose("{} Skipping the mod. Current build target is CLIENT and the mod has been flagged for exclusion from the CLIENT.".format(modLoggingPrefix))
-                continue
+            if resourceStored:
+                self.logger.log_verbose("{} The {} resource stored in the artifact cache.", loggingPrefix, resourceKind)
+            else:
+                self.logger.log_verbose("{} Failed to store the {} resource in the artifact cache.", loggingPrefix, resourceKind)
+
+        # NOTE: The temporary file is located in the build directory, so the rename is atomic and a partial resource never appears under the target path
+        self.logger.log_verbose("{} Moving downloaded {} resource file into place.", loggingPrefix, resourceKind)
+        try:
+            os.replace(downloadResult.temporaryFilePath, filePath)
+        except OSError:
+            discard_temporary_file(downloadResult.temporaryFilePath)
+            self.logger.log_verbose("{} Failed to move the {} resource file to: {}.", loggingPrefix, resourceKind, filePath)
+            raise ModpackBuilderException("Failed to write the resource file.")
+
+        return FetchOutcome.DOWNLOADED
+
+    # Download the resource from the best responsive URL and verify its checksum, the next URL is tried if the download fails or the content does not match the checksum.
+    # The returned result is either the verified (or not modified) resource or a failure ignored due to the force build flag, the other failures raise an exception.
+    def _download_resource(self, session: requests.Session, loggingPrefix: str, resourceKind: str, resourceUrls: list[str], expectedChecksum: str, conditionalHeaders: Optional[dict]) -> DownloadResult:
+        resourceName = loggingPrefix.strip('()')
+        if len(resourceUrls) > 1:
+            probeStartTime = time.perf_counter()
+            probedHosts = self.mirrorSelector.probe(session, resourceUrls, self.options.jobs)
+            for host, latency in probedHosts.items():
+                self.trace.record('probe', host, latency if latency != None else time.perf_counter() - probeStartTime, resource=resourceName, responding=latency != None)
+                if latency != None:
+                    self.logger.log_verbose("{} The mirror host: {} responded in: {:.3f}s.", loggingPrefix, host, latency)
+                else:
+                    self.logger.log_verbose("{} The mirror host: {} is not responding.", loggingPrefix, host)
 
-            if self.buildTarget == ModpackTarget.SERVER and not mod.includeServer:
-                self.logger.log_verbose("{} Skipping the mod. Current build target is SERVER and the mod has been flagged for exclusion from the SERVER.".format(modLoggingPrefix))
-                continue
+            resourceUrls = self.mirrorSelector.order_urls(resourceUrls)
+
+        for mirrorIndex, resourceUrl in enumerate(resourceUrls):
+            isLastMirror = mirrorIndex == len(resourceUrls) - 1
+
+            self.logger.log_verbose("{} Starting to download the remote {} resource from: {}.", loggingPrefix, resourceKind, resourceUrl)
+            downloadResult = download_resource(session, resourceUrl, self.buildDirectory, self.retryPolicy if isLastMirror else self.mirrorRetryPolicy, self.logger, loggingPrefix, conditionalHeaders, self.bandwidthLimiter)
+            self.trace.record('download', resourceName, downloadResult.elapsedTime - downloadResult.hashTime, downloadResult.size, host=urlparse(resourceUrl).netloc, statusCode=downloadResult.statusCode, attempts=downloadResult.attempts, resumedBytes=downloadResult.resumedBytes)
+            if downloadResult.hashTime > 0:
+                self.trace.record('hash', resourceName, downloadResult.hashTime, downloadResult.size)
+
+            if downloadResult.is_not_modified():
+                self.mirrorSelector.record_success(resourceUrl, downloadResult.responseTime)
+                return downloadResult
+
+            if not downloadResult.succeeded():
+                self.mirrorSelector.record_failure(resourceUrl)
+                if downloadResult.failureReason != None:
+                    self.logger.log_verbose("{} The download failed after: {} attempts, the last failure: {}.", loggingPrefix, downloadResult.attempts, downloadResult.failureReason)
+
+                if not isLastMirror:
+                    self.logger.log_verbose("{} The download from: {} failed with a: {} status code, failing over to the next mirror.", loggingPrefix, resourceUrl, downloadResult.statusCode)
+                    continue
 
-            self.logger.log_verbose("{} Starting to download the remote mod resource.".format(modLoggingPrefix))
-            resourceResult = requests.get(mod.resourceUrl, headers=HTTP_HEADERS)
-            if resourceResult.status_code != 200:
                 if self.options.forceBuild:
-                    self.logger.log_verbose("Force build flag is enabled, skipping operations on the current mod.")
-                    continue;
+                    return downloadResult
+                elif downloadResult.statusCode == 0:
+                    raise ModpackBuilderException("The requested resource could not be downloaded due to connection failures.")
                 else:
-                    self.logger.log_verbose("{} The request returned a: {} status code.".format(modLoggingPrefix, resourceResult.status_code))
+                    self.logger.log_verbose("{} The request returned a: {} status code.", loggingPrefix, downloadResult.statusCode)
                     raise ModpackBuilderException("The requested resource returned a non-2** status code.")
-                
-            self.logger.log_verbose("{} Remote mod resource downloaded successful.".format(modLoggingPrefix))
-            
+
+            self.mirrorSelector.record_success(resourceUrl, downloadResult.responseTime)
+            self.logger.log_verbose("{} Remote {} resource downloaded successful ({} bytes in {:.2f}s, {} attempts, {} bytes resumed).", loggingPrefix, resourceKind, downloadResult.size, downloadResult.elapsedTime, downloadResult.attempts, downloadResult.resumedBytes)
+
             if self.options.skipChecksum:
-                self.logger.log_verbose("{} Checksum verification skipped due to the builder options.".format(modLoggingPrefix))
+                self.logger.log_verbose("{} Checksum verification skipped due to the builder options.", loggingPrefix)
+                return downloadResult
+
+            # NOTE: The checksum is the source of truth for the content, a mirror serving different content is treated as a failed mirror
+            self.logger.log_verbose("{} Starting checksum verification.", loggingPrefix)
+            if downloadResult.checksum == expectedChecksum.strip().lower():
+                self.logger.log_verbose("{} Checksums are matching. Verification succeed.", loggingPrefix)
+                return downloadResult
+
+            self.logger.log_verbose("{} The expected and calculated checksums are not matching.", loggingPrefix)
+            discard_temporary_file(downloadResult.temporaryFilePath)
+            self.mirrorSelector.record_failure(resourceUrl)
+            if isLastMirror:
+                raise ModpackBuilderException("The expected and calculated checksums are not matching.")
+
+            self.logger.log_verbose("{} The content downloaded from: {} is not matching the checksum, failing over to the next mirror.", loggingPrefix, resourceUrl)
+
+    # Copy the config files of the mod into the build directory, the config files which source content did not change since the previous build are skipped
+    def _copy_mod_config_files(self, mod: Mod, buildDirectory: str) -> None:
+        modLoggingPrefix = "({})".format(mod.name.strip())
+
+        self.logger.log_verbose("{} Starting to copy mod resource config files.", modLoggingPrefix)
+        for configFile in mod.configFiles:
+            self._copy_config_file(mod, configFile, buildDirectory, True)
+
+    # Get the path of the config file source, the source path is relative to the modpack file location
+    def _get_config_source_path(self, configFile: ModConfigFile) -> Path:
+        modpackConfigPath = str(Path(self.modpackFilePath).parent)
+        return Path(os.path.join(modpackConfigPath, configFile.sourcePath))
+
+    # Copy a single config file of the mod into the build directory and record it in the build manifest, the file is skipped if requested and its source content did not change since the previous build
+    def _copy_config_file(self, mod: Mod, configFile: ModConfigFile, buildDirectory: str, skipUpToDate: bool) -> None:
+        modLoggingPrefix = "({})".format(mod.name.strip())
+
+        self.logger.log_verbose("{} Preparing source config file: {}.", modLoggingPrefix, configFile.sourcePath)
+        fullSourcePath = self._get_config_source_path(configFile)
+        if not fullSourcePath.is_file():
+            if self.options.forceBuild:
+                self.logger.log_verbose("{} The mod config source path does not exists but the force flag is set. Skipping the config file.", modLoggingPrefix)
+                return
             else:
-                self.logger.log_verbose("{} Starting checksum verification.".format(modLoggingPrefix))
+                raise ModpackBuilderException("The mod config file path does not exist.")
+
+        self.logger.log_verbose("{} Preparing destination config file: {}.", modLoggingPrefix, configFile.destinationPath)
+        destinationPath = Path(configFile.destinationPath)
+        manifestDestinationPath = destinationPath.as_posix()
+        fullDestinationPath = Path(os.path.join(buildDirectory, str(destinationPath.parent)))
+        fullDestinationFilePath = os.path.join(fullDestinationPath, destinationPath.name)
+
+        sourceChecksum = calculate_file_checksum(fullSourcePath)
+        previousConfigEntry = self.previousManifest.configFiles.get(manifestDestinationPath) if self.previousManifest is not None else None
+
+        # NOTE: The destination may have been written by an earlier config file in this build, so the previous entry is only trusted if no other entry claimed the path yet
+        if skipUpToDate and manifestDestinationPath not in self.buildManifest.configFiles and is_config_file_up_to_date(buildDirectory, previousConfigEntry, configFile.sourcePath, sourceChecksum, manifestDestinationPath):
+            self.logger.log_verbose("{} The config file is up to date, skipping the copy.", modLoggingPrefix)
+            self.buildManifest.configFiles[manifestDestinationPath] = previousConfigEntry
+            return
+
+        fullDestinationPath.mkdir(parents=True, exist_ok=True)
+
+        self.logger.log_verbose("{} Starting to copy the config file.", modLoggingPrefix)
+        # NOTE: The config files are never hardlinked, a change made to the built config file would change the source file as well
+        with self.trace.measure('config', manifestDestinationPath, mod=mod.name) as configEvent:
+            placementMethod = place_file(fullSourcePath, fullDestinationFilePath, False)
+            configEvent.bytes = os.path.getsize(fullDestinationFilePath) if placementMethod != None else 0
+            configEvent.attributes['method'] = placementMethod.value if placementMethod != None else None
+
+        if placementMethod == None:
+            self.logger.log_verbose("{} Failed to copy config file from: {} to: {}.", modLoggingPrefix, fullSourcePath, fullDestinationFilePath)
+            raise ModpackBuilderException("Failed to copy config file.")
+        else:
+            self.logger.log_verbose("{} Config file copied successfully ({}).", modLoggingPrefix, placementMethod.value)
+
+        self.buildManifest.configFiles[manifestDestinationPath] = ManifestConfigFile(sourcePath=configFile.sourcePath, sourceChecksum=sourceChecksum, size=os.path.getsize(fullDestinationFilePath))
+
+    # Get the absolute paths of the config file sources of all mods, used to watch the sources for changes
+    def get_config_source_paths(self) -> set[str]:
+        return set(os.path.abspath(self._get_config_source_path(configFile)) for mod in self.modpackData.mods for configFile in mod.configFiles)
+
+    # Copy the config files which sources changed into the existing build directories of the selected build targets without running the whole build, the return value is the number of copied config files.
+    # The config files sharing the destination path with a changed config file are copied again as well (in the modpack file order), so the result is the same as after a full build.
+    def update_config_files(self, changedSourcePaths: set[str]) -> int:
+        copiedCount = 0
+        for buildTarget in self.buildTargets:
+            self.buildTarget = buildTarget
+            buildDirectory = get_build_directory(self.modpackData.name, self.modpackData.version, buildTarget)
+            manifest = load_build_manifest(buildDirectory)
+            if manifest is None:
+                self.logger.log_verbose("The build directory: {} has no build manifest.", buildDirectory)
+                raise ModpackBuilderException("The modpack has to be built before its config files can be updated.")
+
+            self.buildDirectory = buildDirectory
+            self.previousManifest = manifest
+            self.buildManifest = manifest
+
+            # NOTE: The config files of the mods which are not part of the build (excluded from the target or skipped due to the force build flag) are not copied
+            configFiles = [ (mod, configFile) for mod in self.modpackData.mods if mod.name in manifest.mods and self._is_mod_included(mod) for configFile in mod.configFiles ]
+            changedDestinationPaths = set(Path(configFile.destinationPath).as_posix() for _, configFile in configFiles if os.path.abspath(self._get_config_source_path(configFile)) in changedSourcePaths)
+            if len(changedDestinationPaths) == 0:
+                continue
 
-                calculatedChecksum = calculate_resource_checksum(resourceResult.content)
-                if calculatedChecksum != mod.checksum:
-                    self.logger.log_verbose("{} The expected and calculated checksums are not matching.".format(modLoggingPrefix))
-                    raise ModpackBuilderException("The expected and calculated checksums are not matching.")
-                else:
-                    self.logger.log_verbose("{} Checksums are matching. Verification succeed.".format(modLoggingPrefix))
-
-            self.logger.log_verbose("{} Preparing mod resource file name and path.".format(modLoggingPrefix))
-            modFileName = parse_remote_resource_file_name(mod.name, self.modpackData.version, mod.resourceUrl)
-            modFilePath = os.path.join(modsDirectory, modFileName)
-            
-            self.logger.log_verbose("{} Preparing mod resource file.".format(modLoggingPrefix))
-            with open(modFilePath, 'wb') as modFile:
-                self.logger.log_verbose("{} Writing downloaded mod resource content to file.".format(modLoggingPrefix))
-                modFile.write(resourceResult.content)
-
-            self.logger.log_success("Mod resource: {} downloaded successful.".format(mod.name.strip()))
-
-            self.logger.log_verbose("{} Starting to copy mod resource config files.".format(modLoggingPrefix))
-            for configFile in mod.configFiles:
-                self.logger.log_verbose("{} Preparing source config file: {}.".format(modLoggingPrefix, configFile.sourcePath))
-                modpackConfigPath = str(Path(self.modpackFilePath).parent)          
-                fullSourcePath = Path(os.path.join(modpackConfigPath, configFile.sourcePath))
-                if not fullSourcePath.exists() and not fullSourcePath.is_file():
-                    if self.options.forceBuild:
-                        self.logger.log_verbose("{} The mod config source path does not exists bu the force flag is set. Skipping the config file.")
-                    else:
-                        raise ModpackBuilderException("The mod config file path does not exist.")
-
-                self.logger.log_verbose("{} Preparing destination config file: {}.".format(modLoggingPrefix, configFile.destinationPath))
-                destinationPath = Path(configFile.destinationPath)
-                fullDestinationPath = Path(os.path.join(buildDirectory, str(destinationPath.parent)))
-                fullDestinationPath.mkdir(parents=True, exist_ok=True)
-                fullDestinationFilePath = os.path.join(fullDestinationPath, destinationPath.name)
-
-                self.logger.log_verbose("{} Starting to copy the config file.".format(modLoggingPrefix))
-                if not copy_file(fullSourcePath, fullDestinationFilePath):
-                    self.logger.log_verbose("{} Failed to copy config file from: {} to: {}.".format(modLoggingPrefix, fullSourcePath, fullDestinationFilePath))
-                    raise ModpackBuilderException("Failed to copy config file.")
-                else:
-                    self.logger.log_verbose("{} Config file copied successfully.".format(modLoggingPrefix))
-                
-        self.logger.log_success("Modpack: {} ({}) build process finished.".format(self.modpackData.name.strip(), self.buildTarget))
+            for mod, configFile in configFiles:
+                if Path(configFile.destinationPath).as_posix() in changedDestinationPaths:
+                    self._copy_config_file(mod, configFile, buildDirectory, False)
+                    copiedCount += 1
 
-        if self.options.packToZip:
-            self.logger.log_verbose("Starting to packing build directory to zip archive.")
-            archiveName = "{}.zip".format(buildDirectory)
-            put_directory_into_archive(buildDirectory, archiveName)
-            self.logger.log_verbose("Packing build directory to zip archive succeed.")
+            with self.trace.measure('manifest', buildTarget.value):
+                manifestSaved = save_build_manifest(buildDirectory, manifest)
+
+            if not manifestSaved:
+                self.logger.log_verbose("Failed to write the build manifest to: {}.", get_manifest_path(buildDirectory))
+                raise ModpackBuilderException("Failed to write the build manifest.")
+
+            self.logger.log_success("Modpack: {} ({}) config files updated: {}.".format(self.modpackData.name.strip(), buildTarget.value, ", ".join(sorted(changedDestinationPaths))))
+
+            if self.options.packToZip:
+                self._pack_build_directory(buildDirectory)
+
+        return copiedCount
+
+    # Verify the existing build directories of the selected build targets against the modpack checksums without rebuilding them, the jar files are hashed in parallel by the specified number of processes (all cores by default).
+    # The return Boolean value is indicating if all build directories are matching the modpack, the missing, extra and corrupted files are logged.
+    def verify(self, jobs: Optional[int] = None) -> bool:
+        buildValid = True
+        for buildTarget in self.buildTargets:
+            self.buildTarget = buildTarget
+            buildDirectory = get_build_directory(self.modpackData.name, self.modpackData.version, buildTarget)
+            self.logger.log_success("Modpack: {} ({}) verification started.".format(self.modpackData.name.strip(), buildTarget.value))
+
+            expectedFiles = get_expected_build_files(self.modpackData, buildTarget, load_build_manifest(buildDirectory))
+
+            try:
+                with self.trace.measure('verify', buildTarget.value) as verifyEvent:
+                    verificationResult = verify_build_directory(buildDirectory, expectedFiles, jobs)
+                    verifyEvent.bytes = verificationResult.verifiedBytes
+            except VerifyException as exception:
+                self.logger.log_verbose("Verification of the build directory: {} failed: {}.", buildDirectory, exception)
+                raise ModpackBuilderException("The build directory does not exist.")
+
+            for filePath in verificationResult.missingFiles:
+                self.logger.log_failure("Missing file: {}.".format(filePath))
+            for filePath in verificationResult.corruptedFiles:
+                self.logger.log_failure("Corrupted file: {}.".format(filePath))
+            for filePath in verificationResult.extraFiles:
+                self.logger.log_failure("Extra file: {}.".format(filePath))
+
+            self.logger.log_verbose("Verified: {} files ({} bytes hashed) in {:.2f}s.", verificationResult.verifiedCount, verificationResult.verifiedBytes, verificationResult.elapsedTime)
+
+            if verificationResult.is_valid():
+                self.logger.log_success("Modpack: {} ({}) verification succeeded.".format(self.modpackData.name.strip(), buildTarget.value))
+            else:
+                self.logger.log_failure("Modpack: {} ({}) verification failed: {} missing, {} corrupted and {} extra files.".format(self.modpackData.name.strip(), buildTarget.value, len(verificationResult.missingFiles), len(verificationResult.corruptedFiles), len(verificationResult.extraFiles)))
+                buildValid = False
+
+        return buildValid
+
+    # Create the delta packages updating the base pack to the existing builds of the selected build targets, the base is either the build directory of the previous pack version (only for a single build target) or the previous modpack file.
+    # The delta package is written to the specified path or next to the build directory, the return value is the list of the written delta package paths.
+    def create_delta(self, basePath: str, deltaFilePath: Optional[str] = None) -> list[str]:
+        baseIsDirectory = os.path.isdir(basePath)
+        if (baseIsDirectory or deltaFilePath != None) and len(self.buildTargets) > 1:
+            raise ModpackBuilderException("The build target has to be specified to create a delta package from a build directory or to a specified path.")
+
+        baseModpack = None
+        if not baseIsDirectory:
+            try:
+                baseModpack = load_modpack(basePath)
+            except (ModpackLoaderException, OSError) as exception:
+                self.logger.log_verbose("Failed to load the base modpack file: {}: {}", basePath, exception)
+                raise ModpackBuilderException("The delta base must be a build directory or a valid modpack file.")
+
+        deltaFilePaths = []
+        for buildTarget in self.buildTargets:
+            buildDirectory = get_build_directory(self.modpackData.name, self.modpackData.version, buildTarget)
+            if load_build_manifest(buildDirectory) is None:
+                self.logger.log_verbose("The build directory: {} has no build manifest.", buildDirectory)
+                raise ModpackBuilderException("The modpack has to be built before a delta package can be created.")
+
+            targetDeltaFilePath = deltaFilePath if deltaFilePath != None else "{}-delta.zip".format(buildDirectory)
+            try:
+                with self.trace.measure('delta', buildTarget.value) as deltaEvent:
+                    # NOTE: The base modpack is compared by the mod checksums only, its config files have no known checksum and are always included in the package
+                    baseFiles = get_build_file_checksums(basePath, self.options.jobs) if baseIsDirectory else get_expected_build_files(baseModpack, buildTarget, None)
+                    deltaPackage = create_delta_package(baseFiles, buildDirectory, targetDeltaFilePath, self.options.jobs)
+                    deltaEvent.bytes = os.path.getsize(targetDeltaFilePath)
+            except (DeltaException, OSError) as exception:
+                self.logger.log_verbose("Failed to create the delta package: {}: {}", targetDeltaFilePath, exception)
+                raise ModpackBuilderException("Failed to create the delta package.")
+
+            packSize = sum(os.path.getsize(os.path.join(buildDirectory, filePath)) for filePath in deltaPackage.files)
+            self.logger.log_success("Modpack: {} ({}) delta package: {} written, {} added or changed and {} removed files, {} bytes instead of {} bytes of the full pack.".format(self.modpackData.name.strip(), buildTarget.value, targetDeltaFilePath, len(deltaPackage.changedFiles), len(deltaPackage.removedFiles), deltaEvent.bytes, packSize))
+            deltaFilePaths.append(targetDeltaFilePath)
+
+        return deltaFilePaths
+
+    # Serve the existing build of the selected build target over HTTP until the process is interrupted, the files are indexed by their checksums (taken from the build manifest where possible) when the server starts.
+    # The clients can fetch the index of the files with their checksums, use the conditional and range requests and receive the text config files compressed with gzip.
+    def serve(self, address: tuple[str, int], workers: int = DEFAULT_SERVE_WORKERS) -> None:
+        if len(self.buildTargets) > 1:
+            raise ModpackBuilderException("The build target has to be specified to serve the build.")
+
+        buildDirectory = get_build_directory(self.modpackData.name, self.modpackData.version, self.buildTarget)
+        if load_build_manifest(buildDirectory) is None:
+            self.logger.log_verbose("The build directory: {} has no build manifest.", buildDirectory)
+            raise ModpackBuilderException("The modpack has to be built before it can be served.")
+
+        try:
+            with self.trace.measure('serve-index', self.buildTarget.value):
+                packIndex = PackIndex(buildDirectory, self.options.jobs)
+            server = PackServer(address, packIndex, self.logger, workers)
+        except (DeltaException, ServeException, OSError) as exception:
+            self.logger.log_verbose("Failed to start serving the build directory: {}: {}", buildDirectory, exception)
+            raise ModpackBuilderException("Failed to start the pack server.")
+
+        self.logger.log_success("Modpack: {} ({}) served at: {} ({} files), press Ctrl+C to stop.".format(self.modpackData.name.strip(), self.buildTarget.value, server.get_base_url(), len(packIndex.files)))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.logger.log_info("Serving stopped, {} responses and {} bytes sent.".format(server.requestCount, server.servedBytes))
+        finally:
+            server.server_close()
 
     # Start the interpretation process of the parsed mod pack instruction file
     def install(self, useDevInstructions: bool) -> None:
-        self.logger.log_success("Modpack: {} ({}) installation process started.".format(self.modpackData.name.strip(), self.buildTarget))
+        self.logger.log_success("Modpack: {} ({}) installation process started.".format(self.modpackData.name.strip(), ", ".join(target.value for target in self.buildTargets)))
         
         instructions = None
         if useDevInstructions:
@@ -269,35 +977,34 @@ class ModpackBuilder:
         if instructions == None:
             raise ModpackBuilderException("The installation rules are not specified.")
 
+        syncOptions = SyncOptions(self.options.installMode, self.options.installChecksum, self.options.installHardlinks, self.options.jobs)
+        self.logger.log_verbose("Using the: {} installation synchronization mode.", syncOptions.mode.value)
+
         for instruction in instructions:
-            sourcePath = Path(instruction.sourcePath)
+            sourcePath = Path(instruction.sourcePath).expanduser()
             if not sourcePath.exists():
                 raise ModpackBuilderException("The installation source file/directory path does not exist.")
-                        
-            # TODO: We can use various strategies for cp.
-            #
-            # 1. Copy the files only if the dir structure exists
-            # 2. Create the directory tree and cp files
-            # 3. Create the directory tree and remove old files and paste the new ones
-            
-            destinationPath = Path(instruction.destinationPath)
-            if sourcePath.is_file():
-                self.logger.log_verbose("Starting the installation of the file source: {}.".format(instruction.sourcePath))
-                if not copy_file(sourcePath, destinationPath):
-                    self.logger.log_verbose("Installation of the file source: {} failed.".format(instruction.sourcePath))
-                    raise ModpackBuilderException("Installation of the file source failed.")
-                else:
-                   self.logger.log_verbose("Installation of the file source: {} succeeded.".format(instruction.sourcePath)) 
-            elif sourcePath.is_dir():
-                self.logger.log_verbose("Starting the installation of the directory tree source: {}.".format(instruction.sourcePath))
-                if not copy_file_tree(sourcePath, destinationPath):    
-                    self.logger.log_verbose("Installation of the directory tree source: {} failed.".format(instruction.sourcePath))
-                    raise ModpackBuilderException("Installation of the directory tree source failed")
-                else:
-                    self.logger.log_verbose("Installation of the directory tree source: {} succeeded.".format(instruction.sourcePath))
-            else:
+
+            if not sourcePath.is_file() and not sourcePath.is_dir():
                 raise ModpackBuilderException("Can not determine the source type.")
 
-        self.logger.log_success("Modpack: {} ({}) installation process finished.".format(self.modpackData.name.strip(), self.buildTarget))
+            sourceType = "file" if sourcePath.is_file() else "directory tree"
+            destinationPath = Path(instruction.destinationPath).expanduser()
+
+            self.logger.log_verbose("Starting the installation of the {} source: {}.", sourceType, instruction.sourcePath)
+            try:
+                with self.trace.measure('install', instruction.sourcePath) as installEvent:
+                    syncResult = synchronize(str(sourcePath), str(destinationPath), syncOptions)
+                    installEvent.bytes = syncResult.copiedBytes
+                    installEvent.attributes.update(copied=syncResult.copiedCount, skipped=syncResult.skippedCount, removed=syncResult.removedCount, placements=dict(syncResult.placementCounts))
+            except (SyncException, OSError) as exception:
+                self.logger.log_verbose("Installation of the {} source: {} failed: {}.", sourceType, instruction.sourcePath, exception)
+                raise ModpackBuilderException("Installation of the {} source failed.".format(sourceType))
+
+            self.logger.log_verbose("Installation of the {} source: {} succeeded ({} files copied, {} bytes, {} files unchanged, {} files removed).", sourceType, instruction.sourcePath, syncResult.copiedCount, syncResult.copiedBytes, syncResult.skippedCount, syncResult.removedCount)
+            if len(syncResult.placementCounts) > 0:
+                self.logger.log_verbose("Installed files placed by: {}.", syncResult.placementCounts)
+
+        self.logger.log_success("Modpack: {} ({}) installation process finished.".format(self.modpackData.name.strip(), ", ".join(target.value for target in self.buildTargets)))
 
-__all__ = [ 'ModpackBuilderException', 'ModpackBuilderOptions', 'ModpackBuilder', 'InitializeNewModpack' ]
\ No newline at end of file
+__all__ = [ 'ModpackBuilderException', 'ModpackBuilderOptions', 'FetchOutcome', 'ModpackBuilder', 'get_build_directory', 'get_expected_build_files' ]
\ No newline at end of file
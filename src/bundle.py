@@ -0,0 +1,159 @@
+import hashlib
+import mmap
+import os
+import struct
+from typing import Optional
+
+from file import atomic_write
+
+# The magic bytes identifying the artifact bundle file
+BUNDLE_MAGIC = b'BONCLOKB'
+
+# The version of the bundle file structure, bundles with a different version are rejected
+BUNDLE_FORMAT_VERSION = 1
+
+# The bundle header: the magic bytes, the format version and the number of entries
+BUNDLE_HEADER_FORMAT = struct.Struct('<8sII')
+
+# The index entry following the header: the raw SHA-256 digest of the artifact, the offset of its content in the bundle file and its size.
+# The entries have a fixed size and are sorted by the digest, so an entry is found with a binary search over the mapped index without reading the whole index.
+BUNDLE_INDEX_ENTRY_FORMAT = struct.Struct('<32sQQ')
+
+# The size of the chunks in which the artifacts are copied into and out of the bundle
+BUNDLE_CHUNK_SIZE = 1024 * 1024
+
+# The prefix of the temporary files created while writing the bundle or restoring the artifacts
+BUNDLE_TEMPORARY_FILE_PREFIX = '.bonclok-bundle-'
+
+# Exception base class implementation used to raise artifact bundle related exceptions
+class BundleException(Exception):
+    def __init__(self, message: str = "Unexpected artifact bundle failure."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Helper function used to convert the hexadecimal checksum to the raw digest stored in the index, None is returned for an invalid checksum
+def get_checksum_digest(checksum: str) -> Optional[bytes]:
+    if checksum == None:
+        return None
+
+    try:
+        digest = bytes.fromhex(checksum.strip())
+    except ValueError:
+        return None
+
+    return digest if len(digest) == 32 else None
+
+# Write the artifacts indexed by their SHA-256 checksum into a single bundle file, the content of every artifact is verified against its checksum while it is copied.
+# The bundle is written to a temporary file and renamed, so a partial bundle never appears under the target path, the return value is the number of bytes of the written artifacts.
+def write_artifact_bundle(bundleFilePath: str, artifactPaths: dict[str, str]) -> int:
+    artifacts = []
+    for checksum, artifactPath in artifactPaths.items():
+        digest = get_checksum_digest(checksum)
+        if digest == None:
+            raise BundleException("Invalid artifact checksum: {}.".format(checksum))
+
+        artifacts.append((digest, artifactPath, os.path.getsize(artifactPath)))
+
+    artifacts.sort()
+
+    with atomic_write(bundleFilePath, 'wb', BUNDLE_TEMPORARY_FILE_PREFIX) as bundleFile:
+        bundleFile.write(BUNDLE_HEADER_FORMAT.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(artifacts)))
+
+        # NOTE: The offsets are known up front from the artifact sizes, so the index is written once before the content
+        offset = BUNDLE_HEADER_FORMAT.size + BUNDLE_INDEX_ENTRY_FORMAT.size * len(artifacts)
+        for digest, _, size in artifacts:
+            bundleFile.write(BUNDLE_INDEX_ENTRY_FORMAT.pack(digest, offset, size))
+            offset += size
+
+        for digest, artifactPath, size in artifacts:
+            sha256 = hashlib.sha256()
+            copiedSize = 0
+            with open(artifactPath, 'rb') as artifactFile:
+                while True:
+                    chunk = artifactFile.read(BUNDLE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    sha256.update(chunk)
+                    bundleFile.write(chunk)
+                    copiedSize += len(chunk)
+
+            if copiedSize != size or sha256.digest() != digest:
+                raise BundleException("The artifact: {} does not match its checksum.".format(artifactPath))
+
+    return sum(size for _, _, size in artifacts)
+
+# Class used to read the artifacts from the bundle file, the file is memory mapped and the artifacts are located through the sorted index in its header
+class ArtifactBundle():
+    def __init__(self, bundleFilePath: str):
+        self.bundleFilePath = bundleFilePath
+        try:
+            with open(bundleFilePath, 'rb') as bundleFile:
+                self.bundleSize = os.fstat(bundleFile.fileno()).st_size
+                if self.bundleSize < BUNDLE_HEADER_FORMAT.size:
+                    raise BundleException("The artifact bundle: {} is not a valid bundle file.".format(bundleFilePath))
+
+                self.mappedBundle = mmap.mmap(bundleFile.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as exception:
+            raise BundleException("The artifact bundle: {} can not be read: {}".format(bundleFilePath, exception))
+
+        magic, formatVersion, self.entryCount = BUNDLE_HEADER_FORMAT.unpack_from(self.mappedBundle, 0)
+        if magic != BUNDLE_MAGIC or formatVersion != BUNDLE_FORMAT_VERSION or BUNDLE_HEADER_FORMAT.size + BUNDLE_INDEX_ENTRY_FORMAT.size * self.entryCount > self.bundleSize:
+            self.close()
+            raise BundleException("The artifact bundle: {} is not a valid bundle file or has an unsupported version.".format(bundleFilePath))
+
+    # Close the memory map of the bundle file
+    def close(self) -> None:
+        self.mappedBundle.close()
+
+    # Get the offset and size of the artifact content in the bundle file, None is returned if the bundle does not contain the artifact
+    def get_entry(self, checksum: str) -> Optional[tuple[int, int]]:
+        digest = get_checksum_digest(checksum)
+        if digest == None:
+            return None
+
+        lowIndex, highIndex = 0, self.entryCount
+        while lowIndex < highIndex:
+            middleIndex = (lowIndex + highIndex) // 2
+            entryDigest, offset, size = BUNDLE_INDEX_ENTRY_FORMAT.unpack_from(self.mappedBundle, BUNDLE_HEADER_FORMAT.size + BUNDLE_INDEX_ENTRY_FORMAT.size * middleIndex)
+            if entryDigest == digest:
+                return (offset, size) if offset + size <= self.bundleSize else None
+            elif entryDigest < digest:
+                lowIndex = middleIndex + 1
+            else:
+                highIndex = middleIndex
+
+        return None
+
+    # Check if the bundle contains the artifact with the specified checksum
+    def contains(self, checksum: str) -> bool:
+        return self.get_entry(checksum) != None
+
+    # Copy the artifact content to the target path, the return Boolean value is indicating if the artifact was found and its content is matching the checksum
+    def restore(self, checksum: str, targetPath: str) -> bool:
+        entry = self.get_entry(checksum)
+        if entry == None:
+            return False
+
+        offset, size = entry
+        try:
+            with atomic_write(targetPath, 'wb', BUNDLE_TEMPORARY_FILE_PREFIX) as targetFile, memoryview(self.mappedBundle) as mappedContent:
+                # NOTE: The content is hashed and written straight from the memory map, so it is not copied into the process memory
+                sha256 = hashlib.sha256()
+                for chunkOffset in range(offset, offset + size, BUNDLE_CHUNK_SIZE):
+                    with mappedContent[chunkOffset:min(chunkOffset + BUNDLE_CHUNK_SIZE, offset + size)] as chunk:
+                        sha256.update(chunk)
+                        targetFile.write(chunk)
+
+                # NOTE: The exception discards the temporary file, so the corrupted content never replaces the target file
+                if sha256.hexdigest() != checksum.strip().lower():
+                    raise BundleException("The artifact: {} does not match its checksum.".format(checksum))
+
+            return True
+        except (OSError, BundleException):
+            return False
+
+__all__ = [ 'BundleException', 'ArtifactBundle', 'write_artifact_bundle' ]
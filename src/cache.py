@@ -0,0 +1,145 @@
+import os
+import tempfile
+import threading
+from typing import Optional
+from file import calculate_file_checksum, place_file
+
+# The default maximum size of the cache directory (in megabytes)
+DEFAULT_CACHE_MAX_SIZE_MB = 4096
+
+# The prefix of the temporary files created while storing or restoring cached artifacts
+CACHE_TEMPORARY_FILE_PREFIX = '.bonclok-cache-'
+
+# Helper function used to resolve the default cache directory path, the XDG_CACHE_HOME variable is respected if present
+def get_default_cache_directory() -> str:
+    cacheHome = os.environ.get('XDG_CACHE_HOME')
+    if cacheHome == None or len(cacheHome) == 0:
+        cacheHome = os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(cacheHome, 'bonclok', 'artifacts')
+
+# Helper function used to copy the file without a hardlink (the cache entries must not share the metadata with the build files) and return the SHA-256 checksum of the copied content, None is returned if the copy failed
+def copy_file_with_checksum(sourcePath: str, destinationPath: str) -> Optional[str]:
+    if place_file(sourcePath, destinationPath, False) == None:
+        return None
+
+    return calculate_file_checksum(destinationPath)
+
+# Class used to store downloaded artifacts on disk using their SHA-256 checksum as the key, the least recently used artifacts are evicted when the size limit is exceeded
+class ArtifactCache:
+    def __init__(self, cacheDirectory: str, maxSizeBytes: int):
+        self.cacheDirectory = cacheDirectory
+        self.maxSizeBytes = maxSizeBytes
+        self.trimLock = threading.Lock()
+
+        os.makedirs(self.cacheDirectory, exist_ok=True)
+
+    # Get the path of the cache entry for the specified checksum, the entries are sharded by the first two characters of the checksum
+    def get_entry_path(self, checksum: str) -> str:
+        normalizedChecksum = checksum.strip().lower()
+        return os.path.join(self.cacheDirectory, normalizedChecksum[:2], normalizedChecksum)
+
+    # Check if an artifact with the specified checksum is cached
+    def contains(self, checksum: str) -> bool:
+        if checksum == None or len(checksum.strip()) == 0:
+            return False
+
+        return os.path.isfile(self.get_entry_path(checksum))
+
+    # Copy the cached artifact to the target path, the return Boolean value is indicating if the artifact was found and its content is matching the checksum
+    def restore(self, checksum: str, targetPath: str) -> bool:
+        if not self.contains(checksum):
+            return False
+
+        entryPath = self.get_entry_path(checksum)
+        fileDescriptor, temporaryFilePath = tempfile.mkstemp(prefix=CACHE_TEMPORARY_FILE_PREFIX, dir=os.path.dirname(os.path.abspath(targetPath)))
+        os.close(fileDescriptor)
+        try:
+            # NOTE: The content is verified on every hit, a corrupted entry is removed and reported as a miss
+            restoredChecksum = copy_file_with_checksum(entryPath, temporaryFilePath)
+            if restoredChecksum != checksum.strip().lower():
+                if restoredChecksum != None:
+                    self._remove_entry(entryPath)
+                os.remove(temporaryFilePath)
+                return False
+
+            os.replace(temporaryFilePath, targetPath)
+        except OSError:
+            if os.path.exists(temporaryFilePath):
+                os.remove(temporaryFilePath)
+            return False
+
+        # NOTE: The modification time is used as the last access time by the LRU eviction
+        try:
+            os.utime(entryPath)
+        except OSError:
+            pass
+
+        return True
+
+    # Copy the artifact file into the cache under the specified checksum, the return Boolean value is indicating if the artifact was stored
+    def store(self, checksum: str, sourcePath: str) -> bool:
+        if checksum == None or len(checksum.strip()) == 0:
+            return False
+
+        if self.contains(checksum):
+            return True
+
+        entryPath = self.get_entry_path(checksum)
+        temporaryFilePath = None
+        try:
+            os.makedirs(os.path.dirname(entryPath), exist_ok=True)
+
+            fileDescriptor, temporaryFilePath = tempfile.mkstemp(prefix=CACHE_TEMPORARY_FILE_PREFIX, dir=os.path.dirname(entryPath))
+            os.close(fileDescriptor)
+
+            if copy_file_with_checksum(sourcePath, temporaryFilePath) != checksum.strip().lower():
+                os.remove(temporaryFilePath)
+                return False
+
+            os.replace(temporaryFilePath, entryPath)
+            return True
+        except OSError:
+            if temporaryFilePath != None and os.path.exists(temporaryFilePath):
+                os.remove(temporaryFilePath)
+            return False
+
+    # Evict the least recently used entries until the total size of the cache is below the limit, the return value is the number of evicted entries
+    def trim(self) -> int:
+        with self.trimLock:
+            entries = []
+            totalSize = 0
+            for dirName, _, files in os.walk(self.cacheDirectory):
+                for fileName in files:
+                    if fileName.startswith(CACHE_TEMPORARY_FILE_PREFIX):
+                        continue
+
+                    entryPath = os.path.join(dirName, fileName)
+                    try:
+                        entryStat = os.stat(entryPath)
+                    except OSError:
+                        continue
+
+                    entries.append((entryStat.st_mtime, entryStat.st_size, entryPath))
+                    totalSize += entryStat.st_size
+
+            evictedCount = 0
+            for _, entrySize, entryPath in sorted(entries):
+                if totalSize <= self.maxSizeBytes:
+                    break
+
+                if self._remove_entry(entryPath):
+                    totalSize -= entrySize
+                    evictedCount += 1
+
+            return evictedCount
+
+    # Remove a single cache entry, the return Boolean value is indicating if the operation succeeded
+    def _remove_entry(self, entryPath: str) -> bool:
+        try:
+            os.remove(entryPath)
+            return True
+        except OSError:
+            return False
+
+__all__ = [ 'DEFAULT_CACHE_MAX_SIZE_MB', 'ArtifactCache', 'get_default_cache_directory' ]
@@ -0,0 +1,209 @@
+import json
+import os
+import posixpath
+import shutil
+import stat
+import time
+from typing import Any, Optional
+from zipfile import BadZipFile, ZipFile
+
+from archive import ARCHIVE_READ_CHUNK_SIZE, ArchiveEntry, put_entries_into_archive
+from file import create_temporary_file, remove_file
+from manifest import load_build_manifest
+from models import ModelValidationException, check_object, read_field, read_list_field
+from verify import VerificationResult, calculate_file_checksums, collect_build_files, verify_build_directory
+
+# The name of the delta package metadata entry, the builder internal prefix keeps it apart from the pack files
+DELTA_METADATA_NAME = '.bonclok-delta.json'
+
+# The version of the delta package metadata structure, packages with a different version are rejected
+DELTA_FORMAT_VERSION = 1
+
+# The prefix of the temporary files holding the extracted pack files until all of them are written
+DELTA_TEMPORARY_FILE_PREFIX = '.bonclok-delta-'
+
+# Exception base class implementation used to raise delta package related exceptions
+class DeltaException(Exception):
+    def __init__(self, message: str = "Unexpected delta package failure."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Helper function used to read a single file path item of the delta package metadata, the paths escaping the pack directory are rejected
+def read_pack_path_item(item: Any, location: str) -> str:
+    if type(item) is not str or not is_pack_path_valid(item):
+        raise ModelValidationException("{}: the value must be a relative file path.".format(location))
+
+    return item
+
+# Check if the file path (using "/" separators) is relative and stays inside the pack directory
+def is_pack_path_valid(filePath: str) -> bool:
+    normalizedPath = posixpath.normpath(filePath)
+    return len(filePath) > 0 and '\\' not in filePath and not posixpath.isabs(filePath) and normalizedPath == filePath and normalizedPath != '..' and not normalizedPath.startswith('../')
+
+# Class that is representing the metadata of the delta package: the checksums of all files of the updated pack, the files stored in the package (added or changed) and the files to remove
+class DeltaPackage():
+    __slots__ = ('formatVersion', 'files', 'changedFiles', 'removedFiles')
+
+    def __init__(self, files: dict[str, str], changedFiles: list[str], removedFiles: list[str], formatVersion: int = DELTA_FORMAT_VERSION):
+        self.formatVersion = formatVersion
+        self.files = files
+        self.changedFiles = changedFiles
+        self.removedFiles = removedFiles
+
+    # Convert the record to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        return { 'formatVersion': self.formatVersion, 'files': self.files, 'changedFiles': self.changedFiles, 'removedFiles': self.removedFiles }
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any) -> 'DeltaPackage':
+        location = 'delta'
+        check_object(data, location)
+
+        files = read_field(data, 'files', dict, location)
+        for filePath, checksum in files.items():
+            read_pack_path_item(filePath, "{}.files".format(location))
+            if type(checksum) is not str:
+                raise ModelValidationException("{}.files[{}]: the value must be of the string type.".format(location, filePath))
+
+        return DeltaPackage(
+            files,
+            read_list_field(data, 'changedFiles', location, read_pack_path_item),
+            read_list_field(data, 'removedFiles', location, read_pack_path_item),
+            read_field(data, 'formatVersion', int, location))
+
+# Class used to store the statistics of an applied delta package together with the verification of the updated pack
+class DeltaApplyResult():
+    def __init__(self):
+        self.writtenCount = 0
+        self.writtenBytes = 0
+        self.removedCount = 0
+        self.verification: Optional[VerificationResult] = None
+        self.elapsedTime = 0.0
+
+    # Check if all files of the updated pack are present and match their checksums, the files which are not part of the pack are allowed
+    def is_valid(self) -> bool:
+        return self.verification != None and len(self.verification.missingFiles) == 0 and len(self.verification.corruptedFiles) == 0
+
+# Get the checksums of the files of the build directory indexed by the path relative to it (using "/" separators), the checksums recorded by the build manifest are used for the files which size matches the manifest.
+# The remaining files are hashed in parallel by the specified number of worker processes, the builder internal files are skipped.
+def get_build_file_checksums(buildDirectory: str, jobs: Optional[int] = None) -> dict[str, str]:
+    if not os.path.isdir(buildDirectory):
+        raise DeltaException("The build directory: {} does not exist.".format(buildDirectory))
+
+    recordedFiles = {}
+    manifest = load_build_manifest(buildDirectory)
+    if manifest is not None:
+        resources = list(manifest.mods.values()) + ([ manifest.api ] if manifest.api is not None else [])
+        recordedFiles.update((entry.filePath, (entry.checksum.strip().lower(), entry.size)) for entry in resources)
+        # NOTE: The config files are copied without changes, so the content checksum is the checksum of the source
+        recordedFiles.update((filePath, (entry.sourceChecksum, entry.size)) for filePath, entry in manifest.configFiles.items())
+
+    fileChecksums = {}
+    hashedFilePaths = []
+    for filePath in sorted(collect_build_files(buildDirectory)):
+        recordedChecksum, recordedSize = recordedFiles.get(filePath, (None, None))
+        if recordedChecksum != None and os.path.getsize(os.path.join(buildDirectory, filePath)) == recordedSize:
+            fileChecksums[filePath] = recordedChecksum
+        else:
+            hashedFilePaths.append(filePath)
+
+    for filePath, (checksum, _) in zip(hashedFilePaths, calculate_file_checksums([ os.path.join(buildDirectory, filePath) for filePath in hashedFilePaths ], jobs)):
+        if checksum == None:
+            raise DeltaException("The build file: {} can not be read.".format(filePath))
+
+        fileChecksums[filePath] = checksum
+
+    return fileChecksums
+
+# Compare the files of the base pack and the updated pack, the return value is the sorted list of the added or changed files and the sorted list of the removed files.
+# The base files without a known checksum (None) are always treated as changed.
+def compare_pack_files(baseFiles: dict[str, Optional[str]], updatedFiles: dict[str, str]) -> tuple[list[str], list[str]]:
+    changedFiles = sorted(filePath for filePath, checksum in updatedFiles.items() if baseFiles.get(filePath) == None or baseFiles[filePath].strip().lower() != checksum)
+    removedFiles = sorted(filePath for filePath in baseFiles if filePath not in updatedFiles)
+    return changedFiles, removedFiles
+
+# Create the delta package updating the base pack to the pack in the build directory, the package is a .zip archive of the added and changed files and the metadata with the removal list and the checksums of the updated pack.
+# The base pack is described by the checksums of its files indexed by the path relative to the pack directory, the returned metadata describes the written package.
+def create_delta_package(baseFiles: dict[str, Optional[str]], buildDirectory: str, deltaFilePath: str, jobs: Optional[int] = None) -> DeltaPackage:
+    updatedFiles = get_build_file_checksums(buildDirectory, jobs)
+    changedFiles, removedFiles = compare_pack_files(baseFiles, updatedFiles)
+    deltaPackage = DeltaPackage(updatedFiles, changedFiles, removedFiles)
+
+    fileDescriptor, metadataFilePath = create_temporary_file(os.path.dirname(os.path.abspath(deltaFilePath)), DELTA_TEMPORARY_FILE_PREFIX, '.json')
+    try:
+        with os.fdopen(fileDescriptor, 'w') as metadataFile:
+            json.dump(deltaPackage.to_dict(), metadataFile, sort_keys=True, separators=(',', ':'))
+
+        # NOTE: The metadata is the first entry, so the apply step can read it without seeking through the pack files
+        entries = [ ArchiveEntry(DELTA_METADATA_NAME, metadataFilePath, False) ]
+        entries.extend(ArchiveEntry(filePath, os.path.join(buildDirectory, filePath), False) for filePath in changedFiles)
+        put_entries_into_archive(entries, deltaFilePath, jobs)
+    finally:
+        remove_file(metadataFilePath)
+
+    return deltaPackage
+
+# Read the metadata of the delta package
+def load_delta_package(deltaArchive: ZipFile) -> DeltaPackage:
+    try:
+        deltaPackage = DeltaPackage.from_dict(json.loads(deltaArchive.read(DELTA_METADATA_NAME)))
+    except KeyError:
+        raise DeltaException("The delta package has no metadata.")
+    except (ValueError, ModelValidationException) as exception:
+        raise DeltaException("The delta package metadata is invalid: {}".format(exception))
+
+    if deltaPackage.formatVersion != DELTA_FORMAT_VERSION:
+        raise DeltaException("The delta package format version: {} is not supported.".format(deltaPackage.formatVersion))
+
+    return deltaPackage
+
+# Apply the delta package to the installed pack directory in place and verify the checksums of all files of the updated pack afterwards, the verification is performed by the specified number of worker processes.
+# The added and changed files are extracted to temporary files next to their destination first and moved into place only after all of them were extracted, so a failed extraction leaves the installed pack untouched.
+def apply_delta_package(deltaFilePath: str, packDirectory: str, jobs: Optional[int] = None) -> DeltaApplyResult:
+    if not os.path.isdir(packDirectory):
+        raise DeltaException("The pack directory: {} does not exist.".format(packDirectory))
+
+    startTime = time.monotonic()
+    result = DeltaApplyResult()
+    extractedFiles: list[tuple[str, str]] = []
+    try:
+        with ZipFile(deltaFilePath, 'r') as deltaArchive:
+            deltaPackage = load_delta_package(deltaArchive)
+            for filePath in deltaPackage.changedFiles:
+                destinationPath = os.path.join(packDirectory, *filePath.split('/'))
+                os.makedirs(os.path.dirname(destinationPath), exist_ok=True)
+
+                fileDescriptor, temporaryFilePath = create_temporary_file(os.path.dirname(destinationPath), DELTA_TEMPORARY_FILE_PREFIX)
+                extractedFiles.append((temporaryFilePath, destinationPath))
+                with os.fdopen(fileDescriptor, 'wb') as temporaryFile, deltaArchive.open(filePath) as entryFile:
+                    # NOTE: A replaced file keeps its permissions, the added files get the default permissions of the new files
+                    if os.path.isfile(destinationPath):
+                        os.chmod(temporaryFilePath, stat.S_IMODE(os.stat(destinationPath).st_mode))
+
+                    shutil.copyfileobj(entryFile, temporaryFile, ARCHIVE_READ_CHUNK_SIZE)
+                    result.writtenBytes += temporaryFile.tell()
+
+        for temporaryFilePath, destinationPath in extractedFiles:
+            os.replace(temporaryFilePath, destinationPath)
+            result.writtenCount += 1
+    except (BadZipFile, KeyError, OSError) as exception:
+        raise DeltaException("Failed to extract the delta package: {}".format(exception))
+    finally:
+        for temporaryFilePath, _ in extractedFiles:
+            remove_file(temporaryFilePath)
+
+    for filePath in deltaPackage.removedFiles:
+        if not remove_file(os.path.join(packDirectory, *filePath.split('/'))):
+            raise DeltaException("Failed to remove the file: {}.".format(filePath))
+
+        result.removedCount += 1
+
+    result.verification = verify_build_directory(packDirectory, deltaPackage.files, jobs)
+    result.elapsedTime = time.monotonic() - startTime
+    return result
+
+__all__ = [ 'DELTA_METADATA_NAME', 'DeltaException', 'DeltaPackage', 'DeltaApplyResult', 'get_build_file_checksums', 'compare_pack_files', 'create_delta_package', 'apply_delta_package' ]
@@ -0,0 +1,258 @@
+from collections import OrderedDict
+import hashlib
+import os
+import random
+import re
+import time
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from logger import Logger
+from file import create_temporary_file
+from scheduler import BandwidthLimiter
+
+HTTP_HEADERS: OrderedDict = OrderedDict({
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36",
+})
+
+# The number of distinct hosts for which the session keeps a connection pool
+HTTP_POOLED_HOSTS_COUNT = 16
+
+# The size of the chunks in which the resource content is streamed to the file
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# The prefix and suffix of the temporary files holding the partially downloaded resources
+TEMPORARY_FILE_PREFIX = '.bonclok-'
+TEMPORARY_FILE_SUFFIX = '.part'
+
+# The connect and read timeouts (in seconds) of the resource requests, a stalled connection is treated as a transient error
+DOWNLOAD_TIMEOUT = (15, 60)
+
+# The HTTP status codes which are considered transient and are retried
+RETRYABLE_STATUS_CODES = frozenset([ 408, 425, 429, 500, 502, 503, 504 ])
+
+# The default number of retries and the base and maximum backoff delays (in seconds)
+DEFAULT_DOWNLOAD_RETRIES = 5
+DEFAULT_RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 60.0
+
+# Class used to store the result of a resource download, the file path and checksum are only set for successful downloads
+class DownloadResult():
+    def __init__(self, statusCode: int, temporaryFilePath: str = None, checksum: str = None, size: int = 0, attempts: int = 1, resumedBytes: int = 0, elapsedTime: float = 0.0, failureReason: str = None, hashTime: float = 0.0, entityTag: str = None, lastModified: str = None, responseTime: float = 0.0, notModified: bool = False):
+        self.statusCode = statusCode
+        self.temporaryFilePath = temporaryFilePath
+        self.checksum = checksum
+        self.size = size
+        self.attempts = attempts
+        self.resumedBytes = resumedBytes
+        self.elapsedTime = elapsedTime
+        self.failureReason = failureReason
+        self.hashTime = hashTime
+        self.entityTag = entityTag
+        self.lastModified = lastModified
+        self.responseTime = responseTime
+        self.notModified = notModified
+
+    # Check if the resource content was downloaded
+    def succeeded(self) -> bool:
+        return self.statusCode in (200, 206) and self.temporaryFilePath != None
+
+    # Check if the server confirmed that the resource did not change since the validators sent in the conditional request were obtained, a 304 response to an unconditional request is a failure
+    def is_not_modified(self) -> bool:
+        return self.notModified
+
+# Class used to store the retry options, the delay before each retry grows exponentially and is randomized (full jitter) to avoid synchronized retries of the workers
+class RetryPolicy():
+    def __init__(self, maxRetries: int = DEFAULT_DOWNLOAD_RETRIES, backoffBase: float = DEFAULT_RETRY_BACKOFF, backoffMax: float = MAX_RETRY_BACKOFF):
+        self.maxRetries = maxRetries
+        self.backoffBase = backoffBase
+        self.backoffMax = backoffMax
+
+    # Get the delay (in seconds) before the specified retry, the retry index starts from zero
+    def get_delay(self, retryIndex: int) -> float:
+        return random.uniform(0, min(self.backoffMax, self.backoffBase * (2 ** retryIndex)))
+
+# Class used to store the partially downloaded content in the temporary file together with the state of the incremental checksum
+class PartialDownload():
+    def __init__(self, temporaryDirectory: str):
+        # NOTE: The temporary file is moved into place once the download is verified, so it is created with the permissions of the final resource file
+        fileDescriptor, self.temporaryFilePath = create_temporary_file(temporaryDirectory, TEMPORARY_FILE_PREFIX, TEMPORARY_FILE_SUFFIX)
+        self.temporaryFile = os.fdopen(fileDescriptor, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.hashTime = 0.0
+
+    # Append the chunk of content to the temporary file and update the checksum, the time spent on hashing is measured separately from the transfer
+    def append(self, chunk: bytes) -> None:
+        hashStartTime = time.perf_counter()
+        self.sha256.update(chunk)
+        self.hashTime += time.perf_counter() - hashStartTime
+        self.temporaryFile.write(chunk)
+        self.size += len(chunk)
+
+    # Drop the content downloaded so far and start from the beginning of the file
+    def restart(self) -> None:
+        self.temporaryFile.seek(0)
+        self.temporaryFile.truncate()
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    # Close the temporary file, the content is kept on disk
+    def close(self) -> None:
+        self.temporaryFile.close()
+
+    # Close and remove the temporary file
+    def discard(self) -> None:
+        self.temporaryFile.close()
+        discard_temporary_file(self.temporaryFilePath)
+
+# Helper function used to get the start offset of the returned content from the Content-Range header, None is returned if the header is missing or invalid
+def parse_content_range_start(response: requests.Response) -> Optional[int]:
+    contentRange = response.headers.get('Content-Range', '')
+    match = re.match(r'^bytes (\d+)-\d+/(\d+|\*)$', contentRange.strip())
+    if match == None:
+        return None
+
+    return int(match.group(1))
+
+# Helper function used to get the validator sent in the If-Range header, the weak entity tags can not be used for range requests
+def get_range_validator(response: requests.Response) -> Optional[str]:
+    entityTag = response.headers.get('ETag')
+    if entityTag != None and not entityTag.startswith('W/'):
+        return entityTag
+
+    return response.headers.get('Last-Modified')
+
+# Helper function used to create the conditional request headers out of the validators stored by the previous download, the server responds with 304 if the resource did not change
+def get_conditional_headers(entityTag: Optional[str], lastModified: Optional[str]) -> dict:
+    headers = {}
+    if entityTag != None:
+        headers['If-None-Match'] = entityTag
+
+    # NOTE: The servers ignore the If-Modified-Since header when the If-None-Match header is present, it is only sent for the resources without the entity tag
+    elif lastModified != None:
+        headers['If-Modified-Since'] = lastModified
+
+    return headers
+
+# Create a HTTP session with a single connection pool shared by all download workers, the connections opened to a single host are capped by the specified limit
+def create_http_session(maxConnectionsPerHost: int) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+
+    # NOTE: The blocking pool makes the workers wait for a free connection instead of opening additional ones above the per host limit
+    adapter = HTTPAdapter(pool_connections=HTTP_POOLED_HOSTS_COUNT, pool_maxsize=maxConnectionsPerHost, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+# Stream the remote resource in chunks to a temporary file in the specified directory and calculate the SHA-256 checksum of the content as it arrives.
+# The transient failures are retried according to the retry policy and, if the server supports it, the download is resumed from the last received byte using a Range request.
+# The conditional headers are sent with the requests which are not resuming the download, a 304 response is returned as a result without the temporary file.
+# The received chunks are accounted by the bandwidth limiter (if specified), which slows the download down when the shared bandwidth budget is exceeded.
+def download_resource(session: requests.Session, resourceUrl: str, temporaryDirectory: str, retryPolicy: RetryPolicy = None, logger: Logger = None, loggingPrefix: str = '', conditionalHeaders: dict = None, bandwidthLimiter: BandwidthLimiter = None) -> DownloadResult:
+    if retryPolicy == None:
+        retryPolicy = RetryPolicy(maxRetries=0)
+
+    startTime = time.monotonic()
+    partialDownload = PartialDownload(temporaryDirectory)
+    rangeSupported = False
+    rangeValidator = None
+    entityTag = None
+    lastModified = None
+    resumedBytes = 0
+    responseTime = 0.0
+    statusCode = 0
+    attempt = 0
+
+    try:
+        while True:
+            attempt += 1
+            failureReason = None
+
+            headers = {}
+            isResumeRequest = rangeSupported and partialDownload.size > 0
+            if isResumeRequest:
+                headers['Range'] = 'bytes={}-'.format(partialDownload.size)
+                if rangeValidator != None:
+                    headers['If-Range'] = rangeValidator
+            elif conditionalHeaders != None:
+                headers.update(conditionalHeaders)
+
+            try:
+                requestStartTime = time.monotonic()
+                with session.get(resourceUrl, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                    responseTime = time.monotonic() - requestStartTime
+                    statusCode = response.status_code
+
+                    if statusCode == 206 and isResumeRequest and parse_content_range_start(response) == partialDownload.size:
+                        if logger != None:
+                            logger.log_verbose("{} Resuming the download from byte: {}.", loggingPrefix, partialDownload.size)
+                        resumedBytes += partialDownload.size
+                    elif statusCode == 200:
+                        if partialDownload.size > 0:
+                            if logger != None:
+                                logger.log_verbose("{} The server returned the full content, restarting the download.", loggingPrefix)
+                            partialDownload.restart()
+
+                        # NOTE: The received content is decoded by requests, so the byte offsets only match the server representation if no content encoding is applied
+                        contentEncoding = response.headers.get('Content-Encoding', 'identity').strip().lower()
+                        rangeSupported = response.headers.get('Accept-Ranges', '').strip().lower() == 'bytes' and contentEncoding == 'identity'
+                        rangeValidator = get_range_validator(response)
+                        entityTag = response.headers.get('ETag')
+                        lastModified = response.headers.get('Last-Modified')
+                    elif statusCode == 304 and not isResumeRequest and conditionalHeaders:
+                        partialDownload.discard()
+                        return DownloadResult(statusCode, attempts=attempt, elapsedTime=time.monotonic() - startTime, entityTag=response.headers.get('ETag'), lastModified=response.headers.get('Last-Modified'), responseTime=responseTime, notModified=True)
+                    elif statusCode in RETRYABLE_STATUS_CODES:
+                        failureReason = "the request returned a: {} status code".format(statusCode)
+                    elif statusCode in (206, 416):
+                        rangeSupported = False
+                        partialDownload.restart()
+                        failureReason = "the server returned an invalid range response"
+                    else:
+                        partialDownload.discard()
+                        return DownloadResult(statusCode, attempts=attempt, elapsedTime=time.monotonic() - startTime, responseTime=responseTime)
+
+                    if failureReason == None:
+                        expectedLength = response.headers.get('Content-Length') if 'Content-Encoding' not in response.headers else None
+                        receivedLength = 0
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            partialDownload.append(chunk)
+                            receivedLength += len(chunk)
+                            if bandwidthLimiter != None:
+                                bandwidthLimiter.consume(len(chunk))
+
+                        if expectedLength != None and expectedLength.isdigit() and int(expectedLength) != receivedLength:
+                            failureReason = "the connection was closed after: {} of: {} bytes".format(receivedLength, expectedLength)
+                        else:
+                            partialDownload.close()
+                            return DownloadResult(statusCode, partialDownload.temporaryFilePath, partialDownload.sha256.hexdigest(), partialDownload.size, attempt, resumedBytes, time.monotonic() - startTime, hashTime=partialDownload.hashTime, entityTag=entityTag, lastModified=lastModified, responseTime=responseTime)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as exception:
+                failureReason = "{}: {}".format(type(exception).__name__, exception)
+
+            if attempt > retryPolicy.maxRetries:
+                break
+
+            retryDelay = retryPolicy.get_delay(attempt - 1)
+            if logger != None:
+                logger.log_verbose("{} Download attempt: {} failed ({}), retrying in: {:.2f}s with: {} bytes received.", loggingPrefix, attempt, failureReason, retryDelay, partialDownload.size)
+            time.sleep(retryDelay)
+    except:
+        partialDownload.discard()
+        raise
+
+    partialDownload.discard()
+    return DownloadResult(statusCode, attempts=attempt, elapsedTime=time.monotonic() - startTime, failureReason=failureReason, responseTime=responseTime)
+
+# Remove the temporary file of a download that is not going to be used
+def discard_temporary_file(temporaryFilePath: str) -> None:
+    try:
+        os.remove(temporaryFilePath)
+    except FileNotFoundError:
+        pass
+
+__all__ = [ 'HTTP_HEADERS', 'DEFAULT_DOWNLOAD_RETRIES', 'DEFAULT_RETRY_BACKOFF', 'DownloadResult', 'RetryPolicy', 'create_http_session', 'get_conditional_headers', 'download_resource', 'discard_temporary_file' ]
@@ -1,30 +1,190 @@
+from contextlib import contextmanager
+from enum import Enum
+import hashlib
 import os
 import shutil
+import sys
+import tempfile
+from typing import IO, Iterator, Optional
 
-# Copy the file from the specified source path to destination path, the return Boolean value is indicating if the operation succeeded.
-def copy_file(sourcePath: str, destinationPath: str) -> bool:
+# The Linux ioctl request number used to create a copy-on-write clone of a file (reflink)
+FICLONE = 0x40049409
+
+# The size of the chunks in which the files are read while calculating the checksum
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+# The maximum number of bytes copied by a single copy_file_range call
+COPY_RANGE_CHUNK_SIZE = 1024 * 1024 * 1024
+
+# The prefix of the temporary files created next to the placed files
+PLACE_TEMPORARY_FILE_PREFIX = '.bonclok-place-'
+
+# The permissions requested for the new files before the process umask is applied, the same as the default of the open() function
+NEW_FILE_MODE = 0o666
+
+# Helper function used to read the file mode creation mask of the process, the mask is read from the process status on Linux, so it is not changed even for a moment while other threads may create files
+def get_process_umask() -> int:
+    try:
+        with open('/proc/self/status', 'r') as statusFile:
+            for line in statusFile:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+# The permissions of a regular new file under the umask the process was started with
+DEFAULT_FILE_MODE = NEW_FILE_MODE & ~get_process_umask()
+
+# Enum class that is representing the method used to place a file at the destination, the methods are ordered from the cheapest one
+class PlacementMethod(str, Enum):
+    # The destination is another link of the source file, no data is written
+    HARDLINK = 'hardlink'
+    # The destination is a copy-on-write clone sharing the data blocks with the source file
+    REFLINK = 'reflink'
+    # The data is copied inside the kernel without passing through the user space
+    COPY_RANGE = 'copy-range'
+    # The data is copied by the standard library (which uses sendfile where the platform supports it)
+    COPY = 'copy'
+
+# Remove the file at the specified target path, the return Boolean value is indicating if the operation succeeded.
+def remove_file_tree(targetPath: str) -> bool:
     try:
-        shutil.copy(sourcePath, destinationPath)
+        shutil.rmtree(targetPath)
         return True
     except:
         return False
 
-# Copy the file/directory tree from the specified source path to destination path, the return Boolean value is indicating if the operation succeeded.
-def copy_file_tree(sourcePath: str, destinationPath: str) -> bool:
+# Create a copy-on-write clone (reflink) of the source file at the destination path, the return Boolean value is indicating if the filesystem supports the operation.
+def reflink_file(sourcePath: str, destinationPath: str) -> bool:
+    if not sys.platform.startswith('linux'):
+        return False
+
+    import fcntl
+
     try:
-        shutil.copytree(sourcePath, destinationPath)
+        with open(sourcePath, 'rb') as sourceFile, open(destinationPath, 'wb') as destinationFile:
+            fcntl.ioctl(destinationFile.fileno(), FICLONE, sourceFile.fileno())
         return True
-    except:
+    except OSError:
+        remove_file(destinationPath)
+        return False
+
+# Copy the file content inside the kernel using copy_file_range, the return Boolean value is indicating if the platform and the filesystems support the operation.
+def copy_file_range(sourcePath: str, destinationPath: str) -> bool:
+    if not hasattr(os, 'copy_file_range'):
         return False
 
-# Remove the file at the specified target path, the return Boolean value is indicating if the operation succeeded.
-def remove_file_tree(targetPath: str) -> bool:
     try:
-        shutil.rmtree(targetPath)
+        with open(sourcePath, 'rb') as sourceFile, open(destinationPath, 'wb') as destinationFile:
+            remainingBytes = os.fstat(sourceFile.fileno()).st_size
+            while remainingBytes > 0:
+                copiedBytes = os.copy_file_range(sourceFile.fileno(), destinationFile.fileno(), min(remainingBytes, COPY_RANGE_CHUNK_SIZE))
+                if copiedBytes == 0:
+                    break
+
+                remainingBytes -= copiedBytes
+
+        # NOTE: Some pseudo filesystems report a zero length copy instead of an error, the regular copy is used for them
+        if remainingBytes > 0:
+            remove_file(destinationPath)
+            return False
+
+        return True
+    except OSError:
+        remove_file(destinationPath)
+        return False
+
+# Place the file at the destination path using the cheapest method supported by the filesystems: a hardlink (if allowed), a reflink, an in-kernel copy or a regular copy, an existing destination file is replaced.
+# The copies keep the metadata of the source file, the return value is the used method or None if the operation failed.
+def place_file(sourcePath: str, destinationPath: str, allowHardlink: bool = True) -> Optional[PlacementMethod]:
+    # NOTE: The temporary file is a sibling of the destination using the common prefix of the temporary files, so it is never mistaken for a pack file
+    temporaryPath = os.path.join(os.path.dirname(os.path.abspath(destinationPath)), PLACE_TEMPORARY_FILE_PREFIX + os.path.basename(destinationPath))
+    try:
+        # NOTE: Renaming a hardlink over another link of the same file does nothing, so the temporary link would be left behind
+        if allowHardlink and os.path.exists(destinationPath) and os.path.samefile(sourcePath, destinationPath):
+            return PlacementMethod.HARDLINK
+
+        remove_file(temporaryPath)
+
+        placementMethod = None
+        if allowHardlink:
+            try:
+                os.link(sourcePath, temporaryPath)
+                placementMethod = PlacementMethod.HARDLINK
+            except OSError:
+                pass
+
+        if placementMethod == None:
+            if reflink_file(sourcePath, temporaryPath):
+                placementMethod = PlacementMethod.REFLINK
+            elif copy_file_range(sourcePath, temporaryPath):
+                placementMethod = PlacementMethod.COPY_RANGE
+            else:
+                shutil.copyfile(sourcePath, temporaryPath)
+                placementMethod = PlacementMethod.COPY
+
+            shutil.copystat(sourcePath, temporaryPath)
+
+        os.replace(temporaryPath, destinationPath)
+        return placementMethod
+    except:
+        remove_file(temporaryPath)
+        return None
+
+# Remove the file at the specified target path, a missing file is not considered a failure, the return Boolean value is indicating if the operation succeeded.
+def remove_file(targetPath: str) -> bool:
+    try:
+        os.remove(targetPath)
+        return True
+    except FileNotFoundError:
         return True
     except:
         return False
 
+# Calculate the SHA-256 checksum of the file content and return the hexadecimal representation of the hash.
+def calculate_file_checksum(filePath: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(filePath, 'rb') as targetFile:
+        while True:
+            chunk = targetFile.read(CHECKSUM_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+# Create a temporary file in the specified directory with the permissions of a regular new file (mkstemp creates the files readable only by their owner), so the file moved into place is readable the same as a file created by open().
+# The return value is the file descriptor opened for writing and the path to the temporary file.
+def create_temporary_file(directory: str, prefix: str, suffix: str = '') -> tuple[int, str]:
+    fileDescriptor, temporaryFilePath = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=directory)
+    try:
+        os.chmod(temporaryFilePath, DEFAULT_FILE_MODE)
+    except OSError:
+        os.close(fileDescriptor)
+        remove_file(temporaryFilePath)
+        raise
+
+    return fileDescriptor, temporaryFilePath
+
+# Write the file through a temporary file created next to it and renamed over the target path once the content is written, so a partial file never appears under the target path.
+# The written file has the permissions of a regular new file, the temporary file is removed if the writing fails.
+@contextmanager
+def atomic_write(targetPath: str, mode: str = 'wb', prefix: str = '.bonclok-', suffix: str = '') -> Iterator[IO]:
+    fileDescriptor, temporaryFilePath = create_temporary_file(os.path.dirname(os.path.abspath(targetPath)), prefix, suffix)
+    try:
+        with os.fdopen(fileDescriptor, mode) as temporaryFile:
+            yield temporaryFile
+
+        os.replace(temporaryFilePath, targetPath)
+    except:
+        remove_file(temporaryFilePath)
+        raise
+
 # Create a new directory at the specified target path, the return Boolean value is indicating if the operation succeeded.
 def create_directory(targetPath: str) -> bool:
     try:
@@ -33,4 +193,4 @@ def create_directory(targetPath: str) -> bool:
     except:
         return False
 
-__all__ = [ 'copy_file', 'copy_file_tree', 'remove_file_tree', 'create_directory' ] 
\ No newline at end of file
+__all__ = [ 'PlacementMethod', 'remove_file_tree', 'remove_file', 'reflink_file', 'copy_file_range', 'place_file', 'calculate_file_checksum', 'create_temporary_file', 'atomic_write', 'create_directory' ] 
\ No newline at end of file
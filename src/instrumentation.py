@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+import json
+import threading
+import time
+from typing import Iterator, Optional
+from file import atomic_write
+
+# The number of the slowest events listed in the summary table
+SUMMARY_SLOWEST_EVENTS_COUNT = 10
+
+# The phases which contain other measured operations, they are not listed among the slowest operations
+AGGREGATE_PHASES = frozenset([ 'target' ])
+
+# Class that is representing a single measured operation of the builder (download of a mod, copy of a config file, packing of the archive, ...)
+class TraceEvent():
+    __slots__ = ('phase', 'subject', 'startTime', 'duration', 'bytes', 'attributes')
+
+    def __init__(self, phase: str, subject: Optional[str], startTime: float, duration: float = 0.0, bytes: int = 0, attributes: dict = None):
+        self.phase = phase
+        self.subject = subject
+        self.startTime = startTime
+        self.duration = duration
+        self.bytes = bytes
+        self.attributes = attributes if attributes != None else {}
+
+    # Get the throughput of the operation in bytes per second, None is returned for operations without transferred bytes
+    def get_throughput(self) -> Optional[float]:
+        if self.bytes == 0 or self.duration <= 0:
+            return None
+
+        return self.bytes / self.duration
+
+    # Convert the event to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        return {
+            'phase': self.phase,
+            'subject': self.subject,
+            'start': self.startTime,
+            'duration': self.duration,
+            'bytes': self.bytes,
+            'throughput': self.get_throughput(),
+            'attributes': self.attributes,
+        }
+
+# Class used to record the durations and transferred bytes of the builder operations, the events can be recorded from multiple threads
+class BuildTrace():
+    def __init__(self):
+        self.events: list[TraceEvent] = []
+        self.eventsLock = threading.Lock()
+        self.originTime = time.perf_counter()
+        self.startedAt = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+    # Record an already measured operation, the start time is relative to the creation of the trace
+    def record(self, phase: str, subject: Optional[str], duration: float, bytes: int = 0, startTime: float = None, **attributes) -> TraceEvent:
+        if startTime == None:
+            startTime = time.perf_counter() - self.originTime - duration
+
+        event = TraceEvent(phase, subject, startTime, duration, bytes, attributes)
+        with self.eventsLock:
+            self.events.append(event)
+
+        return event
+
+    # Measure the duration of the operation executed in the context, the yielded event can be used to set the transferred bytes and attributes
+    @contextmanager
+    def measure(self, phase: str, subject: Optional[str] = None, **attributes) -> Iterator[TraceEvent]:
+        startTime = time.perf_counter()
+        event = TraceEvent(phase, subject, startTime - self.originTime, attributes=attributes)
+        try:
+            yield event
+        finally:
+            event.duration = time.perf_counter() - startTime
+            with self.eventsLock:
+                self.events.append(event)
+
+    # Copy the events of another trace into this trace, the start times are shifted to this trace and the attributes are added to every copied event
+    def extend(self, trace: 'BuildTrace', **attributes) -> None:
+        with trace.eventsLock:
+            events = list(trace.events)
+
+        timeOffset = trace.originTime - self.originTime
+        with self.eventsLock:
+            for event in events:
+                self.events.append(TraceEvent(event.phase, event.subject, event.startTime + timeOffset, event.duration, event.bytes, { **event.attributes, **attributes }))
+
+    # Get the total duration, bytes and throughput of every phase
+    def get_phase_summary(self) -> dict[str, dict]:
+        return self._summarize(lambda event: event.phase)
+
+    # Get the total duration, bytes and throughput of the downloads grouped by the host
+    def get_host_summary(self) -> dict[str, dict]:
+        return self._summarize(lambda event: event.attributes.get('host') if event.phase == 'download' else None)
+
+    # Get the events with the longest duration
+    def get_slowest_events(self, count: int = SUMMARY_SLOWEST_EVENTS_COUNT) -> list[TraceEvent]:
+        with self.eventsLock:
+            events = [ event for event in self.events if event.subject != None and event.phase not in AGGREGATE_PHASES ]
+
+        return sorted(events, key=lambda event: event.duration, reverse=True)[:count]
+
+    # Convert the trace to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        with self.eventsLock:
+            events = sorted(self.events, key=lambda event: event.startTime)
+
+        return {
+            'startedAt': self.startedAt,
+            'duration': time.perf_counter() - self.originTime,
+            'phases': self.get_phase_summary(),
+            'hosts': self.get_host_summary(),
+            'events': [ event.to_dict() for event in events ],
+        }
+
+    # Write the trace to the JSON file, the return Boolean value is indicating if the operation succeeded
+    def save(self, traceFilePath: str) -> bool:
+        try:
+            with atomic_write(traceFilePath, 'w', '.bonclok-trace-') as temporaryFile:
+                json.dump(self.to_dict(), temporaryFile, indent=2)
+
+            return True
+        except OSError:
+            return False
+
+    # Format the summary table of the phases, hosts and the slowest operations as a list of text lines
+    def format_summary_table(self) -> list[str]:
+        lines = [ "{:<16} {:>8} {:>11} {:>14} {:>12}".format('Phase', 'Count', 'Time (s)', 'Bytes', 'MB/s') ]
+        for phase, summary in sorted(self.get_phase_summary().items(), key=lambda item: item[1]['duration'], reverse=True):
+            lines.append(self._format_summary_row(phase, summary))
+
+        hostSummary = self.get_host_summary()
+        if len(hostSummary) > 0:
+            lines.append("{:<16} {:>8} {:>11} {:>14} {:>12}".format('Host', 'Count', 'Time (s)', 'Bytes', 'MB/s'))
+            for host, summary in sorted(hostSummary.items(), key=lambda item: item[1]['duration'], reverse=True):
+                lines.append(self._format_summary_row(host, summary))
+
+        slowestEvents = self.get_slowest_events()
+        if len(slowestEvents) > 0:
+            lines.append("Slowest operations:")
+            for event in slowestEvents:
+                throughput = event.get_throughput()
+                lines.append("{:>10.3f}s {:<10} {} {}".format(event.duration, event.phase, event.subject, "({:.2f} MB/s)".format(throughput / (1024 * 1024)) if throughput != None else ''))
+
+        return lines
+
+    def _format_summary_row(self, name: str, summary: dict) -> str:
+        throughput = summary['throughput']
+        return "{:<16} {:>8} {:>11.3f} {:>14} {:>12}".format(name[:16], summary['count'], summary['duration'], summary['bytes'], "{:.2f}".format(throughput / (1024 * 1024)) if throughput != None else '-')
+
+    def _summarize(self, get_key) -> dict[str, dict]:
+        with self.eventsLock:
+            events = list(self.events)
+
+        summary = {}
+        for event in events:
+            key = get_key(event)
+            if key == None:
+                continue
+
+            entry = summary.setdefault(key, { 'count': 0, 'duration': 0.0, 'bytes': 0, 'throughput': None })
+            entry['count'] += 1
+            entry['duration'] += event.duration
+            entry['bytes'] += event.bytes
+
+        for entry in summary.values():
+            if entry['bytes'] > 0 and entry['duration'] > 0:
+                entry['throughput'] = entry['bytes'] / entry['duration']
+
+        return summary
+
+__all__ = [ 'TraceEvent', 'BuildTrace' ]
@@ -0,0 +1,53 @@
+import json
+import os
+
+from models import ModelValidationException, Modpack
+
+# The extension of the modpack files collected from the specified directories
+MODPACK_FILE_EXTENSION = '.json'
+
+# Exception base class implementation used to raise modpack file loading related exceptions
+class ModpackLoaderException(Exception):
+    def __init__(self, message: str = "The modpack file can not be accessed or is corrupted."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Helper function used to expand the specified modpack file and directory paths into the list of modpack files, the directories are searched (non-recursively) for the JSON files
+def collect_modpack_files(modpackPaths: list[str]) -> list[str]:
+    modpackFilePaths = []
+    for modpackPath in modpackPaths:
+        if os.path.isdir(modpackPath):
+            modpackFilePaths.extend(sorted(os.path.join(modpackPath, fileName) for fileName in os.listdir(modpackPath) if fileName.lower().endswith(MODPACK_FILE_EXTENSION) and os.path.isfile(os.path.join(modpackPath, fileName))))
+        else:
+            modpackFilePaths.append(modpackPath)
+
+    uniqueModpackFilePaths = []
+    collectedPaths = set()
+    for modpackFilePath in modpackFilePaths:
+        absolutePath = os.path.abspath(modpackFilePath)
+        if absolutePath not in collectedPaths:
+            collectedPaths.add(absolutePath)
+            uniqueModpackFilePaths.append(modpackFilePath)
+
+    return uniqueModpackFilePaths
+
+# Read, deserialize and validate the modpack file, the OSError is raised if the file can not be read
+def load_modpack(modpackFilePath: str) -> Modpack:
+    with open(modpackFilePath, 'rb') as modpackFile:
+        if os.fstat(modpackFile.fileno()).st_size == 0:
+            raise ModpackLoaderException("The modpack file can not be accessed or is corrupted.")
+
+        try:
+            modpackContentDictionary = json.load(modpackFile)
+        except ValueError as exception:
+            raise ModpackLoaderException("The modpack file is not a valid JSON document: {}.".format(exception))
+
+    try:
+        return Modpack.from_dict(modpackContentDictionary)
+    except ModelValidationException as exception:
+        raise ModpackLoaderException("The modpack file content is invalid, {}".format(exception.message))
+
+__all__ = [ 'ModpackLoaderException', 'collect_modpack_files', 'load_modpack' ]
@@ -1,3 +1,4 @@
+import threading
 from typing import TextIO
 
 SUCCESS_SYMBOL = '✔️'
@@ -24,30 +25,39 @@ class Logger:
 
         self.stream = stream
         self.verboseMode = verboseMode
+        self.streamLock = threading.Lock()
+
+    # Write a single formatted line to the output stream, the lock prevents lines from interleaving when logging from multiple threads
+    def _write_line(self, symbol: str, message: str) -> None:
+        with self.streamLock:
+            self.stream.write("[ {} ] {}\n".format(symbol, message))
 
     # Log success message to the output stream
     def log_success(self, message: str) -> None:
-        self.stream.write("[ {} ] {}\n".format(SUCCESS_SYMBOL, message.strip()))
+        self._write_line(SUCCESS_SYMBOL, message.strip())
 
     # Log failure message to the output stream
     def log_failure(self, message: str) -> None:
-        self.stream.write("[ {} ] {}\n".format(FAILURE_SYMBOL, message.strip()))
+        self._write_line(FAILURE_SYMBOL, message.strip())
 
     # Log info message to the output stream
     def log_info(self, message: str) -> None:
-        self.stream.write("[ {} ] {}\n".format(INFO_SYMBOL, message.strip()))
+        self._write_line(INFO_SYMBOL, message.strip())
 
-    # Log info message to the output stream, but the message will only be logged if the logger is in verbose mode
-    def log_verbose(self, message: str) -> None:
+    # Log info message to the output stream, but the message will only be logged if the logger is in verbose mode.
+    # The message is formatted with the arguments only when it is logged, so the disabled verbose logging does not pay for the formatting.
+    def log_verbose(self, message: str, *arguments) -> None:
         if not self.verboseMode: return
-        self.stream.write("[ {} ] {}\n".format(INFO_SYMBOL, message.strip()))
+        if len(arguments) > 0:
+            message = message.format(*arguments)
+        self._write_line(INFO_SYMBOL, message.strip())
 
     # Log error (failure) exception message to the output stream
     def log_error(self, exception: Exception) -> None:
         if hasattr(exception, 'message'):
-            self.stream.write("[ {} ] {}\n".format(FAILURE_SYMBOL, exception.message.strip()))
+            self._write_line(FAILURE_SYMBOL, exception.message.strip())
             return
 
-        self.stream.write("[ {} ] {}\n".format(FAILURE_SYMBOL, str(exception)))
+        self._write_line(FAILURE_SYMBOL, str(exception))
 
 __all__ = [ 'LoggerException', 'Logger' ]
\ No newline at end of file
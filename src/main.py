@@ -1,18 +1,41 @@
 import argparse
 import sys
+from typing import Optional
 
-from builder import ModpackBuilder, ModpackBuilderException, ModpackBuilderOptions
+from cache import DEFAULT_CACHE_MAX_SIZE_MB, get_default_cache_directory
+from instrumentation import BuildTrace
+from loader import ModpackLoaderException, collect_modpack_files, load_modpack
 from logger import Logger, LoggerException
+from sync import SyncMode
 
 # Helper function used to define all supported CLI flags and --help docs
 def create_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     
     parser.add_argument('-m', '--modpack',
+        action='append',
+        dest='modpackPaths',
+        required=False,
+        help='The path to the mod pack configuration JSON file. The flag can be repeated or point to a directory of JSON files to build many modpacks in a single run.')
+
+    parser.add_argument('--pack-jobs',
+        action='store',
+        dest='packJobs',
+        type=int,
+        required=False,
+        help='The number of modpacks built concurrently when building many modpacks.')
+
+    parser.add_argument('--batch-report',
         action='store',
-        dest='modpackFilePath',
-        required=True,
-        help='The path to the mod pack configuration JSON file.')
+        dest='batchReportFilePath',
+        required=False,
+        help='Write the aggregated report of the build of many modpacks to the specified JSON file.')
+
+    parser.add_argument('--validate',
+        action='store_true',
+        dest='validate',
+        required=False,
+        help='Only validate the modpack files and exit without building.')
 
     parser.add_argument('-f', '--force',
         action='store_true',
@@ -20,6 +43,12 @@ def create_argument_parser() -> argparse.ArgumentParser:
         required=False,
         help='Force the modpack build despite existing builds and download failure.')
 
+    parser.add_argument('-c', '--clean',
+        action='store_true',
+        dest='clean',
+        required=False,
+        help='Remove the existing build and build the modpack from scratch instead of updating it incrementally.')
+
     parser.add_argument('-z', '--zip',
         action='store_true',
         dest="packToZip",
@@ -38,12 +67,11 @@ def create_argument_parser() -> argparse.ArgumentParser:
         required=False,
         help='Skip the process of checking the mod file hash.')
 
-    # TODO: We can set the "required" property to false and build both client and server when not specified
     parser.add_argument('-t', '--build-target',
         action='store',
         dest='buildTarget',
-        required=True,
-        help='Specify the build target: CLIENT/SERVER.')
+        required=False,
+        help='Specify the build target: CLIENT/SERVER. Both targets are built when not specified.')
 
     parser.add_argument('-i', '--install',
         action='store_true',
@@ -57,42 +85,370 @@ def create_argument_parser() -> argparse.ArgumentParser:
         required=False,
         help='Run the development installation process after the build.')
 
+    parser.add_argument('--verify',
+        action='store_true',
+        dest='verify',
+        required=False,
+        help='Verify the existing build against the modpack checksums instead of building it, the missing, extra and corrupted files are reported.')
+
+    parser.add_argument('--verify-jobs',
+        action='store',
+        dest='verifyJobs',
+        type=int,
+        required=False,
+        help='The number of processes hashing the files during the verification (default: the number of CPU cores).')
+
+    parser.add_argument('--serve',
+        action='store',
+        dest='serveAddress',
+        required=False,
+        help='Serve the existing build of the selected build target over HTTP on the specified [host:]port address instead of building it (the host defaults to 127.0.0.1).')
+
+    parser.add_argument('--serve-workers',
+        action='store',
+        dest='serveWorkers',
+        type=int,
+        required=False,
+        help='The number of threads handling the client connections of the pack server.')
+
+    parser.add_argument('--delta-from',
+        action='store',
+        dest='deltaBasePath',
+        required=False,
+        help='Create a delta package updating the specified previous build directory or modpack file to the build, the package contains the added and changed files and the list of the removed files.')
+
+    parser.add_argument('--delta-output',
+        action='store',
+        dest='deltaFilePath',
+        required=False,
+        help='The path to the created delta package (default: the build directory name with the -delta.zip suffix).')
+
+    parser.add_argument('--apply-delta',
+        action='store',
+        dest='applyDeltaFilePath',
+        required=False,
+        help='Apply the specified delta package to the pack directory selected by --apply-to and verify the checksums of the updated pack, no modpack file is required.')
+
+    parser.add_argument('--apply-to',
+        action='store',
+        dest='applyDirectory',
+        required=False,
+        help='The path to the installed pack directory updated by --apply-delta.')
+
+    parser.add_argument('-w', '--watch',
+        action='store_true',
+        dest='watch',
+        required=False,
+        help='Keep running after the build and apply the changes of the modpack file and the mod config files to the build.')
+
+    parser.add_argument('--watch-interval',
+        action='store',
+        dest='watchInterval',
+        type=float,
+        required=False,
+        help='The interval in seconds between two checks of the watched files.')
+
+    parser.add_argument('--install-mode',
+        action='store',
+        dest='installMode',
+        choices=[ mode.value for mode in SyncMode ],
+        default=SyncMode.UPDATE.value,
+        required=False,
+        help='The installation strategy: missing (copy only missing files), update (copy missing and changed files), mirror (update and remove the files not present in the source).')
+
+    parser.add_argument('--install-checksum',
+        action='store_true',
+        dest='installChecksum',
+        required=False,
+        help='Compare the file content checksums instead of the modification times to detect changed files during the installation.')
+
+    parser.add_argument('--install-hardlinks',
+        action='store_true',
+        dest='installHardlinks',
+        required=False,
+        help='Install the files as hardlinks to the build files instead of copies.')
+
+    parser.add_argument('-j', '--jobs',
+        action='store',
+        dest='jobs',
+        type=int,
+        required=False,
+        help='The number of mod resources downloaded concurrently.')
+
+    parser.add_argument('--max-host-connections',
+        action='store',
+        dest='maxHostConnections',
+        type=int,
+        required=False,
+        help='The maximum number of connections opened to a single host.')
+
+    parser.add_argument('--retries',
+        action='store',
+        dest='retries',
+        type=int,
+        required=False,
+        help='The number of retries of a download after a connection failure or a 5** status code.')
+
+    parser.add_argument('--retry-backoff',
+        action='store',
+        dest='retryBackoff',
+        type=float,
+        required=False,
+        help='The base delay in seconds of the exponential backoff between the download retries.')
+
+    parser.add_argument('--bandwidth-limit',
+        action='store',
+        dest='bandwidthLimitMb',
+        type=float,
+        required=False,
+        help='The maximum total download throughput in megabytes per second.')
+
+    parser.add_argument('--dry-run',
+        action='store_true',
+        dest='dryRun',
+        required=False,
+        help='Print the download plan (the transfers in the scheduled order, the total size and the estimated time) without building the modpack.')
+
+    parser.add_argument('--prefetch',
+        action='store',
+        dest='prefetchFilePath',
+        required=False,
+        help='Fetch the resources of the selected build targets into the specified artifact bundle file without building the modpack, the bundle can be used by --bundle to build without network access.')
+
+    parser.add_argument('--bundle',
+        action='store',
+        dest='bundleFilePath',
+        required=False,
+        help='Restore the resources from the specified artifact bundle file (created by --prefetch) instead of downloading them.')
+
+    parser.add_argument('--revalidate',
+        action='store_true',
+        dest='revalidate',
+        required=False,
+        help='Check the resources that are up to date with the server using conditional requests (ETag/Last-Modified), the resources that changed are downloaded again.')
+
+    parser.add_argument('--cache-dir',
+        action='store',
+        dest='cacheDirectory',
+        default=get_default_cache_directory(),
+        required=False,
+        help='The path to the directory of the local artifact cache.')
+
+    parser.add_argument('--cache-size',
+        action='store',
+        dest='cacheMaxSizeMb',
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+        required=False,
+        help='The maximum size of the local artifact cache in megabytes.')
+
+    parser.add_argument('--no-cache',
+        action='store_true',
+        dest='noCache',
+        required=False,
+        help='Do not use the local artifact cache.')
+
+    parser.add_argument('--trace',
+        action='store',
+        dest='traceFilePath',
+        required=False,
+        help='Write the per-phase and per-mod timings of the build to the specified JSON file.')
+
+    parser.add_argument('--trace-summary',
+        action='store_true',
+        dest='traceSummary',
+        required=False,
+        help='Log the summary table of the per-phase timings, transferred bytes and the slowest operations.')
+
     return parser
 
+# Helper function used to fill the CLI flags which were not specified with the defaults owned by the builder modules
+def apply_default_arguments(args: argparse.Namespace) -> None:
+    from batch import DEFAULT_BATCH_JOBS
+    from builder import DEFAULT_DOWNLOAD_JOBS, DEFAULT_MAX_HOST_CONNECTIONS
+    from download import DEFAULT_DOWNLOAD_RETRIES, DEFAULT_RETRY_BACKOFF
+    from watch import DEFAULT_WATCH_INTERVAL
+    from serve import DEFAULT_SERVE_WORKERS
+
+    defaults = {
+        'packJobs': DEFAULT_BATCH_JOBS,
+        'watchInterval': DEFAULT_WATCH_INTERVAL,
+        'jobs': DEFAULT_DOWNLOAD_JOBS,
+        'maxHostConnections': DEFAULT_MAX_HOST_CONNECTIONS,
+        'retries': DEFAULT_DOWNLOAD_RETRIES,
+        'retryBackoff': DEFAULT_RETRY_BACKOFF,
+        'serveWorkers': DEFAULT_SERVE_WORKERS,
+    }
+
+    for name, value in defaults.items():
+        if getattr(args, name) == None:
+            setattr(args, name, value)
+
+# Helper function used to validate the modpack files without building them, the return Boolean value is indicating if all modpack files are valid
+def validate_modpack_files(modpackFilePaths: list[str], logger: Logger) -> bool:
+    modpacksValid = True
+    for modpackFilePath in modpackFilePaths:
+        try:
+            modpack = load_modpack(modpackFilePath)
+            logger.log_success("The modpack file: {} is valid, {} mods declared.".format(modpackFilePath, len(modpack.mods)))
+        except (ModpackLoaderException, OSError) as exception:
+            logger.log_failure("The modpack file: {} is invalid: {}".format(modpackFilePath, exception))
+            modpacksValid = False
+
+    return modpacksValid
+
+# Helper function used to apply the delta package to the installed pack directory and log the result, the return Boolean value is indicating if the updated pack matches the package checksums
+def apply_delta(deltaFilePath: str, packDirectory: str, jobs: Optional[int], logger: Logger) -> bool:
+    from delta import DeltaException, apply_delta_package
+
+    try:
+        result = apply_delta_package(deltaFilePath, packDirectory, jobs)
+    except DeltaException as exception:
+        logger.log_error(exception)
+        return False
+
+    for filePath in result.verification.missingFiles:
+        logger.log_failure("Missing file: {}.".format(filePath))
+    for filePath in result.verification.corruptedFiles:
+        logger.log_failure("Corrupted file: {}.".format(filePath))
+
+    logger.log_verbose("Delta package applied: {} files written ({} bytes), {} files removed, {} files verified in {:.2f}s.", result.writtenCount, result.writtenBytes, result.removedCount, result.verification.verifiedCount, result.elapsedTime)
+    if not result.is_valid():
+        logger.log_failure("The pack: {} does not match the delta package checksums after the update.".format(packDirectory))
+        return False
+
+    logger.log_success("The pack: {} updated with the delta package: {}.".format(packDirectory, deltaFilePath))
+    return True
+
+# Helper function used to export the builder (or batch builder) trace according to the CLI flags
+def export_build_trace(trace: BuildTrace, args: argparse.Namespace, logger: Logger) -> None:
+    if args.traceSummary:
+        for line in trace.format_summary_table():
+            logger.log_info(line)
+
+    if args.traceFilePath != None:
+        if trace.save(args.traceFilePath):
+            logger.log_verbose("Build trace written to: {}.", args.traceFilePath)
+        else:
+            logger.log_failure("Failed to write the build trace to: {}.".format(args.traceFilePath))
+
 if __name__ == "__main__":
-    logger = None
+    parser = create_argument_parser()
+    args = parser.parse_args()
 
     try:
-        parser = create_argument_parser()
-        args = parser.parse_args()
+        logger = Logger(sys.stdout, args.verboseMode)
+    except LoggerException:
+        exit(2)
 
-        try:
-            logger = Logger(sys.stdout, args.verboseMode)
-        except LoggerException:
-            exit(2)
+    if args.applyDeltaFilePath != None:
+        if args.applyDirectory == None:
+            logger.log_error("The pack directory to update has to be specified with --apply-to.")
+            exit(1)
+
+        exit(0 if apply_delta(args.applyDeltaFilePath, args.applyDirectory, args.verifyJobs, logger) else 1)
+
+    modpackFilePaths = collect_modpack_files(args.modpackPaths or [])
+    if len(modpackFilePaths) == 0:
+        logger.log_error("No modpack files found.")
+        exit(1)
+
+    if args.validate:
+        exit(0 if validate_modpack_files(modpackFilePaths, logger) else 1)
 
+    # NOTE: The builder modules (and the HTTP client they depend on) are imported only after the arguments are parsed, so the help and validation runs start without paying their import time
+    apply_default_arguments(args)
+    from builder import ModpackBuilder, ModpackBuilderException, ModpackBuilderOptions
+    from batch import BatchBuilder, BatchBuilderException
+    from watch import ModpackWatcher
+    from serve import ServeException, parse_serve_address
+
+    builder = None
+    try:
         # TODO: Currently the builder is case-sensitive (Json props), this is the price of choosing Python...
         builderOptions = ModpackBuilderOptions(
             skipChecksum=args.skipChecksum,
             forceBuild=args.force,
             packToZip=args.packToZip,
-            buildTarget=args.buildTarget)
+            buildTarget=args.buildTarget,
+            jobs=args.jobs,
+            maxHostConnections=args.maxHostConnections,
+            cacheDirectory=None if args.noCache else args.cacheDirectory,
+            cacheMaxSizeMb=args.cacheMaxSizeMb,
+            cleanBuild=args.clean,
+            retries=args.retries,
+            retryBackoff=args.retryBackoff,
+            installMode=args.installMode,
+            installChecksum=args.installChecksum,
+            installHardlinks=args.installHardlinks,
+            revalidate=args.revalidate,
+            bandwidthLimitMb=args.bandwidthLimitMb,
+            bundleFilePath=args.bundleFilePath)
+
+        if args.verifyJobs != None and args.verifyJobs < 1:
+            raise ModpackBuilderException("The number of verification processes must be greater than zero.")
+
+        if len(modpackFilePaths) > 1:
+            if args.install or args.devInstall or args.watch or args.deltaBasePath != None or args.prefetchFilePath != None or args.serveAddress != None:
+                raise ModpackBuilderException("The installation, delta packages, prefetch, serve and watch mode are not supported when building many modpacks.")
+
+            # NOTE: The batch builder exposes the merged trace of all modpacks, so it is exported the same way as the trace of a single builder
+            builder = BatchBuilder(modpackFilePaths, builderOptions, logger, args.packJobs)
+
+            if args.verify:
+                exit(0 if builder.verify(args.verifyJobs) else 1)
+
+            if args.dryRun:
+                builder.plan()
+                exit(0)
+
+            batchSucceeded = builder.build()
+            if args.batchReportFilePath != None and not builder.save_report(args.batchReportFilePath):
+                logger.log_failure("Failed to write the batch report to: {}.".format(args.batchReportFilePath))
+
+            exit(0 if batchSucceeded else 1)
+
+        builder = ModpackBuilder(modpackFilePaths[0], builderOptions, logger)
+
+        if args.verify:
+            exit(0 if builder.verify(args.verifyJobs) else 1)
+
+        if args.dryRun:
+            builder.plan()
+            exit(0)
+
+        if args.serveAddress != None:
+            builder.serve(parse_serve_address(args.serveAddress), args.serveWorkers)
+            exit(0)
+
+        if args.prefetchFilePath != None:
+            builder.prefetch(args.prefetchFilePath)
+            exit(0)
 
-        builder = ModpackBuilder(args.modpackFilePath, builderOptions, logger)
         builder.build()
+
+        if args.deltaBasePath != None:
+            builder.create_delta(args.deltaBasePath, args.deltaFilePath)
+
+        if args.watch:
+            ModpackWatcher(builder, logger, args.watchInterval).watch()
+            exit(0)
     
         if args.install:
-            builder.install(True)
+            builder.install(False)
             exit(0)
 
         if args.devInstall:
-            builder.install(False)
+            builder.install(True)
             exit(0)
 
         exit(0)
-    except ModpackBuilderException as ex:
+    except (ModpackBuilderException, BatchBuilderException, ServeException) as ex:
         logger.log_error(ex)
         exit(1)
     except Exception as ex:
         logger.log_error(ex)
-        exit(1)
\ No newline at end of file
+        exit(1)
+    finally:
+        if builder != None:
+            export_build_trace(builder.trace, args, logger)
@@ -0,0 +1,149 @@
+import json
+import os
+from typing import Any, Optional
+
+from file import atomic_write
+from models import ModelValidationException, check_object, read_field
+
+# The name of the manifest file stored in the root of the build directory
+MANIFEST_FILE_NAME = '.bonclok-manifest.json'
+
+# The version of the manifest file structure, manifests with a different version are ignored
+MANIFEST_FORMAT_VERSION = 1
+
+# Class that is representing a downloaded resource (modding api or mod) placed in the build directory, the entity tag and last modification date returned by the server are used to revalidate the resource
+class ManifestResource():
+    __slots__ = ('resourceUrl', 'checksum', 'filePath', 'size', 'entityTag', 'lastModified')
+
+    def __init__(self, resourceUrl: str, checksum: str, filePath: str, size: int, entityTag: Optional[str] = None, lastModified: Optional[str] = None):
+        self.resourceUrl = resourceUrl
+        self.checksum = checksum
+        self.filePath = filePath
+        self.size = size
+        self.entityTag = entityTag
+        self.lastModified = lastModified
+
+    # Convert the record to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        return { 'resourceUrl': self.resourceUrl, 'checksum': self.checksum, 'filePath': self.filePath, 'size': self.size, 'entityTag': self.entityTag, 'lastModified': self.lastModified }
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any, location: str) -> 'ManifestResource':
+        check_object(data, location)
+        return ManifestResource(
+            read_field(data, 'resourceUrl', str, location),
+            read_field(data, 'checksum', str, location),
+            read_field(data, 'filePath', str, location),
+            read_field(data, 'size', int, location),
+            read_field(data, 'entityTag', str, location, False),
+            read_field(data, 'lastModified', str, location, False))
+
+# Class that is representing a config file copied into the build directory
+class ManifestConfigFile():
+    __slots__ = ('sourcePath', 'sourceChecksum', 'size')
+
+    def __init__(self, sourcePath: str, sourceChecksum: str, size: int):
+        self.sourcePath = sourcePath
+        self.sourceChecksum = sourceChecksum
+        self.size = size
+
+    # Convert the record to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        return { 'sourcePath': self.sourcePath, 'sourceChecksum': self.sourceChecksum, 'size': self.size }
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any, location: str) -> 'ManifestConfigFile':
+        check_object(data, location)
+        return ManifestConfigFile(read_field(data, 'sourcePath', str, location), read_field(data, 'sourceChecksum', str, location), read_field(data, 'size', int, location))
+
+# Class that is representing the state of the build directory produced by the builder, the mods are indexed by the mod name and the config files by the destination path
+class BuildManifest():
+    __slots__ = ('formatVersion', 'api', 'mods', 'configFiles')
+
+    def __init__(self, formatVersion: int = MANIFEST_FORMAT_VERSION, api: Optional[ManifestResource] = None, mods: Optional[dict[str, ManifestResource]] = None, configFiles: Optional[dict[str, ManifestConfigFile]] = None):
+        self.formatVersion = formatVersion
+        self.api = api
+        self.mods = mods if mods is not None else {}
+        self.configFiles = configFiles if configFiles is not None else {}
+
+    # Convert the record to a JSON serializable dictionary
+    def to_dict(self) -> dict:
+        return {
+            'formatVersion': self.formatVersion,
+            'api': self.api.to_dict() if self.api is not None else None,
+            'mods': { name: entry.to_dict() for name, entry in self.mods.items() },
+            'configFiles': { destinationPath: entry.to_dict() for destinationPath, entry in self.configFiles.items() },
+        }
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any) -> 'BuildManifest':
+        location = 'manifest'
+        check_object(data, location)
+
+        apiObject = read_field(data, 'api', dict, location, False)
+        modObjects = read_field(data, 'mods', dict, location, False) or {}
+        configFileObjects = read_field(data, 'configFiles', dict, location, False) or {}
+        return BuildManifest(
+            read_field(data, 'formatVersion', int, location),
+            ManifestResource.from_dict(apiObject, 'api') if apiObject is not None else None,
+            { name: ManifestResource.from_dict(modObject, "mods[{}]".format(name)) for name, modObject in modObjects.items() },
+            { destinationPath: ManifestConfigFile.from_dict(configFileObject, "configFiles[{}]".format(destinationPath)) for destinationPath, configFileObject in configFileObjects.items() })
+
+# Helper function used to get the path of the manifest file in the specified build directory
+def get_manifest_path(buildDirectory: str) -> str:
+    return os.path.join(buildDirectory, MANIFEST_FILE_NAME)
+
+# Load the manifest from the build directory, None is returned if the manifest does not exist, is corrupted or has an unsupported format version
+def load_build_manifest(buildDirectory: str) -> Optional[BuildManifest]:
+    try:
+        with open(get_manifest_path(buildDirectory), 'r') as manifestFile:
+            manifest = BuildManifest.from_dict(json.load(manifestFile))
+    except (OSError, ValueError, ModelValidationException):
+        return None
+
+    if manifest.formatVersion != MANIFEST_FORMAT_VERSION:
+        return None
+
+    return manifest
+
+# Write the manifest to the build directory using a temporary file and rename, the return Boolean value is indicating if the operation succeeded
+def save_build_manifest(buildDirectory: str, manifest: BuildManifest) -> bool:
+    try:
+        with atomic_write(get_manifest_path(buildDirectory), 'w', MANIFEST_FILE_NAME) as temporaryFile:
+            # NOTE: The manifest is written without indentation, the indented output is produced by the pure Python encoder which is several times slower for large modpacks
+            temporaryFile.write(json.dumps(manifest.to_dict(), sort_keys=True, separators=(',', ':')))
+
+        return True
+    except OSError:
+        return False
+
+# Check if the resource described by the manifest entry is present in the build directory and matches the expected resource
+def is_resource_up_to_date(buildDirectory: str, entry: Optional[ManifestResource], resourceUrl: str, checksum: str, filePath: str) -> bool:
+    if entry is None:
+        return False
+
+    if entry.resourceUrl != resourceUrl or entry.checksum != checksum or entry.filePath != filePath:
+        return False
+
+    try:
+        return os.path.getsize(os.path.join(buildDirectory, filePath)) == entry.size
+    except OSError:
+        return False
+
+# Check if the config file described by the manifest entry is present in the build directory and matches the current source file
+def is_config_file_up_to_date(buildDirectory: str, entry: Optional[ManifestConfigFile], sourcePath: str, sourceChecksum: str, destinationPath: str) -> bool:
+    if entry is None:
+        return False
+
+    if entry.sourcePath != sourcePath or entry.sourceChecksum != sourceChecksum:
+        return False
+
+    try:
+        return os.path.getsize(os.path.join(buildDirectory, destinationPath)) == entry.size
+    except OSError:
+        return False
+
+__all__ = [ 'MANIFEST_FILE_NAME', 'ManifestResource', 'ManifestConfigFile', 'BuildManifest', 'get_manifest_path', 'load_build_manifest', 'save_build_manifest', 'is_resource_up_to_date', 'is_config_file_up_to_date' ]
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+import requests
+
+# The connect and read timeouts (in seconds) of the mirror probe requests
+MIRROR_PROBE_TIMEOUT = (5, 5)
+
+# The weight of the latest latency sample in the moving average of the host latency
+MIRROR_LATENCY_SMOOTHING = 0.3
+
+# Class used to store the observed state of a single mirror host
+class MirrorHostState():
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.failureCount = 0
+
+    # Add a latency sample to the exponential moving average, so a mirror which degrades during the build is demoted
+    def add_latency(self, latency: float) -> None:
+        if self.latency == None:
+            self.latency = latency
+        else:
+            self.latency = MIRROR_LATENCY_SMOOTHING * latency + (1 - MIRROR_LATENCY_SMOOTHING) * self.latency
+
+# Class used to order the alternative URLs of a resource by the observed latency and health of their hosts, the state is shared by all download workers
+class MirrorSelector():
+    def __init__(self):
+        self.hostStates: dict[str, MirrorHostState] = {}
+        self.probedHosts: set[str] = set()
+        self.stateLock = threading.Lock()
+
+    # Get the state of the host serving the specified URL
+    def _get_host_state(self, resourceUrl: str) -> MirrorHostState:
+        host = urlparse(resourceUrl).netloc
+        with self.stateLock:
+            return self.hostStates.setdefault(host, MirrorHostState())
+
+    # Measure the latency of the hosts serving the specified URLs using a single HEAD request per host, every host is probed only once and the hosts which do not respond are marked as failed.
+    # The return value is the dictionary of the probed hosts and their latency (None for the failed hosts).
+    def probe(self, session: requests.Session, resourceUrls: list[str], jobs: int) -> dict[str, Optional[float]]:
+        hostUrls = {}
+        with self.stateLock:
+            for resourceUrl in resourceUrls:
+                host = urlparse(resourceUrl).netloc
+                if host not in self.probedHosts:
+                    self.probedHosts.add(host)
+                    hostUrls[host] = resourceUrl
+
+        def probe_host(resourceUrl: str) -> Optional[float]:
+            startTime = time.monotonic()
+            try:
+                # NOTE: Any response (even an error status code) proves the host is reachable, the status of the resource is checked by the download
+                session.head(resourceUrl, timeout=MIRROR_PROBE_TIMEOUT, allow_redirects=False).close()
+            except requests.RequestException:
+                self.record_failure(resourceUrl)
+                return None
+
+            latency = time.monotonic() - startTime
+            self.record_success(resourceUrl, latency)
+            return latency
+
+        if len(hostUrls) == 0:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(hostUrls)))) as executor:
+            return dict(zip(hostUrls.keys(), executor.map(probe_host, hostUrls.values())))
+
+    # Order the URLs from the best to the worst host: the hosts without failures are preferred, then the hosts with lower latency, the declared order is kept for the hosts which were not measured yet
+    def order_urls(self, resourceUrls: list[str]) -> list[str]:
+        def get_sort_key(indexedUrl: tuple[int, str]) -> tuple:
+            index, resourceUrl = indexedUrl
+            hostState = self._get_host_state(resourceUrl)
+            with self.stateLock:
+                return (hostState.failureCount, hostState.latency if hostState.latency != None else float('inf'), index)
+
+        return [ resourceUrl for _, resourceUrl in sorted(enumerate(resourceUrls), key=get_sort_key) ]
+
+    # Record a successful response of the host serving the URL together with the time it took the host to respond
+    def record_success(self, resourceUrl: str, latency: float) -> None:
+        hostState = self._get_host_state(resourceUrl)
+        with self.stateLock:
+            hostState.failureCount = 0
+            hostState.add_latency(latency)
+
+    # Record a failed request to the host serving the URL, the host is demoted below the healthy mirrors
+    def record_failure(self, resourceUrl: str) -> None:
+        hostState = self._get_host_state(resourceUrl)
+        with self.stateLock:
+            hostState.failureCount += 1
+
+__all__ = [ 'MirrorSelector' ]
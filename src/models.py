@@ -1,28 +1,171 @@
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, Callable, Optional
+
+# The names of the JSON types used in the validation messages
+JSON_TYPE_NAMES = { str: 'string', bool: 'boolean', int: 'integer', list: 'array', dict: 'object' }
+
+# Exception base class implementation used to raise modpack file content validation related exceptions
+class ModelValidationException(Exception):
+    def __init__(self, message: str = "Invalid modpack file content."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Helper function used to check that the deserialized JSON value is an object
+def check_object(data: Any, location: str) -> dict:
+    if type(data) is not dict:
+        raise ModelValidationException("{}: the value must be an object.".format(location))
+
+    return data
+
+# The string values accepted as booleans, the same as the pydantic (v1) models used for the modpack file previously accepted
+BOOLEAN_TRUE_STRINGS = frozenset([ '1', 'on', 't', 'true', 'y', 'yes' ])
+BOOLEAN_FALSE_STRINGS = frozenset([ '0', 'off', 'f', 'false', 'n', 'no' ])
+
+# Helper function used to coerce a number to the string value, None is returned if the value can not be coerced
+def coerce_string(value: Any) -> Optional[str]:
+    if isinstance(value, (int, float)):
+        return str(value)
+
+    return None
+
+# Helper function used to coerce the 0 and 1 numbers and the yes/no like strings to the Boolean value, None is returned if the value can not be coerced
+def coerce_boolean(value: Any) -> Optional[bool]:
+    if isinstance(value, str):
+        normalizedValue = value.strip().lower()
+        if normalizedValue in BOOLEAN_TRUE_STRINGS:
+            return True
+        if normalizedValue in BOOLEAN_FALSE_STRINGS:
+            return False
+    elif isinstance(value, (int, float)) and value in (0, 1):
+        return value == 1
+
+    return None
+
+# Helper function used to coerce a number or a numeric string to the integer value (the fractional part is truncated), None is returned if the value can not be coerced
+def coerce_integer(value: Any) -> Optional[int]:
+    if not isinstance(value, (str, int, float)):
+        return None
+
+    try:
+        return int(value)
+    except (ValueError, OverflowError):
+        return None
+
+# The functions used to coerce the values which JSON type does not match the field type
+FIELD_COERCIONS: dict[type, Callable[[Any], Any]] = { str: coerce_string, bool: coerce_boolean, int: coerce_integer }
+
+# Helper function used to read a field of the deserialized JSON object and check its type, None is returned for a missing optional field.
+# NOTE: The values of a different JSON type are coerced the same way the pydantic (v1) models did (a numeric version is read as a string, "true" or 1 as a boolean), so the existing modpack files remain valid
+def read_field(data: dict, fieldName: str, fieldType: type, location: str, required: bool = True) -> Any:
+    value = data.get(fieldName)
+    if value is None:
+        if required:
+            raise ModelValidationException("{}: the field: {} is required.".format(location, fieldName))
+        return None
+
+    if type(value) is fieldType:
+        return value
+
+    coerce = FIELD_COERCIONS.get(fieldType)
+    coercedValue = coerce(value) if coerce != None else None
+    if coercedValue is None:
+        raise ModelValidationException("{}: the field: {} must be of the {} type.".format(location, fieldName, JSON_TYPE_NAMES.get(fieldType, fieldType.__name__)))
+
+    return coercedValue
+
+# Helper function used to read an array field of the deserialized JSON object and convert every item with the specified function, None is returned for a missing optional field
+def read_list_field(data: dict, fieldName: str, location: str, read_item: Callable[[Any, str], Any], required: bool = True) -> Optional[list]:
+    items = read_field(data, fieldName, list, location, required)
+    if items is None:
+        return None
+
+    return [ read_item(item, "{}.{}[{}]".format(location, fieldName, index)) for index, item in enumerate(items) ]
+
+# Helper function used to read a single string item of an array field
+def read_string_item(item: Any, location: str) -> str:
+    if type(item) is str:
+        return item
+
+    coercedItem = coerce_string(item)
+    if coercedItem is None:
+        raise ModelValidationException("{}: the value must be of the string type.".format(location))
+
+    return coercedItem
 
 # Class that is representing the source and destination paths of a mod configuration file
-class ModConfigFile(BaseModel):
-    sourcePath: str
-    destinationPath: str
-
-# Class that is representing the properties and build instructions for a single mod
-class Mod(BaseModel):
-    name: str
-    checksum: str
-    resourceUrl: str
-    sourceUrl: str
-    includeClient: bool
-    includeServer: bool
-    configFiles: list[ModConfigFile]
-
-# Class that is representing the properties of the target modding API
-class ModdingApi(BaseModel):
-    name: str
-    checksum: str
-    resourceUrl: str
-    sourceUrl: str
+class ModConfigFile():
+    __slots__ = ('sourcePath', 'destinationPath')
+
+    def __init__(self, sourcePath: str, destinationPath: str):
+        self.sourcePath = sourcePath
+        self.destinationPath = destinationPath
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any, location: str) -> 'ModConfigFile':
+        check_object(data, location)
+        return ModConfigFile(read_field(data, 'sourcePath', str, location), read_field(data, 'destinationPath', str, location))
+
+# Class that is representing the properties and build instructions for a single mod, the optional mirror URLs are alternative locations of the same resource
+class Mod():
+    __slots__ = ('name', 'checksum', 'resourceUrl', 'mirrorUrls', 'sourceUrl', 'includeClient', 'includeServer', 'configFiles')
+
+    def __init__(self, name: str, checksum: str, resourceUrl: str, mirrorUrls: Optional[list[str]], sourceUrl: str, includeClient: bool, includeServer: bool, configFiles: list[ModConfigFile]):
+        self.name = name
+        self.checksum = checksum
+        self.resourceUrl = resourceUrl
+        self.mirrorUrls = mirrorUrls
+        self.sourceUrl = sourceUrl
+        self.includeClient = includeClient
+        self.includeServer = includeServer
+        self.configFiles = configFiles
+
+    # Get the resource URL followed by the mirror URLs in the declared order
+    def get_resource_urls(self) -> list[str]:
+        return [ self.resourceUrl ] + (self.mirrorUrls or [])
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any, location: str) -> 'Mod':
+        check_object(data, location)
+        return Mod(
+            read_field(data, 'name', str, location),
+            read_field(data, 'checksum', str, location),
+            read_field(data, 'resourceUrl', str, location),
+            read_list_field(data, 'mirrorUrls', location, read_string_item, False),
+            read_field(data, 'sourceUrl', str, location),
+            read_field(data, 'includeClient', bool, location),
+            read_field(data, 'includeServer', bool, location),
+            read_list_field(data, 'configFiles', location, ModConfigFile.from_dict))
+
+# Class that is representing the properties of the target modding API, the optional mirror URLs are alternative locations of the same resource
+class ModdingApi():
+    __slots__ = ('name', 'checksum', 'resourceUrl', 'mirrorUrls', 'sourceUrl')
+
+    def __init__(self, name: str, checksum: str, resourceUrl: str, mirrorUrls: Optional[list[str]], sourceUrl: str):
+        self.name = name
+        self.checksum = checksum
+        self.resourceUrl = resourceUrl
+        self.mirrorUrls = mirrorUrls
+        self.sourceUrl = sourceUrl
+
+    # Get the resource URL followed by the mirror URLs in the declared order
+    def get_resource_urls(self) -> list[str]:
+        return [ self.resourceUrl ] + (self.mirrorUrls or [])
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any, location: str) -> 'ModdingApi':
+        check_object(data, location)
+        return ModdingApi(
+            read_field(data, 'name', str, location),
+            read_field(data, 'checksum', str, location),
+            read_field(data, 'resourceUrl', str, location),
+            read_list_field(data, 'mirrorUrls', location, read_string_item, False),
+            read_field(data, 'sourceUrl', str, location))
 
 # Enum class that is representing the modpack build target (client or server)
 class ModpackTarget(str, Enum):
@@ -30,20 +173,50 @@ class ModpackTarget(str, Enum):
     SERVER = 'server'
 
 # Class that is representing the source and destination paths of a build resource to install
-class InstallationResource(BaseModel):
-    sourcePath: str
-    destinationPath: str
+class InstallationResource():
+    __slots__ = ('sourcePath', 'destinationPath')
+
+    def __init__(self, sourcePath: str, destinationPath: str):
+        self.sourcePath = sourcePath
+        self.destinationPath = destinationPath
+
+    # Create the record from the deserialized JSON object
+    @staticmethod
+    def from_dict(data: Any, location: str) -> 'InstallationResource':
+        check_object(data, location)
+        return InstallationResource(read_field(data, 'sourcePath', str, location), read_field(data, 'destinationPath', str, location))
 
 # Class that is representig the properties of the mod pack and contains a list of mods for all specified modpack versions
-class Modpack(BaseModel):
-    name: str
-    version: str
-    api: ModdingApi
-    mods: list[Mod]
-    installation: Optional[list[InstallationResource]]
-    devInstallation: Optional[list[InstallationResource]]
-
-    class Config:
-        use_enum_values = True
-
-__all__ = [ 'ConfigFile', 'Mod', 'ModdingApi', 'ModpackTarget', 'InstallationResource', 'Modpack' ] 
\ No newline at end of file
+class Modpack():
+    __slots__ = ('name', 'version', 'api', 'mods', 'installation', 'devInstallation')
+
+    def __init__(self, name: str, version: str, api: ModdingApi, mods: list[Mod], installation: Optional[list[InstallationResource]], devInstallation: Optional[list[InstallationResource]]):
+        self.name = name
+        self.version = version
+        self.api = api
+        self.mods = mods
+        self.installation = installation
+        self.devInstallation = devInstallation
+
+    # Create the record from the deserialized JSON object, the fields which are not part of the modpack structure are ignored.
+    # The mods are validated one by one and their JSON objects are released as soon as they are converted, so large modpacks do not keep both representations in memory.
+    @staticmethod
+    def from_dict(data: Any) -> 'Modpack':
+        location = 'modpack'
+        check_object(data, location)
+
+        modObjects = read_field(data, 'mods', list, location)
+        mods = []
+        for index in range(len(modObjects)):
+            mods.append(Mod.from_dict(modObjects[index], "mods[{}]".format(index)))
+            modObjects[index] = None
+
+        return Modpack(
+            read_field(data, 'name', str, location),
+            read_field(data, 'version', str, location),
+            ModdingApi.from_dict(read_field(data, 'api', dict, location), 'api'),
+            mods,
+            read_list_field(data, 'installation', location, InstallationResource.from_dict, False),
+            read_list_field(data, 'devInstallation', location, InstallationResource.from_dict, False))
+
+__all__ = [ 'ModelValidationException', 'check_object', 'read_field', 'read_list_field', 'ModConfigFile', 'Mod', 'ModdingApi', 'ModpackTarget', 'InstallationResource', 'Modpack' ]
@@ -0,0 +1,51 @@
+import threading
+from typing import Hashable, Optional
+
+# Class used to share the fetched resources between the build targets and the modpacks built in a single run, so every resource is fetched only once.
+# The first worker claiming a resource becomes its owner and fetches it, the other workers claiming the same resource wait until the owner registers or releases it.
+class ResourceRegistry():
+    def __init__(self):
+        self.resourcePaths: dict[Hashable, str] = {}
+        self.pendingResources: dict[Hashable, threading.Event] = {}
+        self.registryLock = threading.Lock()
+
+    # Get the path of the already fetched resource, the call blocks while the resource is being fetched by another worker.
+    # None is returned if the resource is not fetched yet, the caller becomes the owner and has to register or release the resource.
+    def claim(self, resourceKey: Hashable) -> Optional[str]:
+        while True:
+            with self.registryLock:
+                resourcePath = self.resourcePaths.get(resourceKey)
+                if resourcePath != None:
+                    return resourcePath
+
+                pendingEvent = self.pendingResources.get(resourceKey)
+                if pendingEvent == None:
+                    self.pendingResources[resourceKey] = threading.Event()
+                    return None
+
+            # NOTE: The claim is repeated after the owner finished, if the owner failed to fetch the resource the next waiting worker becomes the owner
+            pendingEvent.wait()
+
+    # Register the path of the fetched resource and wake up the workers waiting for it
+    def register(self, resourceKey: Hashable, resourcePath: str) -> None:
+        with self.registryLock:
+            self.resourcePaths[resourceKey] = resourcePath
+            pendingEvent = self.pendingResources.pop(resourceKey, None)
+
+        if pendingEvent != None:
+            pendingEvent.set()
+
+    # Give up the ownership of a resource which could not be fetched, one of the waiting workers takes over
+    def release(self, resourceKey: Hashable) -> None:
+        with self.registryLock:
+            pendingEvent = self.pendingResources.pop(resourceKey, None)
+
+        if pendingEvent != None:
+            pendingEvent.set()
+
+    # Get the number of the registered resources
+    def get_resource_count(self) -> int:
+        with self.registryLock:
+            return len(self.resourcePaths)
+
+__all__ = [ 'ResourceRegistry' ]
@@ -0,0 +1,151 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlparse
+import requests
+
+# The connect and read timeouts (in seconds) of the size probe requests
+SIZE_PROBE_TIMEOUT = (5, 10)
+
+# The throughput (in bytes per second) assumed by the transfer time estimate when no bandwidth limit is specified
+DEFAULT_ESTIMATED_BANDWIDTH = 10 * 1024 * 1024
+
+# Class that is representing a single resource transfer scheduled by the builder, the size is None until it is probed or if the server does not report it
+class ScheduledTransfer():
+    __slots__ = ('name', 'resourceUrls', 'size', 'payload')
+
+    def __init__(self, name: str, resourceUrls: list[str], payload: Any = None, size: Optional[int] = None):
+        self.name = name
+        self.resourceUrls = resourceUrls
+        self.payload = payload
+        self.size = size
+
+    # Get the host of the primary resource URL, the host concurrency limit is applied to it
+    def get_host(self) -> str:
+        return urlparse(self.resourceUrls[0]).netloc
+
+# Helper function used to learn the size of the resource from the Content-Length header of a HEAD request, the mirrors are tried in the declared order and None is returned if no host reports the size
+def probe_resource_size(session: requests.Session, resourceUrls: list[str]) -> Optional[int]:
+    for resourceUrl in resourceUrls:
+        try:
+            with session.head(resourceUrl, timeout=SIZE_PROBE_TIMEOUT, allow_redirects=True) as response:
+                contentLength = response.headers.get('Content-Length', '').strip()
+                # NOTE: The length of an encoded response is not the size of the resource
+                if response.status_code == 200 and contentLength.isdigit() and 'Content-Encoding' not in response.headers:
+                    return int(contentLength)
+        except requests.RequestException:
+            continue
+
+    return None
+
+# Probe the sizes of the transfers which size is not known yet using the specified number of concurrent requests, the sizes are stored in the transfers
+def probe_transfer_sizes(session: requests.Session, transfers: list[ScheduledTransfer], jobs: int) -> None:
+    unknownTransfers = [ transfer for transfer in transfers if transfer.size == None ]
+    if len(unknownTransfers) == 0:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(unknownTransfers)))) as executor:
+        for transfer, size in zip(unknownTransfers, executor.map(lambda transfer: probe_resource_size(session, transfer.resourceUrls), unknownTransfers)):
+            transfer.size = size
+
+# Helper function used to order the transfers from the largest one, so a large transfer started last does not extend the build after the other workers are done.
+# The transfers of an unknown size are scheduled first, as they are as likely to be the longest ones, the declared order is kept for transfers of the same size.
+def order_transfers(transfers: list[ScheduledTransfer]) -> list[ScheduledTransfer]:
+    return sorted(transfers, key=lambda transfer: (transfer.size != None, -(transfer.size or 0)))
+
+# Estimate the duration (in seconds) of the transfers executed in the scheduled order by the specified number of workers, the running transfers share the bandwidth equally.
+# The transfers of an unknown size and the host connection limits are not included in the estimate.
+def estimate_transfer_duration(transfers: list[ScheduledTransfer], jobs: int, bandwidth: float) -> float:
+    pendingSizes = deque(transfer.size for transfer in order_transfers(transfers) if transfer.size != None and transfer.size > 0)
+    runningSizes: list[float] = []
+    duration = 0.0
+    while len(pendingSizes) > 0 or len(runningSizes) > 0:
+        while len(runningSizes) < jobs and len(pendingSizes) > 0:
+            runningSizes.append(pendingSizes.popleft())
+
+        # NOTE: The simulation advances to the end of the smallest running transfer, the other running transfers progress at the same rate
+        stepBytes = min(runningSizes)
+        duration += stepBytes * len(runningSizes) / bandwidth
+        runningSizes = [ size - stepBytes for size in runningSizes if size > stepBytes ]
+
+    return duration
+
+# Class used to cap the total throughput of the downloads (in bytes per second), the transferred bytes are reported by all download workers and the workers exceeding the budget are put to sleep.
+# The budget is refilled continuously and can accumulate up to one second of transfer, so a short idle period does not turn into a long burst above the limit.
+class BandwidthLimiter():
+    def __init__(self, bytesPerSecond: float):
+        self.bytesPerSecond = bytesPerSecond
+        self.availableBytes = 0.0
+        self.updateTime = time.monotonic()
+        self.budgetLock = threading.Lock()
+
+    # Account the received bytes and wait until they fit into the budget, the budget can go negative so the waiting workers are served in the order they reported their bytes
+    def consume(self, byteCount: int) -> None:
+        with self.budgetLock:
+            currentTime = time.monotonic()
+            self.availableBytes = min(self.bytesPerSecond, self.availableBytes + (currentTime - self.updateTime) * self.bytesPerSecond)
+            self.updateTime = currentTime
+            self.availableBytes -= byteCount
+            delay = -self.availableBytes / self.bytesPerSecond if self.availableBytes < 0 else 0.0
+
+        if delay > 0:
+            time.sleep(delay)
+
+# Class used to limit the number of transfers running against a single host, the limiter can be shared by many schedulers (for example when many modpacks are built in a single run)
+class HostLimiter():
+    def __init__(self, maxHostTransfers: int):
+        self.maxHostTransfers = maxHostTransfers
+        self.activeTransfers: dict[str, int] = {}
+        self.condition = threading.Condition()
+
+    # Take a transfer slot of the host if one is free, the caller has to hold the condition lock
+    def _try_acquire(self, host: str) -> bool:
+        activeCount = self.activeTransfers.get(host, 0)
+        if activeCount >= self.maxHostTransfers:
+            return False
+
+        self.activeTransfers[host] = activeCount + 1
+        return True
+
+    # Return the transfer slot of the host and wake up the workers waiting for a free host
+    def release(self, host: str) -> None:
+        with self.condition:
+            activeCount = self.activeTransfers.get(host, 0) - 1
+            if activeCount > 0:
+                self.activeTransfers[host] = activeCount
+            else:
+                self.activeTransfers.pop(host, None)
+
+            self.condition.notify_all()
+
+# Class used to hand the transfers out to the download workers, every worker gets the largest pending transfer which host has a free slot, so the workers are not blocked by a saturated host while transfers to other hosts are waiting
+class TransferScheduler():
+    def __init__(self, transfers: list[ScheduledTransfer], hostLimiter: HostLimiter):
+        self.pendingTransfers = order_transfers(transfers)
+        self.hostLimiter = hostLimiter
+
+    # Get the next transfer and take a slot of its host, the call blocks while all hosts of the pending transfers are saturated and None is returned when no transfers are left
+    def acquire(self) -> Optional[ScheduledTransfer]:
+        with self.hostLimiter.condition:
+            while len(self.pendingTransfers) > 0:
+                for index, transfer in enumerate(self.pendingTransfers):
+                    if self.hostLimiter._try_acquire(transfer.get_host()):
+                        return self.pendingTransfers.pop(index)
+
+                self.hostLimiter.condition.wait()
+
+            return None
+
+    # Return the host slot of the finished transfer
+    def release(self, transfer: ScheduledTransfer) -> None:
+        self.hostLimiter.release(transfer.get_host())
+
+    # Drop the pending transfers, the workers finish the running transfers and stop
+    def cancel(self) -> None:
+        with self.hostLimiter.condition:
+            self.pendingTransfers = []
+            self.hostLimiter.condition.notify_all()
+
+__all__ = [ 'DEFAULT_ESTIMATED_BANDWIDTH', 'ScheduledTransfer', 'probe_resource_size', 'probe_transfer_sizes', 'order_transfers', 'estimate_transfer_duration', 'BandwidthLimiter', 'HostLimiter', 'TransferScheduler' ]
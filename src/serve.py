@@ -0,0 +1,336 @@
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import mimetypes
+import os
+import posixpath
+import threading
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+from delta import get_build_file_checksums, is_pack_path_valid
+from file import calculate_file_checksum
+from logger import Logger
+from manifest import MANIFEST_FILE_NAME
+
+# The default host the pack server listens on when only the port is specified
+DEFAULT_SERVE_HOST = '127.0.0.1'
+
+# The default number of worker threads handling the client connections
+DEFAULT_SERVE_WORKERS = 64
+
+# The number of seconds an idle connection is kept open, so the clients keeping their connections alive do not hold the workers for long
+SERVE_IDLE_TIMEOUT = 5
+
+# The path of the index listing the checksums and sizes of all served files, the clients compare it with their files to fetch only the ones they lack
+PACK_INDEX_PATH = '/.bonclok-files.json'
+
+# The extensions of the text files (mostly configs) which are compressed with gzip for the clients accepting it, the jars and archives are already compressed
+COMPRESSED_FILE_EXTENSIONS = { '.cfg', '.conf', '.ini', '.json', '.json5', '.properties', '.snbt', '.toml', '.txt', '.xml', '.yaml', '.yml' }
+
+# Exception base class implementation used to raise pack server related exceptions
+class ServeException(Exception):
+    def __init__(self, message: str = "Unexpected pack server failure."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Helper function used to parse the listen address in the [host:]port format
+def parse_serve_address(address: str) -> tuple[str, int]:
+    host, _, port = address.strip().rpartition(':')
+    try:
+        portNumber = int(port)
+    except ValueError:
+        raise ServeException("Invalid listen address: {}, the expected format is: [host:]port.".format(address))
+
+    if portNumber < 0 or portNumber > 65535:
+        raise ServeException("Invalid listen port: {}.".format(port))
+
+    return (host.strip('[]') if len(host) > 0 else DEFAULT_SERVE_HOST, portNumber)
+
+# Helper function used to parse the single byte range of the Range header value, None is returned if the header is not a single byte range (the whole file is served in that case).
+# The returned range is inclusive, a range starting past the end of the file is unsatisfiable and is returned as an empty (start > end) range.
+def parse_byte_range(rangeHeader: str, size: int) -> Optional[tuple[int, int]]:
+    unit, _, ranges = rangeHeader.strip().partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+
+    start, separator, end = ranges.strip().partition('-')
+    if separator != '-' or not (start.isdigit() or start == '') or not (end.isdigit() or end == '') or start == end == '':
+        return None
+
+    if start == '':
+        # NOTE: The suffix range selects the last bytes of the file
+        return (max(0, size - int(end)), size - 1) if int(end) > 0 else (size, size - 1)
+
+    if end != '' and int(end) < int(start):
+        return None
+
+    return (int(start), min(int(end), size - 1) if end != '' else size - 1)
+
+# Helper function used to check if the entity tag matches any tag of the If-None-Match header value, the weak comparison is used
+def is_entity_tag_matching(headerValue: str, entityTag: str) -> bool:
+    for tag in headerValue.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == entityTag:
+            return True
+
+    return False
+
+# Class that is representing a single served file of the pack, the checksum is used as the entity tag of its content
+class PackFile():
+    __slots__ = ('filePath', 'checksum', 'size', 'modifiedTime')
+
+    def __init__(self, filePath: str, checksum: str, size: int, modifiedTime: int):
+        self.filePath = filePath
+        self.checksum = checksum
+        self.size = size
+        self.modifiedTime = modifiedTime
+
+    # Get the entity tag of the file content, the compressed content is a different representation with its own tag
+    def get_entity_tag(self, compressed: bool = False) -> str:
+        return '"{}{}"'.format(self.checksum, '-gzip' if compressed else '')
+
+# Class used to keep the checksums of the served files of the build directory, the files are indexed when the server starts.
+# A file which changed since it was indexed (its size or modification time differs) is hashed again before it is served, so a rebuild never serves the content under a stale entity tag.
+class PackIndex():
+    def __init__(self, buildDirectory: str, jobs: Optional[int] = None):
+        self.buildDirectory = buildDirectory
+        self.lock = threading.Lock()
+        self.files: dict[str, PackFile] = {}
+        self.indexContent: Optional[bytes] = None
+        self.compressedContents: dict[str, tuple[str, bytes]] = {}
+
+        fileChecksums = get_build_file_checksums(buildDirectory, jobs)
+        if os.path.isfile(os.path.join(buildDirectory, MANIFEST_FILE_NAME)):
+            fileChecksums[MANIFEST_FILE_NAME] = calculate_file_checksum(os.path.join(buildDirectory, MANIFEST_FILE_NAME))
+
+        for filePath, checksum in fileChecksums.items():
+            fileStat = os.stat(self.get_absolute_path(filePath))
+            self.files[filePath] = PackFile(filePath, checksum, fileStat.st_size, fileStat.st_mtime_ns)
+
+    # Get the path to the served file
+    def get_absolute_path(self, filePath: str) -> str:
+        return os.path.join(self.buildDirectory, *filePath.split('/'))
+
+    # Get the indexed file, None is returned if the file is not part of the pack or no longer exists
+    def get(self, filePath: str) -> Optional[PackFile]:
+        with self.lock:
+            packFile = self.files.get(filePath)
+
+        if packFile == None:
+            return None
+
+        try:
+            fileStat = os.stat(self.get_absolute_path(filePath))
+            if fileStat.st_size == packFile.size and fileStat.st_mtime_ns == packFile.modifiedTime:
+                return packFile
+
+            packFile = PackFile(filePath, calculate_file_checksum(self.get_absolute_path(filePath)), fileStat.st_size, fileStat.st_mtime_ns)
+        except OSError:
+            packFile = None
+
+        with self.lock:
+            if packFile != None:
+                self.files[filePath] = packFile
+            else:
+                self.files.pop(filePath, None)
+
+            self.indexContent = None
+
+        return packFile
+
+    # Get the JSON index of the served files with their checksums and sizes, the changed files are hashed again first
+    def get_index_content(self) -> bytes:
+        with self.lock:
+            filePaths = list(self.files)
+
+        for filePath in filePaths:
+            self.get(filePath)
+
+        with self.lock:
+            if self.indexContent == None:
+                files = { filePath: { 'checksum': packFile.checksum, 'size': packFile.size } for filePath, packFile in sorted(self.files.items()) }
+                self.indexContent = json.dumps({ 'files': files }, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+            return self.indexContent
+
+    # Get the gzip compressed content of the text file, the compressed content of the current version of the file is kept in memory
+    def get_compressed_content(self, packFile: PackFile) -> bytes:
+        with self.lock:
+            checksum, compressedContent = self.compressedContents.get(packFile.filePath, (None, None))
+
+        if compressedContent == None or checksum != packFile.checksum:
+            with open(self.get_absolute_path(packFile.filePath), 'rb') as sourceFile:
+                # NOTE: The timestamp is fixed, so the compressed representation is the same for the same content
+                compressedContent = gzip.compress(sourceFile.read(), mtime=0)
+
+            with self.lock:
+                self.compressedContents[packFile.filePath] = (packFile.checksum, compressedContent)
+
+        return compressedContent
+
+# HTTP server used to distribute the built pack, the connections are handled by a bounded pool of worker threads
+class PackServer(HTTPServer):
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], packIndex: PackIndex, logger: Logger, workers: int = DEFAULT_SERVE_WORKERS):
+        if workers < 1:
+            raise ServeException("The number of server workers must be greater than zero.")
+
+        self.packIndex = packIndex
+        self.logger = logger
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bonclok-serve')
+        self.statsLock = threading.Lock()
+        self.requestCount = 0
+        self.servedBytes = 0
+
+        try:
+            super().__init__(address, PackRequestHandler)
+        except OSError as exception:
+            self.executor.shutdown(wait=False)
+            raise ServeException("Failed to listen on: {}:{}: {}".format(address[0], address[1], exception))
+
+    # Get the base URL of the server
+    def get_base_url(self) -> str:
+        return "http://{}:{}".format(self.server_address[0], self.server_address[1])
+
+    def process_request(self, request, clientAddress) -> None:
+        self.executor.submit(self._process_request_worker, request, clientAddress)
+
+    def _process_request_worker(self, request, clientAddress) -> None:
+        try:
+            self.finish_request(request, clientAddress)
+        except Exception:
+            self.handle_error(request, clientAddress)
+        finally:
+            self.shutdown_request(request)
+
+    def handle_error(self, request, clientAddress) -> None:
+        self.logger.log_verbose("The connection of the client: {} failed.", clientAddress[0])
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # Record the served response in the server statistics
+    def record_response(self, size: int) -> None:
+        with self.statsLock:
+            self.requestCount += 1
+            self.servedBytes += size
+
+# Request handler of the pack server, the files are served with their checksums as the entity tags, with support for the conditional and range requests
+class PackRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'bonclok'
+    timeout = SERVE_IDLE_TIMEOUT
+
+    def log_message(self, format, *args) -> None:
+        self.server.logger.log_verbose("{} {}", self.address_string(), format % args)
+
+    def do_HEAD(self) -> None:
+        self._serve_request(False)
+
+    def do_GET(self) -> None:
+        self._serve_request(True)
+
+    def _serve_request(self, sendBody: bool) -> None:
+        requestPath = unquote(urlsplit(self.path).path)
+        if requestPath == PACK_INDEX_PATH:
+            indexContent = self.server.packIndex.get_index_content()
+            self._send_content(indexContent, 'application/json', '"{}"'.format(hashlib.sha256(indexContent).hexdigest()), sendBody)
+            return
+
+        filePath = requestPath.lstrip('/')
+        packFile = self.server.packIndex.get(filePath) if is_pack_path_valid(filePath) else None
+        if packFile == None:
+            self._send_empty_response(404)
+            return
+
+        acceptedEncodings = [ encoding.split(';')[0].strip().lower() for encoding in self.headers.get('Accept-Encoding', '').split(',') ]
+        contentType = mimetypes.guess_type(filePath)[0] or 'application/octet-stream'
+        isCompressible = posixpath.splitext(filePath)[1].lower() in COMPRESSED_FILE_EXTENSIONS
+        if isCompressible and 'gzip' in acceptedEncodings and self.headers.get('Range') == None:
+            try:
+                compressedContent = self.server.packIndex.get_compressed_content(packFile)
+            except OSError:
+                self._send_empty_response(404)
+                return
+
+            self._send_content(compressedContent, contentType, packFile.get_entity_tag(True), sendBody, { 'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding' })
+            return
+
+        self._send_file(packFile, contentType, sendBody, { 'Vary': 'Accept-Encoding' } if isCompressible else {})
+
+    # Send the in-memory content, the response is not modified if the client already has the content matching the entity tag
+    def _send_content(self, content: bytes, contentType: str, entityTag: str, sendBody: bool, headers: dict = {}) -> None:
+        if is_entity_tag_matching(self.headers.get('If-None-Match', ''), entityTag):
+            self._send_empty_response(304, { 'ETag': entityTag, **headers })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', entityTag)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if sendBody:
+            self.wfile.write(content)
+            self.server.record_response(len(content))
+
+    # Send the file or its requested range, the content is sent with the sendfile system call where possible, so it is not copied through the process memory
+    def _send_file(self, packFile: PackFile, contentType: str, sendBody: bool, headers: dict) -> None:
+        entityTag = packFile.get_entity_tag()
+        if is_entity_tag_matching(self.headers.get('If-None-Match', ''), entityTag):
+            self._send_empty_response(304, { 'ETag': entityTag, **headers })
+            return
+
+        # NOTE: The range is ignored if the client has a different version of the file, the whole current file is sent instead
+        byteRange = None
+        rangeHeader = self.headers.get('Range')
+        ifRangeHeader = self.headers.get('If-Range')
+        if rangeHeader != None and (ifRangeHeader == None or ifRangeHeader.strip() == entityTag):
+            byteRange = parse_byte_range(rangeHeader, packFile.size)
+
+        if byteRange != None and byteRange[0] > byteRange[1]:
+            self._send_empty_response(416, { 'Content-Range': 'bytes */{}'.format(packFile.size), **headers })
+            return
+
+        try:
+            sourceFile = open(self.server.packIndex.get_absolute_path(packFile.filePath), 'rb')
+        except OSError:
+            self._send_empty_response(404)
+            return
+
+        with sourceFile:
+            start, end = byteRange if byteRange != None else (0, packFile.size - 1)
+            self.send_response(206 if byteRange != None else 200)
+            if byteRange != None:
+                self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, packFile.size))
+            self.send_header('Content-Type', contentType)
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', entityTag)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+
+            if sendBody and end >= start:
+                self.wfile.flush()
+                self.connection.sendfile(sourceFile, start, end - start + 1)
+                self.server.record_response(end - start + 1)
+
+    def _send_empty_response(self, statusCode: int, headers: dict = {}) -> None:
+        self.send_response(statusCode)
+        self.send_header('Content-Length', '0')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+__all__ = [ 'DEFAULT_SERVE_HOST', 'DEFAULT_SERVE_WORKERS', 'PACK_INDEX_PATH', 'ServeException', 'PackFile', 'PackIndex', 'PackServer', 'parse_serve_address', 'parse_byte_range' ]
@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import os
+import threading
+from file import PlacementMethod, calculate_file_checksum, place_file, remove_file
+
+# The prefix of the builder internal files (manifest, temporary files) which are not installed from the build directory
+SYNC_EXCLUDED_FILE_PREFIX = '.bonclok-'
+
+# Exception base class implementation used to raise synchronization related exceptions
+class SyncException(Exception):
+    def __init__(self, message: str = "Unexpected synchronization failure."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Enum class that is representing the strategy used to synchronize the installation destination with the source
+class SyncMode(str, Enum):
+    # Copy only the files which are missing in the destination
+    MISSING = 'missing'
+    # Copy the missing files and the files which changed since the previous synchronization
+    UPDATE = 'update'
+    # Copy the missing and changed files and remove the destination files which are not present in the source
+    MIRROR = 'mirror'
+
+# Class used to store the synchronization options
+class SyncOptions():
+    def __init__(self, mode: SyncMode, compareChecksum: bool, useHardlinks: bool, jobs: int):
+        self.mode = SyncMode(mode)
+        self.compareChecksum = compareChecksum
+        self.useHardlinks = useHardlinks
+        self.jobs = jobs
+
+# Class used to store the number of files placed by every placement method, the counts are formatted only when the text is requested (by the deferred verbose logging)
+class PlacementCounts(dict):
+    def __str__(self) -> str:
+        return ", ".join("{} {}".format(count, method) for method, count in sorted(self.items()))
+
+# Class used to store the statistics of a synchronization
+class SyncResult():
+    def __init__(self):
+        self.copiedCount = 0
+        self.copiedBytes = 0
+        self.skippedCount = 0
+        self.removedCount = 0
+        self.placementCounts = PlacementCounts()
+        self.resultLock = threading.Lock()
+
+    # Register a copied file and the method used to place it in a thread-safe way
+    def add_copied(self, size: int, placementMethod: PlacementMethod) -> None:
+        with self.resultLock:
+            self.copiedCount += 1
+            self.copiedBytes += size
+            self.placementCounts[placementMethod.value] = self.placementCounts.get(placementMethod.value, 0) + 1
+
+    # Register a skipped file in a thread-safe way
+    def add_skipped(self) -> None:
+        with self.resultLock:
+            self.skippedCount += 1
+
+# Check if the destination file differs from the source file, the size and modification time are compared first and the content checksum only if requested
+def is_file_changed(sourcePath: str, destinationPath: str, compareChecksum: bool) -> bool:
+    try:
+        destinationStat = os.stat(destinationPath)
+    except FileNotFoundError:
+        return True
+
+    sourceStat = os.stat(sourcePath)
+    if sourceStat.st_ino == destinationStat.st_ino and sourceStat.st_dev == destinationStat.st_dev:
+        return False
+
+    if sourceStat.st_size != destinationStat.st_size:
+        return True
+
+    if compareChecksum:
+        return calculate_file_checksum(sourcePath) != calculate_file_checksum(destinationPath)
+
+    return sourceStat.st_mtime_ns != destinationStat.st_mtime_ns
+
+# Synchronize a single file, the return Boolean value is indicating if the file was copied
+def synchronize_file(sourcePath: str, destinationPath: str, options: SyncOptions, result: SyncResult) -> bool:
+    if options.mode == SyncMode.MISSING:
+        shouldCopy = not os.path.exists(destinationPath)
+    else:
+        shouldCopy = is_file_changed(sourcePath, destinationPath, options.compareChecksum)
+
+    if not shouldCopy:
+        result.add_skipped()
+        return False
+
+    os.makedirs(os.path.dirname(os.path.abspath(destinationPath)), exist_ok=True)
+
+    placementMethod = place_file(sourcePath, destinationPath, options.useHardlinks)
+    if placementMethod == None:
+        raise SyncException("Failed to copy the file: {} to: {}.".format(sourcePath, destinationPath))
+
+    result.add_copied(os.path.getsize(destinationPath), placementMethod)
+    return True
+
+# Remove the destination files and directories which are not present in the source directory tree
+def remove_extra_files(sourceDirectory: str, destinationDirectory: str, result: SyncResult) -> None:
+    for dirName, directories, files in os.walk(destinationDirectory, topdown=False):
+        relativeDirName = os.path.relpath(dirName, destinationDirectory)
+        sourceDirName = os.path.normpath(os.path.join(sourceDirectory, relativeDirName))
+
+        for fileName in files:
+            # NOTE: The internal files copied into the destination by the previous versions are treated as absent from the source, so the mirror mode removes them
+            if fileName.startswith(SYNC_EXCLUDED_FILE_PREFIX) or not os.path.isfile(os.path.join(sourceDirName, fileName)):
+                if not remove_file(os.path.join(dirName, fileName)):
+                    raise SyncException("Failed to remove the file: {}.".format(os.path.join(dirName, fileName)))
+                result.removedCount += 1
+
+        for directoryName in directories:
+            extraDirectory = os.path.join(dirName, directoryName)
+            if os.path.isdir(os.path.join(sourceDirName, directoryName)):
+                continue
+
+            # NOTE: The symbolic links to directories are not followed by the walk, only the link itself is removed, so the content outside the destination is never touched
+            if os.path.islink(extraDirectory):
+                if not remove_file(extraDirectory):
+                    raise SyncException("Failed to remove the file: {}.".format(extraDirectory))
+                result.removedCount += 1
+            elif len(os.listdir(extraDirectory)) == 0:
+                os.rmdir(extraDirectory)
+
+# Synchronize the source file or directory tree with the destination according to the synchronization mode, the files are copied in parallel
+def synchronize(sourcePath: str, destinationPath: str, options: SyncOptions) -> SyncResult:
+    result = SyncResult()
+
+    if os.path.isfile(sourcePath):
+        # NOTE: Same as for the shutil.copy, the file is copied into the destination if the destination is an existing directory
+        if os.path.isdir(destinationPath):
+            destinationPath = os.path.join(destinationPath, os.path.basename(sourcePath))
+
+        synchronize_file(sourcePath, destinationPath, options, result)
+        return result
+
+    if not os.path.isdir(sourcePath):
+        raise SyncException("The synchronization source: {} is not a file or directory.".format(sourcePath))
+
+    if os.path.exists(destinationPath) and not os.path.isdir(destinationPath):
+        raise SyncException("The synchronization destination: {} is not a directory.".format(destinationPath))
+
+    filePairs = []
+    for dirName, _, files in os.walk(sourcePath):
+        relativeDirName = os.path.relpath(dirName, sourcePath)
+        os.makedirs(os.path.normpath(os.path.join(destinationPath, relativeDirName)), exist_ok=True)
+        for fileName in files:
+            if fileName.startswith(SYNC_EXCLUDED_FILE_PREFIX):
+                continue
+
+            filePairs.append((os.path.join(dirName, fileName), os.path.normpath(os.path.join(destinationPath, relativeDirName, fileName))))
+
+    with ThreadPoolExecutor(max_workers=options.jobs) as executor:
+        futures = [ executor.submit(synchronize_file, sourceFilePath, destinationFilePath, options, result) for sourceFilePath, destinationFilePath in filePairs ]
+        try:
+            for future in futures:
+                future.result()
+        except:
+            for future in futures:
+                future.cancel()
+            raise
+
+    if options.mode == SyncMode.MIRROR:
+        remove_extra_files(sourcePath, destinationPath, result)
+
+    return result
+
+__all__ = [ 'SyncException', 'SyncMode', 'SyncOptions', 'SyncResult', 'synchronize' ]
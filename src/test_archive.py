@@ -0,0 +1,70 @@
+import archive
+from archive import put_directory_into_archive
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+
+class TestPutDirectoryIntoArchive(unittest.TestCase):
+    def setUp(self):
+        self.temporaryDirectory = tempfile.TemporaryDirectory()
+        self.buildDirectory = os.path.join(self.temporaryDirectory.name, 'pack-build')
+        os.makedirs(os.path.join(self.buildDirectory, 'mods'))
+        os.makedirs(os.path.join(self.buildDirectory, 'config'))
+
+        with open(os.path.join(self.buildDirectory, 'mods', 'mod.jar'), 'wb') as modFile:
+            modFile.write(os.urandom(4096))
+
+        with open(os.path.join(self.buildDirectory, 'config', 'mod.toml'), 'w') as configFile:
+            configFile.write('value = 1\n' * 100)
+
+        with open(os.path.join(self.buildDirectory, '.bonclok-manifest.json'), 'w') as manifestFile:
+            manifestFile.write('{}')
+
+    def tearDown(self):
+        self.temporaryDirectory.cleanup()
+
+    def create_archive(self, name: str, jobs: int) -> str:
+        archivePath = os.path.join(self.temporaryDirectory.name, name)
+        put_directory_into_archive(self.buildDirectory, archivePath, jobs)
+        return archivePath
+
+    def test_entries_are_sorted_and_relative(self):
+        with ZipFile(self.create_archive('pack.zip', 2)) as zipArchive:
+            self.assertIsNone(zipArchive.testzip())
+            self.assertEqual(zipArchive.namelist(), [ 'config/', 'config/mod.toml', 'mods/', 'mods/mod.jar' ])
+            self.assertEqual(zipArchive.getinfo('mods/mod.jar').compress_type, ZIP_STORED)
+            self.assertEqual(zipArchive.getinfo('config/mod.toml').compress_type, ZIP_DEFLATED)
+            self.assertEqual(zipArchive.read('config/mod.toml'), b'value = 1\n' * 100)
+
+    def test_archive_is_reproducible(self):
+        firstArchivePath = self.create_archive('first.zip', 1)
+        os.utime(os.path.join(self.buildDirectory, 'config', 'mod.toml'), (0, 0))
+        secondArchivePath = self.create_archive('second.zip', 4)
+
+        with open(firstArchivePath, 'rb') as firstArchive, open(secondArchivePath, 'rb') as secondArchive:
+            self.assertEqual(firstArchive.read(), secondArchive.read())
+
+    def test_serial_fallback_writes_identical_archive(self):
+        self.assertTrue(archive.PRECOMPRESSED_ENTRIES_SUPPORTED)
+        parallelArchivePath = self.create_archive('parallel.zip', 4)
+        with mock.patch.object(archive, 'PRECOMPRESSED_ENTRIES_SUPPORTED', False):
+            serialArchivePath = self.create_archive('serial.zip', 4)
+
+        with open(parallelArchivePath, 'rb') as parallelArchive, open(serialArchivePath, 'rb') as serialArchive:
+            self.assertEqual(parallelArchive.read(), serialArchive.read())
+
+    def test_archive_has_default_permissions(self):
+        umask = os.umask(0o022)
+        os.umask(umask)
+
+        archivePath = self.create_archive('pack.zip', 2)
+        self.assertEqual(stat.S_IMODE(os.stat(archivePath).st_mode), 0o666 & ~umask)
+        self.assertEqual(sorted(os.listdir(self.temporaryDirectory.name)), [ 'pack-build', 'pack.zip' ])
+
+
+if __name__ == '__main__':
+    unittest.main()
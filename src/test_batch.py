@@ -0,0 +1,72 @@
+from batch import BatchBuilder
+from builder import ModpackBuilderOptions
+from logger import Logger
+from test_builder import BuilderTestCase
+import io
+import json
+import os
+import unittest
+
+
+class TestBatchBuilder(BuilderTestCase):
+    def create_modpack_copy(self, fileName: str, update) -> str:
+        with open(self.modpackFilePath, 'r') as modpackFile:
+            modpack = json.load(modpackFile)
+
+        update(modpack)
+        modpackFilePath = os.path.join(self.directory.name, fileName)
+        with open(modpackFilePath, 'w') as modpackFile:
+            json.dump(modpack, modpackFile)
+
+        return modpackFilePath
+
+    def create_batch_builder(self, modpackFilePaths: list[str]) -> BatchBuilder:
+        options = ModpackBuilderOptions(skipChecksum=False, forceBuild=False, packToZip=False, buildTarget='client', jobs=2, retries=0, retryBackoff=0)
+        return BatchBuilder(modpackFilePaths, options, Logger(io.StringIO(), False), 2)
+
+    def test_shared_resources_are_downloaded_once(self):
+        # NOTE: The second modpack includes the api and the first two mods of the benchmark modpack, only the mod 0 of them is included in the client target
+        def create_subset(modpack: dict) -> None:
+            modpack['name'] = 'subset'
+            modpack['mods'] = modpack['mods'][:2]
+
+        batchBuilder = self.create_batch_builder([ self.modpackFilePath, self.create_modpack_copy('subset.json', create_subset) ])
+
+        self.assertTrue(batchBuilder.build())
+        self.assertEqual(batchBuilder.get_resource_statistics(), (6, 4))
+        self.assertEqual(self.server.requestCount, 4)
+        self.assertEqual(sum(result.downloadedCount for result in batchBuilder.results), 4)
+        self.assertEqual(sum(result.linkedCount for result in batchBuilder.results), 2)
+        self.assertTrue(batchBuilder.verify(1))
+
+        reportFilePath = os.path.join(self.directory.name, 'report.json')
+        self.assertTrue(batchBuilder.save_report(reportFilePath))
+        with open(reportFilePath, 'r') as reportFile:
+            report = json.load(reportFile)
+
+        self.assertEqual((report['resourceReferences'], report['uniqueResources']), (6, 4))
+        self.assertEqual(sum(modpack['downloadedBytes'] for modpack in report['modpacks']), sum(len(content) for path, content in self.server.resources.items() if path in ('/api/modding-api.jar', '/mods/mod-0.jar', '/mods/mod-2.jar', '/mods/mod-3.jar')))
+
+    def test_duplicate_name_and_version_is_rejected(self):
+        duplicateFilePath = self.create_modpack_copy('duplicate.json', lambda modpack: None)
+        batchBuilder = self.create_batch_builder([ self.modpackFilePath, duplicateFilePath ])
+
+        self.assertEqual(len(batchBuilder.builders), 1)
+        self.assertEqual(batchBuilder.results[1].errorMessage, "The modpack name and version are not unique.")
+        self.assertFalse(batchBuilder.build())
+        self.assertTrue(batchBuilder.results[0].succeeded)
+
+    def test_downloads_failing_verification_are_not_counted(self):
+        def corrupt_checksums(modpack: dict) -> None:
+            for resource in [ modpack['api'] ] + modpack['mods']:
+                resource['checksum'] = '0' * 64
+
+        batchBuilder = self.create_batch_builder([ self.create_modpack_copy('corrupted.json', corrupt_checksums) ])
+
+        self.assertFalse(batchBuilder.build())
+        self.assertGreater(self.server.requestCount, 0)
+        self.assertEqual((batchBuilder.results[0].downloadedCount, batchBuilder.results[0].downloadedBytes), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+from benchmark import ModHostingRequestHandler, ModHostingServer, create_argument_parser, generate_modpack
+from builder import FetchOutcome, ModpackBuilder, ModpackBuilderException, ModpackBuilderOptions, get_build_directory
+from logger import Logger
+from models import ModpackTarget
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+
+# Request handler of the mod hosting server which sends the entity tags and answers the matching conditional requests with 304 (counted by the server), a misbehaving server answers all requests with 304
+class RevalidatingRequestHandler(ModHostingRequestHandler):
+    def get_entity_tag(self) -> str:
+        content = self.server.resources.get(self.path)
+        return '"{}"'.format(hashlib.sha256(content).hexdigest()) if content != None else None
+
+    def do_GET(self) -> None:
+        entityTag = self.get_entity_tag()
+        if getattr(self.server, 'alwaysNotModified', False) or (entityTag != None and self.headers.get('If-None-Match') == entityTag):
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            with self.server.statsLock:
+                self.server.notModifiedCount += 1
+            return
+
+        super().do_GET()
+
+    def end_headers(self) -> None:
+        entityTag = self.get_entity_tag()
+        if entityTag != None:
+            self.send_header('ETag', entityTag)
+        super().end_headers()
+
+
+class BuilderTestCase(unittest.TestCase):
+    def setUp(self):
+        # NOTE: The build directories are created in the working directory
+        self.previousDirectory = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+        self.server = self.start_server({}, 0)
+        arguments = create_argument_parser().parse_args([ '--mods', '4', '--mean-size', '4096', '--api-size', '8192' ])
+        self.modpackFilePath, self.server.resources = generate_modpack(self.directory.name, self.server.get_base_url(), arguments)
+        self.buildDirectory = get_build_directory('benchmark', '1.0.0', ModpackTarget.CLIENT)
+
+    def tearDown(self):
+        os.chdir(self.previousDirectory)
+        self.directory.cleanup()
+
+    def start_server(self, resources: dict[str, bytes], latency: float) -> ModHostingServer:
+        server = ModHostingServer(resources, latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def update_modpack(self, update) -> None:
+        with open(self.modpackFilePath, 'r') as modpackFile:
+            modpack = json.load(modpackFile)
+
+        update(modpack)
+        with open(self.modpackFilePath, 'w') as modpackFile:
+            json.dump(modpack, modpackFile)
+
+    def create_builder(self, buildTarget: str = 'client', revalidate: bool = False) -> ModpackBuilder:
+        options = ModpackBuilderOptions(skipChecksum=False, forceBuild=False, packToZip=False, buildTarget=buildTarget, jobs=2, retries=0, retryBackoff=0, revalidate=revalidate)
+        self.logStream = io.StringIO()
+        return ModpackBuilder(self.modpackFilePath, options, Logger(self.logStream, False))
+
+    def get_fetch_outcomes(self, builder: ModpackBuilder) -> list[str]:
+        return [ event.attributes['outcome'] for event in builder.trace.events if event.phase == 'fetch' ]
+
+
+class TestIncrementalBuild(BuilderTestCase):
+    def test_unchanged_rebuild_downloads_nothing_and_removes_stale_files(self):
+        self.create_builder().build()
+        downloadCount = self.server.requestCount
+        self.assertTrue(os.path.isfile(os.path.join(self.buildDirectory, 'mods', 'mod-0.jar')))
+
+        self.create_builder().build()
+        self.assertEqual(self.server.requestCount, downloadCount)
+
+        self.update_modpack(lambda modpack: modpack['mods'].pop(0))
+        builder = self.create_builder()
+        builder.build()
+
+        self.assertEqual(self.server.requestCount, downloadCount)
+        self.assertFalse(os.path.exists(os.path.join(self.buildDirectory, 'mods', 'mod-0.jar')))
+        self.assertFalse(os.path.exists(os.path.join(self.buildDirectory, 'config', 'mod-0', 'config-0.toml')))
+        self.assertTrue(builder.verify(1))
+
+
+class TestFetchOutcome(BuilderTestCase):
+    def test_resources_shared_between_targets_are_reported_as_linked(self):
+        builder = self.create_builder('')
+        builder.build()
+
+        # NOTE: The benchmark modpack includes the api and the mods 0 and 3 in both targets, the mod 1 only in the server and the mod 2 only in the client
+        outcomes = self.get_fetch_outcomes(builder)
+        self.assertEqual(outcomes.count(FetchOutcome.DOWNLOADED.value), 5)
+        self.assertEqual(outcomes.count(FetchOutcome.LINKED.value), 3)
+        self.assertEqual(self.server.requestCount, 5)
+        self.assertEqual(self.logStream.getvalue().count("placed from the already fetched file"), 3)
+
+
+class TestMirrorFailover(BuilderTestCase):
+    def test_failing_primary_falls_over_to_next_mirror(self):
+        resourcePath = '/mods/mod-0.jar'
+        self.assertIn(resourcePath, self.server.resources)
+
+        # NOTE: The mirror responds slower than the primary, so the primary is ordered first and the mirror is only used after the primary fails
+        mirrorServer = self.start_server({ resourcePath: self.server.resources.pop(resourcePath) }, 0.05)
+        self.update_modpack(lambda modpack: modpack['mods'][0].update(mirrorUrls=[ mirrorServer.get_base_url() + resourcePath ]))
+
+        builder = self.create_builder()
+        builder.build()
+
+        downloadEvents = [ event for event in builder.trace.events if event.phase == 'download' and event.subject == 'Benchmark mod 0' ]
+        self.assertEqual([ event.attributes['statusCode'] for event in downloadEvents ], [ 404, 200 ])
+        self.assertEqual(downloadEvents[0].attributes['host'], '{}:{}'.format(*self.server.server_address))
+        self.assertEqual(mirrorServer.requestCount, 1)
+        self.assertTrue(builder.verify(1))
+
+
+class TestRevalidation(BuilderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.RequestHandlerClass = RevalidatingRequestHandler
+        self.server.notModifiedCount = 0
+
+    def test_unchanged_resources_are_kept(self):
+        self.create_builder().build()
+        downloadCount = self.server.requestCount
+
+        headCount = self.server.headCount
+
+        builder = self.create_builder(revalidate=True)
+        builder.build()
+
+        # NOTE: Every resource is revalidated with exactly one conditional request, the size probes are skipped as the 304 response is empty
+        outcomes = self.get_fetch_outcomes(builder)
+        self.assertEqual(self.server.notModifiedCount, len(outcomes))
+        self.assertEqual(self.server.headCount, headCount)
+        self.assertEqual(self.server.requestCount, downloadCount)
+        self.assertEqual(set(outcomes), { FetchOutcome.NOT_MODIFIED.value })
+        self.assertEqual(len(outcomes), 4)
+        self.assertTrue(builder.verify(1))
+
+    def test_not_modified_response_to_unconditional_request_fails_the_build(self):
+        self.server.alwaysNotModified = True
+
+        with self.assertRaises(ModpackBuilderException):
+            self.create_builder().build()
+
+        self.assertFalse(os.path.exists(os.path.join(self.buildDirectory, 'mods', 'mod-0.jar')))
+
+
+class TestChecksumVerification(BuilderTestCase):
+    def test_upper_case_checksums_are_accepted(self):
+        def uppercase_checksums(modpack: dict) -> None:
+            for resource in [ modpack['api'] ] + modpack['mods']:
+                resource['checksum'] = resource['checksum'].upper()
+
+        self.update_modpack(uppercase_checksums)
+        builder = self.create_builder()
+        builder.build()
+
+        self.assertTrue(os.path.isfile(os.path.join(self.buildDirectory, 'mods', 'mod-0.jar')))
+        self.assertTrue(builder.verify(1))
+
+    def test_checksum_mismatch_removes_downloaded_file(self):
+        self.update_modpack(lambda modpack: modpack['mods'][0].update(checksum='0' * 64))
+
+        with self.assertRaises(ModpackBuilderException):
+            self.create_builder().build()
+
+        leftoverFiles = [ name for _, _, fileNames in os.walk(self.directory.name) for name in fileNames if name.endswith('.part') ]
+        self.assertEqual(leftoverFiles, [])
+        self.assertFalse(os.path.exists(os.path.join(self.buildDirectory, 'mods', 'mod-0.jar')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from bundle import ArtifactBundle, BundleException, write_artifact_bundle
+import hashlib
+import os
+import stat
+import tempfile
+import unittest
+
+
+class TestArtifactBundle(unittest.TestCase):
+    def setUp(self):
+        self.temporaryDirectory = tempfile.TemporaryDirectory()
+        self.bundleFilePath = os.path.join(self.temporaryDirectory.name, 'pack.bundle')
+        self.artifacts = {}
+        for name, content in [ ('a.jar', b'first'), ('b.jar', b'second' * 1000), ('empty.jar', b'') ]:
+            artifactPath = os.path.join(self.temporaryDirectory.name, name)
+            with open(artifactPath, 'wb') as artifactFile:
+                artifactFile.write(content)
+
+            self.artifacts[hashlib.sha256(content).hexdigest()] = (artifactPath, content)
+
+    def tearDown(self):
+        self.temporaryDirectory.cleanup()
+
+    def write_bundle(self) -> int:
+        return write_artifact_bundle(self.bundleFilePath, { checksum: artifactPath for checksum, (artifactPath, _) in self.artifacts.items() })
+
+    def test_restore_artifacts_by_checksum(self):
+        self.assertEqual(self.write_bundle(), 5 + 6000)
+
+        bundle = ArtifactBundle(self.bundleFilePath)
+        try:
+            self.assertEqual(bundle.entryCount, 3)
+            for checksum, (_, content) in self.artifacts.items():
+                targetPath = os.path.join(self.temporaryDirectory.name, 'restored.jar')
+                self.assertTrue(bundle.contains(checksum.upper()))
+                self.assertTrue(bundle.restore(checksum, targetPath))
+                with open(targetPath, 'rb') as restoredFile:
+                    self.assertEqual(restoredFile.read(), content)
+
+            missingChecksum = hashlib.sha256(b'missing').hexdigest()
+            self.assertFalse(bundle.contains(missingChecksum))
+            self.assertFalse(bundle.restore(missingChecksum, os.path.join(self.temporaryDirectory.name, 'missing.jar')))
+            self.assertFalse(bundle.contains('invalid'))
+        finally:
+            bundle.close()
+
+    def test_written_files_have_default_permissions(self):
+        umask = os.umask(0o022)
+        os.umask(umask)
+        self.write_bundle()
+
+        targetPath = os.path.join(self.temporaryDirectory.name, 'restored.jar')
+        bundle = ArtifactBundle(self.bundleFilePath)
+        try:
+            self.assertTrue(bundle.restore(hashlib.sha256(b'first').hexdigest(), targetPath))
+        finally:
+            bundle.close()
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.bundleFilePath).st_mode), 0o666 & ~umask)
+        self.assertEqual(stat.S_IMODE(os.stat(targetPath).st_mode), 0o666 & ~umask)
+
+    def test_restore_rejects_corrupted_content(self):
+        self.write_bundle()
+        checksum = hashlib.sha256(b'second' * 1000).hexdigest()
+        bundle = ArtifactBundle(self.bundleFilePath)
+        offset, _ = bundle.get_entry(checksum)
+        bundle.close()
+        with open(self.bundleFilePath, 'r+b') as bundleFile:
+            bundleFile.seek(offset)
+            bundleFile.write(b'!')
+
+        targetPath = os.path.join(self.temporaryDirectory.name, 'restored.jar')
+        bundle = ArtifactBundle(self.bundleFilePath)
+        try:
+            self.assertFalse(bundle.restore(checksum, targetPath))
+        finally:
+            bundle.close()
+
+        self.assertFalse(os.path.exists(targetPath))
+        self.assertEqual([ name for name in os.listdir(self.temporaryDirectory.name) if name.startswith('.bonclok-bundle-') ], [])
+
+    def test_write_rejects_mismatching_artifact(self):
+        checksum = hashlib.sha256(b'expected').hexdigest()
+        with self.assertRaises(BundleException):
+            write_artifact_bundle(self.bundleFilePath, { checksum: self.artifacts[hashlib.sha256(b'first').hexdigest()][0] })
+
+        self.assertFalse(os.path.exists(self.bundleFilePath))
+
+    def test_open_rejects_invalid_file(self):
+        with open(self.bundleFilePath, 'wb') as bundleFile:
+            bundleFile.write(b'not a bundle file')
+
+        with self.assertRaises(BundleException):
+            ArtifactBundle(self.bundleFilePath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+from cache import ArtifactCache
+import hashlib
+import os
+import tempfile
+import unittest
+
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        self.temporaryDirectory = tempfile.TemporaryDirectory()
+        self.cacheDirectory = os.path.join(self.temporaryDirectory.name, 'cache')
+
+    def tearDown(self):
+        self.temporaryDirectory.cleanup()
+
+    def create_artifact(self, name: str, content: bytes) -> tuple[str, str]:
+        artifactPath = os.path.join(self.temporaryDirectory.name, name)
+        with open(artifactPath, 'wb') as artifactFile:
+            artifactFile.write(content)
+
+        return artifactPath, hashlib.sha256(content).hexdigest()
+
+    def test_store_and_restore(self):
+        cache = ArtifactCache(self.cacheDirectory, 1024 * 1024)
+        artifactPath, checksum = self.create_artifact('a.jar', b'artifact')
+
+        self.assertTrue(cache.store(checksum, artifactPath))
+
+        targetPath = os.path.join(self.temporaryDirectory.name, 'restored.jar')
+        self.assertTrue(cache.restore(checksum, targetPath))
+        with open(targetPath, 'rb') as targetFile:
+            self.assertEqual(targetFile.read(), b'artifact')
+
+    def test_store_rejects_mismatching_checksum(self):
+        cache = ArtifactCache(self.cacheDirectory, 1024 * 1024)
+        artifactPath, _ = self.create_artifact('a.jar', b'artifact')
+
+        self.assertFalse(cache.store(hashlib.sha256(b'other').hexdigest(), artifactPath))
+
+    def test_restore_removes_corrupted_entry(self):
+        cache = ArtifactCache(self.cacheDirectory, 1024 * 1024)
+        artifactPath, checksum = self.create_artifact('a.jar', b'artifact')
+        cache.store(checksum, artifactPath)
+
+        with open(cache.get_entry_path(checksum), 'ab') as entryFile:
+            entryFile.write(b'corruption')
+
+        self.assertFalse(cache.restore(checksum, os.path.join(self.temporaryDirectory.name, 'restored.jar')))
+        self.assertFalse(cache.contains(checksum))
+
+    def test_trim_evicts_least_recently_used(self):
+        cache = ArtifactCache(self.cacheDirectory, 10)
+        oldPath, oldChecksum = self.create_artifact('old.jar', b'0123456789')
+        newPath, newChecksum = self.create_artifact('new.jar', b'abcdefghij')
+        cache.store(oldChecksum, oldPath)
+        cache.store(newChecksum, newPath)
+        os.utime(cache.get_entry_path(oldChecksum), (0, 0))
+
+        self.assertEqual(cache.trim(), 1)
+        self.assertFalse(cache.contains(oldChecksum))
+        self.assertTrue(cache.contains(newChecksum))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+from delta import DeltaException, apply_delta_package, create_delta_package, get_build_file_checksums
+import json
+import os
+import stat
+import tempfile
+import unittest
+from zipfile import ZipFile
+
+
+class TestDeltaPackage(unittest.TestCase):
+    def setUp(self):
+        self.temporaryDirectory = tempfile.TemporaryDirectory()
+        self.baseDirectory = os.path.join(self.temporaryDirectory.name, 'base')
+        self.updatedDirectory = os.path.join(self.temporaryDirectory.name, 'updated')
+        self.deltaFilePath = os.path.join(self.temporaryDirectory.name, 'pack-delta.zip')
+
+        self.create_file(self.baseDirectory, 'api.jar', b'api')
+        self.create_file(self.baseDirectory, 'mods/kept.jar', b'kept')
+        self.create_file(self.baseDirectory, 'mods/changed.jar', b'old')
+        self.create_file(self.baseDirectory, 'mods/removed.jar', b'removed')
+
+        self.create_file(self.updatedDirectory, 'api.jar', b'api')
+        self.create_file(self.updatedDirectory, 'mods/kept.jar', b'kept')
+        self.create_file(self.updatedDirectory, 'mods/changed.jar', b'new')
+        self.create_file(self.updatedDirectory, 'config/added.toml', b'value = 1\n')
+        self.create_file(self.updatedDirectory, '.bonclok-manifest.json', b'{}')
+
+    def tearDown(self):
+        self.temporaryDirectory.cleanup()
+
+    def create_file(self, directory: str, relativePath: str, content: bytes) -> None:
+        filePath = os.path.join(directory, relativePath)
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        with open(filePath, 'wb') as targetFile:
+            targetFile.write(content)
+
+    def test_package_contains_only_changes(self):
+        deltaPackage = create_delta_package(get_build_file_checksums(self.baseDirectory, 1), self.updatedDirectory, self.deltaFilePath, 1)
+
+        self.assertEqual(deltaPackage.changedFiles, [ 'config/added.toml', 'mods/changed.jar' ])
+        self.assertEqual(deltaPackage.removedFiles, [ 'mods/removed.jar' ])
+        with ZipFile(self.deltaFilePath) as deltaArchive:
+            self.assertEqual(deltaArchive.namelist(), [ '.bonclok-delta.json', 'config/added.toml', 'mods/changed.jar' ])
+
+    def test_apply_updates_pack_in_place(self):
+        create_delta_package(get_build_file_checksums(self.baseDirectory, 1), self.updatedDirectory, self.deltaFilePath, 1)
+        self.create_file(self.baseDirectory, 'saves/world.dat', b'world')
+
+        result = apply_delta_package(self.deltaFilePath, self.baseDirectory, 1)
+
+        self.assertTrue(result.is_valid())
+        self.assertEqual((result.writtenCount, result.removedCount), (2, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.baseDirectory, 'mods', 'removed.jar')))
+        with open(os.path.join(self.baseDirectory, 'mods', 'changed.jar'), 'rb') as changedFile:
+            self.assertEqual(changedFile.read(), b'new')
+
+    def test_apply_keeps_permissions_of_replaced_files(self):
+        umask = os.umask(0o022)
+        os.umask(umask)
+        os.chmod(os.path.join(self.baseDirectory, 'mods', 'changed.jar'), 0o640)
+        create_delta_package(get_build_file_checksums(self.baseDirectory, 1), self.updatedDirectory, self.deltaFilePath, 1)
+
+        apply_delta_package(self.deltaFilePath, self.baseDirectory, 1)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.deltaFilePath).st_mode), 0o666 & ~umask)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.baseDirectory, 'mods', 'changed.jar')).st_mode), 0o640)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.baseDirectory, 'config', 'added.toml')).st_mode), 0o666 & ~umask)
+
+    def test_apply_reports_mismatching_base(self):
+        create_delta_package(get_build_file_checksums(self.baseDirectory, 1), self.updatedDirectory, self.deltaFilePath, 1)
+        self.create_file(self.baseDirectory, 'mods/kept.jar', b'modified')
+
+        result = apply_delta_package(self.deltaFilePath, self.baseDirectory, 1)
+
+        self.assertFalse(result.is_valid())
+        self.assertEqual(result.verification.corruptedFiles, [ 'mods/kept.jar' ])
+
+    def test_apply_rejects_paths_outside_pack(self):
+        with ZipFile(self.deltaFilePath, 'w') as deltaArchive:
+            deltaArchive.writestr('.bonclok-delta.json', json.dumps({ 'formatVersion': 1, 'files': {}, 'changedFiles': [ '../escaped.jar' ], 'removedFiles': [] }))
+            deltaArchive.writestr('../escaped.jar', b'escaped')
+
+        with self.assertRaises(DeltaException):
+            apply_delta_package(self.deltaFilePath, self.baseDirectory, 1)
+
+        self.assertFalse(os.path.exists(os.path.join(self.temporaryDirectory.name, 'escaped.jar')))
+
+
+if __name__ == '__main__':
+    unittest.main()
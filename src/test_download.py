@@ -0,0 +1,157 @@
+from download import RetryPolicy, create_http_session, download_resource
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import unittest
+
+
+# Local HTTP server answering the requests with the scripted responses in order, the last response is repeated for the remaining requests
+class ScriptedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        self.responses = []
+        self.requestHeaders = []
+        super().__init__(('127.0.0.1', 0), ScriptedRequestHandler)
+
+    def get_url(self, path: str) -> str:
+        return "http://{}:{}{}".format(self.server_address[0], self.server_address[1], path)
+
+class ScriptedRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.server.requestHeaders.append(self.headers)
+        respond = self.server.responses.pop(0) if len(self.server.responses) > 1 else self.server.responses[0]
+        respond(self)
+
+# Create the scripted response sending the content, the connection is dropped after the specified number of body bytes
+def content_response(content: bytes, statusCode: int = 200, headers: dict = {}, dropAfter: int = None):
+    def respond(handler: BaseHTTPRequestHandler) -> None:
+        handler.send_response(statusCode)
+        handler.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+
+        if dropAfter != None:
+            handler.wfile.write(content[:dropAfter])
+            handler.close_connection = True
+        else:
+            handler.wfile.write(content)
+
+    return respond
+
+def get_process_umask() -> int:
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+class DownloadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = ScriptedServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.session = create_http_session(2)
+        self.content = bytes(range(256)) * 256
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def get_leftover_files(self) -> list[str]:
+        return [ name for name in os.listdir(self.directory.name) if name.endswith('.part') ]
+
+
+class TestDownloadResource(DownloadTestCase):
+    def test_downloaded_file_has_default_permissions(self):
+        self.server.responses = [ content_response(self.content) ]
+
+        result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name)
+
+        self.assertTrue(result.succeeded())
+        self.assertEqual(result.checksum, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(stat.S_IMODE(os.stat(result.temporaryFilePath).st_mode), 0o666 & ~get_process_umask())
+
+    def test_dropped_connection_is_resumed(self):
+        rangeHeaders = { 'Accept-Ranges': 'bytes', 'ETag': '"v1"' }
+        self.server.responses = [
+            content_response(self.content, headers=rangeHeaders, dropAfter=1000),
+            content_response(self.content[1000:], 206, { **rangeHeaders, 'Content-Range': 'bytes 1000-{}/{}'.format(len(self.content) - 1, len(self.content)) }),
+        ]
+
+        result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name, RetryPolicy(1, 0))
+
+        self.assertTrue(result.succeeded())
+        self.assertEqual((result.attempts, result.resumedBytes, result.size), (2, 1000, len(self.content)))
+        self.assertEqual(result.checksum, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(self.server.requestHeaders[1]['Range'], 'bytes=1000-')
+        self.assertEqual(self.server.requestHeaders[1]['If-Range'], '"v1"')
+
+    def test_ignored_range_request_restarts_download(self):
+        self.server.responses = [
+            content_response(self.content, headers={ 'Accept-Ranges': 'bytes' }, dropAfter=1000),
+            content_response(self.content),
+        ]
+
+        result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name, RetryPolicy(1, 0))
+
+        self.assertTrue(result.succeeded())
+        self.assertEqual((result.statusCode, result.resumedBytes, result.size), (200, 0, len(self.content)))
+        self.assertEqual(result.checksum, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(self.server.requestHeaders[1]['Range'], 'bytes=1000-')
+
+    def test_retryable_status_code_is_retried(self):
+        self.server.responses = [ content_response(b'busy', 503), content_response(self.content) ]
+
+        result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name, RetryPolicy(2, 0))
+
+        self.assertTrue(result.succeeded())
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(result.checksum, hashlib.sha256(self.content).hexdigest())
+
+    def test_failed_download_removes_temporary_file(self):
+        self.server.responses = [ content_response(b'busy', 503) ]
+
+        result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name, RetryPolicy(1, 0))
+
+        self.assertFalse(result.succeeded())
+        self.assertEqual((result.statusCode, result.attempts), (503, 2))
+        self.assertEqual(self.get_leftover_files(), [])
+
+
+class TestConditionalDownload(DownloadTestCase):
+    def test_not_modified_response_to_conditional_request(self):
+        self.server.responses = [ content_response(b'', 304, { 'ETag': '"v2"' }) ]
+
+        result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name, conditionalHeaders={ 'If-None-Match': '"v1"' })
+
+        self.assertTrue(result.is_not_modified())
+        self.assertFalse(result.succeeded())
+        self.assertEqual(result.entityTag, '"v2"')
+        self.assertEqual(self.server.requestHeaders[0]['If-None-Match'], '"v1"')
+        self.assertEqual(self.get_leftover_files(), [])
+
+    def test_not_modified_response_to_unconditional_request_is_failure(self):
+        self.server.responses = [ content_response(b'', 304) ]
+
+        for conditionalHeaders in (None, {}):
+            result = download_resource(self.session, self.server.get_url('/mod.jar'), self.directory.name, conditionalHeaders=conditionalHeaders)
+
+            self.assertFalse(result.is_not_modified())
+            self.assertFalse(result.succeeded())
+            self.assertEqual(result.statusCode, 304)
+            self.assertEqual(self.get_leftover_files(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+from file import PlacementMethod, atomic_write, place_file
+import os
+import stat
+import tempfile
+import unittest
+
+
+class TestPlaceFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sourcePath = os.path.join(self.directory.name, 'source.jar')
+        with open(self.sourcePath, 'wb') as sourceFile:
+            sourceFile.write(b'resource' * 1024)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hardlink_is_preferred(self):
+        destinationPath = os.path.join(self.directory.name, 'destination.jar')
+
+        self.assertEqual(place_file(self.sourcePath, destinationPath), PlacementMethod.HARDLINK)
+        self.assertTrue(os.path.samefile(self.sourcePath, destinationPath))
+        self.assertEqual(place_file(self.sourcePath, destinationPath), PlacementMethod.HARDLINK)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), [ 'destination.jar', 'source.jar' ])
+
+    def test_copy_replaces_hardlink_when_hardlinks_are_not_allowed(self):
+        destinationPath = os.path.join(self.directory.name, 'destination.jar')
+        os.link(self.sourcePath, destinationPath)
+
+        placementMethod = place_file(self.sourcePath, destinationPath, False)
+
+        self.assertIn(placementMethod, [ PlacementMethod.REFLINK, PlacementMethod.COPY_RANGE, PlacementMethod.COPY ])
+        self.assertFalse(os.path.samefile(self.sourcePath, destinationPath))
+        with open(destinationPath, 'rb') as destinationFile:
+            self.assertEqual(destinationFile.read(), b'resource' * 1024)
+
+    def test_leftover_temporary_file_is_replaced(self):
+        destinationPath = os.path.join(self.directory.name, 'destination.jar')
+        with open(os.path.join(self.directory.name, '.bonclok-place-destination.jar'), 'wb') as leftoverFile:
+            leftoverFile.write(b'interrupted')
+
+        self.assertIsNotNone(place_file(self.sourcePath, destinationPath, False))
+        self.assertEqual(sorted(os.listdir(self.directory.name)), [ 'destination.jar', 'source.jar' ])
+
+        self.assertIsNone(place_file(os.path.join(self.directory.name, 'missing.jar'), destinationPath, False))
+        self.assertEqual(sorted(os.listdir(self.directory.name)), [ 'destination.jar', 'source.jar' ])
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.targetPath = os.path.join(self.directory.name, 'target.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_written_file_has_default_permissions(self):
+        umask = os.umask(0o022)
+        os.umask(umask)
+
+        with atomic_write(self.targetPath, 'w') as targetFile:
+            targetFile.write('{}')
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.targetPath).st_mode), 0o666 & ~umask)
+        self.assertEqual(os.listdir(self.directory.name), [ 'target.json' ])
+
+    def test_failed_write_keeps_target(self):
+        with open(self.targetPath, 'w') as targetFile:
+            targetFile.write('previous')
+
+        with self.assertRaises(ValueError):
+            with atomic_write(self.targetPath, 'w') as targetFile:
+                targetFile.write('partial')
+                raise ValueError()
+
+        with open(self.targetPath, 'r') as targetFile:
+            self.assertEqual(targetFile.read(), 'previous')
+        self.assertEqual(os.listdir(self.directory.name), [ 'target.json' ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+from instrumentation import BuildTrace
+import json
+import os
+import tempfile
+import unittest
+
+
+class TestBuildTrace(unittest.TestCase):
+    def setUp(self):
+        self.trace = BuildTrace()
+        self.trace.record('download', 'first', 2.0, 4 * 1024 * 1024, host='mirror:80', statusCode=200)
+        self.trace.record('download', 'second', 1.0, 1024 * 1024, host='primary:80', statusCode=200)
+        self.trace.record('hash', 'first', 0.5, 4 * 1024 * 1024)
+        self.trace.record('target', 'client', 4.0)
+
+    def test_phase_and_host_summaries(self):
+        phaseSummary = self.trace.get_phase_summary()
+        self.assertEqual(phaseSummary['download'], { 'count': 2, 'duration': 3.0, 'bytes': 5 * 1024 * 1024, 'throughput': 5 * 1024 * 1024 / 3.0 })
+        self.assertIsNone(phaseSummary['target']['throughput'])
+
+        hostSummary = self.trace.get_host_summary()
+        self.assertEqual(sorted(hostSummary), [ 'mirror:80', 'primary:80' ])
+        self.assertEqual(hostSummary['mirror:80']['throughput'], 2 * 1024 * 1024)
+
+    def test_slowest_events_exclude_aggregate_phases(self):
+        self.assertEqual([ (event.phase, event.subject) for event in self.trace.get_slowest_events(2) ], [ ('download', 'first'), ('download', 'second') ])
+
+        lines = self.trace.format_summary_table()
+        self.assertTrue(lines[0].startswith('Phase'))
+        self.assertIn('Slowest operations:', lines)
+
+    def test_measure_and_extend(self):
+        with self.trace.measure('fetch', 'third', outcome='linked') as event:
+            event.bytes = 10
+
+        batchTrace = BuildTrace()
+        batchTrace.extend(self.trace, modpack='pack')
+
+        self.assertEqual(len(batchTrace.events), 5)
+        self.assertTrue(all(event.attributes['modpack'] == 'pack' for event in batchTrace.events))
+        self.assertEqual(batchTrace.events[-1].attributes, { 'outcome': 'linked', 'modpack': 'pack' })
+
+    def test_save_writes_json_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            traceFilePath = os.path.join(directory, 'trace.json')
+            self.assertTrue(self.trace.save(traceFilePath))
+            self.assertFalse(self.trace.save(os.path.join(directory, 'missing', 'trace.json')))
+
+            with open(traceFilePath, 'r') as traceFile:
+                trace = json.load(traceFile)
+
+            self.assertEqual(os.listdir(directory), [ 'trace.json' ])
+
+        self.assertEqual(len(trace['events']), 4)
+        self.assertEqual([ event['start'] for event in trace['events'] ], sorted(event['start'] for event in trace['events']))
+        self.assertEqual(trace['phases']['download']['count'], 2)
+        self.assertEqual(trace['hosts']['primary:80']['bytes'], 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
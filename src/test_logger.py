@@ -0,0 +1,38 @@
+from logger import Logger
+import io
+import unittest
+
+
+# Argument recording every time it is formatted into a message
+class FormatCounter():
+    def __init__(self):
+        self.formatCount = 0
+
+    def __format__(self, formatSpec: str) -> str:
+        self.formatCount += 1
+        return 'counter'
+
+
+class TestLogger(unittest.TestCase):
+    def test_disabled_verbose_logging_does_not_format_message(self):
+        stream = io.StringIO()
+        argument = FormatCounter()
+
+        Logger(stream, False).log_verbose("Resource: {} downloaded.", argument)
+
+        self.assertEqual(argument.formatCount, 0)
+        self.assertEqual(stream.getvalue(), '')
+
+    def test_verbose_logging_formats_message(self):
+        stream = io.StringIO()
+        argument = FormatCounter()
+
+        Logger(stream, True).log_verbose("Resource: {} downloaded.", argument)
+        Logger(stream, True).log_verbose("Braces {} are kept without arguments.")
+
+        self.assertEqual(argument.formatCount, 1)
+        self.assertEqual(stream.getvalue().splitlines(), [ "[ ℹ️ ] Resource: counter downloaded.", "[ ℹ️ ] Braces {} are kept without arguments." ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,64 @@
-from main import hello_world, one
+from main import apply_default_arguments, create_argument_parser, validate_modpack_files
+from benchmark import create_argument_parser as create_benchmark_argument_parser, generate_modpack
+from download import DEFAULT_DOWNLOAD_RETRIES
+from logger import Logger
+import contextlib
+import io
+import os
+import tempfile
 import unittest
 
 
-class TestMain(unittest.TestCase):
-    def test_hello_world(self):
-        self.assertEqual(hello_world(),
-                         "Hello world!")
+class TestArgumentParser(unittest.TestCase):
+    def test_unspecified_flags_get_builder_defaults(self):
+        args = create_argument_parser().parse_args([ '-m', 'pack.json' ])
+        self.assertEqual((args.jobs, args.retries), (None, None))
 
-    def test_one(self):
-        self.assertEqual(one(),  1)
+        apply_default_arguments(args)
+
+        self.assertEqual(args.modpackPaths, [ 'pack.json' ])
+        self.assertEqual(args.installMode, 'update')
+        self.assertEqual(args.retries, DEFAULT_DOWNLOAD_RETRIES)
+        self.assertGreater(args.jobs, 0)
+        self.assertFalse(args.force or args.clean or args.packToZip or args.noCache)
+
+    def test_specified_flags_are_kept(self):
+        args = create_argument_parser().parse_args([ '-m', 'first.json', '--modpack', 'second.json', '-j', '3', '--retries', '0', '--install-mode', 'mirror', '-z', '--no-cache' ])
+        apply_default_arguments(args)
+
+        self.assertEqual(args.modpackPaths, [ 'first.json', 'second.json' ])
+        self.assertEqual((args.jobs, args.retries, args.installMode), (3, 0, 'mirror'))
+        self.assertTrue(args.packToZip and args.noCache)
+
+    def test_invalid_flag_values_are_rejected(self):
+        parser = create_argument_parser()
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                parser.parse_args([ '--install-mode', 'replace' ])
+            with self.assertRaises(SystemExit):
+                parser.parse_args([ '--jobs', 'many' ])
+
+
+class TestValidateModpackFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        arguments = create_benchmark_argument_parser().parse_args([ '--mods', '2' ])
+        self.modpackFilePath, _ = generate_modpack(self.directory.name, 'http://127.0.0.1:1', arguments)
+
+        self.invalidFilePath = os.path.join(self.directory.name, 'invalid.json')
+        with open(self.invalidFilePath, 'w') as invalidFile:
+            invalidFile.write('{ "name": ')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_all_files_are_validated(self):
+        logStream = io.StringIO()
+        logger = Logger(logStream, False)
+
+        self.assertTrue(validate_modpack_files([ self.modpackFilePath ], logger))
+        self.assertFalse(validate_modpack_files([ self.invalidFilePath, self.modpackFilePath ], logger))
+        self.assertIn(self.invalidFilePath, logStream.getvalue())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,144 @@
+from models import ModelValidationException, Modpack, read_field
+import unittest
+
+
+def create_modpack_dictionary():
+    return {
+        'name': 'Modpack',
+        'version': '1.0',
+        'api': { 'name': 'Api', 'checksum': 'aa', 'resourceUrl': 'http://localhost/api.jar', 'sourceUrl': 'http://localhost' },
+        'mods': [
+            { 'name': 'Mod', 'checksum': 'bb', 'resourceUrl': 'http://localhost/mod.jar', 'sourceUrl': 'http://localhost', 'includeClient': True, 'includeServer': False, 'configFiles': [ { 'sourcePath': 'a.toml', 'destinationPath': 'config/a.toml' } ] }
+        ]
+    }
+
+
+class TestModpack(unittest.TestCase):
+    def test_from_dict_creates_records(self):
+        modpack = Modpack.from_dict(create_modpack_dictionary())
+
+        self.assertEqual(modpack.mods[0].get_resource_urls(), [ 'http://localhost/mod.jar' ])
+        self.assertEqual(modpack.mods[0].configFiles[0].destinationPath, 'config/a.toml')
+        self.assertIsNone(modpack.installation)
+
+    def test_from_dict_reports_invalid_mod_field(self):
+        modpackDictionary = create_modpack_dictionary()
+        modpackDictionary['mods'][0]['includeClient'] = 'sometimes'
+
+        with self.assertRaises(ModelValidationException) as context:
+            Modpack.from_dict(modpackDictionary)
+
+        self.assertEqual(context.exception.message, "mods[0]: the field: includeClient must be of the boolean type.")
+
+    def test_from_dict_coerces_values_like_previous_models(self):
+        modpackDictionary = create_modpack_dictionary()
+        modpackDictionary['name'] = 2024
+        modpackDictionary['version'] = 1.2
+        modpackDictionary['mods'][0]['includeClient'] = 'false'
+        modpackDictionary['mods'][0]['includeServer'] = 1
+        modpackDictionary['mods'][0]['mirrorUrls'] = [ 'http://mirror/mod.jar', 7 ]
+
+        modpack = Modpack.from_dict(modpackDictionary)
+
+        self.assertEqual((modpack.name, modpack.version), ('2024', '1.2'))
+        self.assertIs(modpack.mods[0].includeClient, False)
+        self.assertIs(modpack.mods[0].includeServer, True)
+        self.assertEqual(modpack.mods[0].mirrorUrls, [ 'http://mirror/mod.jar', '7' ])
+
+    def test_from_dict_rejects_values_which_can_not_be_coerced(self):
+        for fieldName, value, typeName in [ ('includeClient', 2, 'boolean'), ('includeServer', 'sometimes', 'boolean'), ('name', [ 'Mod' ], 'string'), ('checksum', { 'sha256': 'bb' }, 'string') ]:
+            modpackDictionary = create_modpack_dictionary()
+            modpackDictionary['mods'][0][fieldName] = value
+
+            with self.assertRaises(ModelValidationException) as context:
+                Modpack.from_dict(modpackDictionary)
+
+            self.assertEqual(context.exception.message, "mods[0]: the field: {} must be of the {} type.".format(fieldName, typeName))
+
+    def test_from_dict_reads_optional_mirror_urls(self):
+        modpackDictionary = create_modpack_dictionary()
+        modpackDictionary['api']['mirrorUrls'] = None
+        modpackDictionary['mods'][0]['mirrorUrls'] = []
+
+        modpack = Modpack.from_dict(modpackDictionary)
+
+        self.assertIsNone(modpack.api.mirrorUrls)
+        self.assertEqual(modpack.api.get_resource_urls(), [ 'http://localhost/api.jar' ])
+        self.assertEqual(modpack.mods[0].mirrorUrls, [])
+        self.assertEqual(modpack.mods[0].get_resource_urls(), [ 'http://localhost/mod.jar' ])
+
+    def test_from_dict_rejects_invalid_mirror_urls(self):
+        for mirrorUrls, message in [ ('http://mirror/mod.jar', "mods[0]: the field: mirrorUrls must be of the array type."), ([ 'http://mirror/mod.jar', { 'url': 'http://mirror' } ], "mods[0].mirrorUrls[1]: the value must be of the string type.") ]:
+            modpackDictionary = create_modpack_dictionary()
+            modpackDictionary['mods'][0]['mirrorUrls'] = mirrorUrls
+
+            with self.assertRaises(ModelValidationException) as context:
+                Modpack.from_dict(modpackDictionary)
+
+            self.assertEqual(context.exception.message, message)
+
+    def test_from_dict_ignores_extra_fields(self):
+        modpackDictionary = create_modpack_dictionary()
+        modpackDictionary['description'] = { 'text': 'Modpack' }
+        modpackDictionary['mods'][0]['author'] = [ 'Author' ]
+
+        modpack = Modpack.from_dict(modpackDictionary)
+
+        self.assertEqual(modpack.mods[0].name, 'Mod')
+        self.assertFalse(hasattr(modpack.mods[0], 'author'))
+
+    def test_from_dict_rejects_missing_fields_and_invalid_objects(self):
+        modpackDictionary = create_modpack_dictionary()
+        del modpackDictionary['mods'][0]['checksum']
+        with self.assertRaises(ModelValidationException) as context:
+            Modpack.from_dict(modpackDictionary)
+        self.assertEqual(context.exception.message, "mods[0]: the field: checksum is required.")
+
+        modpackDictionary = create_modpack_dictionary()
+        modpackDictionary['mods'][0] = 'Mod'
+        with self.assertRaises(ModelValidationException) as context:
+            Modpack.from_dict(modpackDictionary)
+        self.assertEqual(context.exception.message, "mods[0]: the value must be an object.")
+
+        modpackDictionary = create_modpack_dictionary()
+        modpackDictionary['api'] = [ 'Api' ]
+        with self.assertRaises(ModelValidationException) as context:
+            Modpack.from_dict(modpackDictionary)
+        self.assertEqual(context.exception.message, "modpack: the field: api must be of the object type.")
+
+
+class TestReadField(unittest.TestCase):
+    def test_coerces_boolean_values(self):
+        for value, expectedValue in [ ('true', True), ('YES', True), (' on ', True), ('t', True), ('y', True), ('1', True), (1, True), (1.0, True), ('false', False), ('No', False), ('off', False), ('f', False), ('n', False), ('0', False), (0, False) ]:
+            self.assertIs(read_field({ 'value': value }, 'value', bool, 'test'), expectedValue, value)
+
+    def test_coerces_integer_values(self):
+        for value, expectedValue in [ ('12', 12), (' 12 ', 12), ('-3', -3), (12.7, 12), (True, 1) ]:
+            coercedValue = read_field({ 'value': value }, 'value', int, 'test')
+
+            self.assertEqual(coercedValue, expectedValue, value)
+            self.assertIs(type(coercedValue), int)
+
+    def test_coerces_numbers_to_strings(self):
+        self.assertEqual(read_field({ 'value': 12 }, 'value', str, 'test'), '12')
+        self.assertEqual(read_field({ 'value': 1.5 }, 'value', str, 'test'), '1.5')
+
+    def test_rejects_values_which_can_not_be_coerced(self):
+        for value, fieldType, typeName in [ ('twelve', int, 'integer'), ('1.5', int, 'integer'), (float('inf'), int, 'integer'), ([ 12 ], int, 'integer'), ('maybe', bool, 'boolean'), (2, bool, 'boolean'), ([ True ], bool, 'boolean'), ({ 'value': 'a' }, str, 'string'), ([ 'a' ], str, 'string'), ('a', list, 'array'), (1, dict, 'object') ]:
+            with self.assertRaises(ModelValidationException) as context:
+                read_field({ 'value': value }, 'value', fieldType, 'test')
+
+            self.assertEqual(context.exception.message, "test: the field: value must be of the {} type.".format(typeName))
+
+    def test_reads_missing_fields(self):
+        self.assertIsNone(read_field({ 'value': None }, 'value', str, 'test', False))
+        self.assertIsNone(read_field({}, 'value', int, 'test', False))
+
+        with self.assertRaises(ModelValidationException) as context:
+            read_field({}, 'value', int, 'test')
+
+        self.assertEqual(context.exception.message, "test: the field: value is required.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+from registry import ResourceRegistry
+import threading
+import unittest
+
+
+class TestResourceRegistry(unittest.TestCase):
+    def test_claim_returns_registered_path(self):
+        registry = ResourceRegistry()
+
+        self.assertIsNone(registry.claim('checksum'))
+        registry.register('checksum', 'mods/a.jar')
+
+        self.assertEqual(registry.claim('checksum'), 'mods/a.jar')
+
+    def test_waiting_worker_takes_over_released_resource(self):
+        registry = ResourceRegistry()
+        self.assertIsNone(registry.claim('checksum'))
+
+        claimedPaths = []
+        waitingWorker = threading.Thread(target=lambda: claimedPaths.append(registry.claim('checksum')))
+        waitingWorker.start()
+
+        registry.release('checksum')
+        waitingWorker.join(5)
+
+        self.assertEqual(claimedPaths, [ None ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+from scheduler import HostLimiter, ScheduledTransfer, TransferScheduler, estimate_transfer_duration, order_transfers
+import unittest
+
+
+class TestTransferScheduling(unittest.TestCase):
+    def test_order_starts_with_largest_transfers(self):
+        transfers = [
+            ScheduledTransfer('small', [ 'http://a/small.jar' ], size=10),
+            ScheduledTransfer('unknown', [ 'http://a/unknown.jar' ]),
+            ScheduledTransfer('large', [ 'http://a/large.jar' ], size=1000),
+            ScheduledTransfer('medium', [ 'http://a/medium.jar' ], size=100),
+        ]
+
+        self.assertEqual([ transfer.name for transfer in order_transfers(transfers) ], [ 'unknown', 'large', 'medium', 'small' ])
+
+    def test_estimate_shares_bandwidth_between_running_transfers(self):
+        transfers = [ ScheduledTransfer(str(size), [ 'http://a/' ], size=size) for size in (300, 100, 100) ]
+
+        self.assertAlmostEqual(estimate_transfer_duration(transfers, 2, 100.0), 5.0)
+        self.assertAlmostEqual(estimate_transfer_duration(transfers, 1, 100.0), 5.0)
+        self.assertAlmostEqual(estimate_transfer_duration([ ScheduledTransfer('unknown', [ 'http://a/' ]) ], 2, 100.0), 0.0)
+
+    def test_scheduler_skips_saturated_hosts(self):
+        transfers = [
+            ScheduledTransfer('a-large', [ 'http://a/large.jar' ], size=1000),
+            ScheduledTransfer('a-medium', [ 'http://a/medium.jar' ], size=100),
+            ScheduledTransfer('b-small', [ 'http://b/small.jar' ], size=10),
+        ]
+        scheduler = TransferScheduler(transfers, HostLimiter(1))
+
+        first = scheduler.acquire()
+        second = scheduler.acquire()
+        self.assertEqual((first.name, second.name), ('a-large', 'b-small'))
+
+        scheduler.release(first)
+        self.assertEqual(scheduler.acquire().name, 'a-medium')
+        self.assertIsNone(scheduler.acquire())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from serve import PACK_INDEX_PATH, PackIndex, PackServer, parse_byte_range, parse_serve_address
+from logger import Logger
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+
+class TestPackServer(unittest.TestCase):
+    def setUp(self):
+        self.temporaryDirectory = tempfile.TemporaryDirectory()
+        self.buildDirectory = self.temporaryDirectory.name
+        self.jarContent = bytes(range(256)) * 40
+        self.configContent = b'enabled = true\n' * 100
+        self.create_file('mods/mod.jar', self.jarContent)
+        self.create_file('config/mod.toml', self.configContent)
+
+        self.server = PackServer(('127.0.0.1', 0), PackIndex(self.buildDirectory, 1), Logger(io.StringIO(), False), 4)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temporaryDirectory.cleanup()
+
+    def create_file(self, relativePath: str, content: bytes) -> None:
+        filePath = os.path.join(self.buildDirectory, relativePath)
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        with open(filePath, 'wb') as targetFile:
+            targetFile.write(content)
+
+    def request(self, path: str, headers: dict = {}) -> tuple[int, dict, bytes]:
+        try:
+            with urlopen(Request(self.server.get_base_url() + path, headers=headers)) as response:
+                return response.status, response.headers, response.read()
+        except HTTPError as error:
+            return error.code, error.headers, error.read()
+
+    def test_index_lists_file_checksums(self):
+        statusCode, _, content = self.request(PACK_INDEX_PATH)
+
+        self.assertEqual(statusCode, 200)
+        self.assertEqual(json.loads(content)['files']['mods/mod.jar'], { 'checksum': hashlib.sha256(self.jarContent).hexdigest(), 'size': len(self.jarContent) })
+
+    def test_conditional_request_returns_not_modified(self):
+        statusCode, headers, content = self.request('/mods/mod.jar')
+        self.assertEqual((statusCode, content), (200, self.jarContent))
+        self.assertEqual(headers['ETag'], '"{}"'.format(hashlib.sha256(self.jarContent).hexdigest()))
+
+        statusCode, _, content = self.request('/mods/mod.jar', { 'If-None-Match': headers['ETag'] })
+        self.assertEqual((statusCode, content), (304, b''))
+
+    def test_range_request_returns_partial_content(self):
+        statusCode, headers, content = self.request('/mods/mod.jar', { 'Range': 'bytes=100-199' })
+        self.assertEqual((statusCode, content), (206, self.jarContent[100:200]))
+        self.assertEqual(headers['Content-Range'], 'bytes 100-199/{}'.format(len(self.jarContent)))
+
+        statusCode, _, content = self.request('/mods/mod.jar', { 'Range': 'bytes=100-', 'If-Range': '"outdated"' })
+        self.assertEqual((statusCode, content), (200, self.jarContent))
+
+        statusCode, _, _ = self.request('/mods/mod.jar', { 'Range': 'bytes={}-'.format(len(self.jarContent)) })
+        self.assertEqual(statusCode, 416)
+
+    def test_text_configs_are_compressed(self):
+        statusCode, headers, content = self.request('/config/mod.toml', { 'Accept-Encoding': 'gzip' })
+        self.assertEqual((statusCode, headers['Content-Encoding']), (200, 'gzip'))
+        self.assertEqual(gzip.decompress(content), self.configContent)
+
+        _, headers, _ = self.request('/mods/mod.jar', { 'Accept-Encoding': 'gzip' })
+        self.assertIsNone(headers['Content-Encoding'])
+
+    def test_changed_and_unknown_files(self):
+        self.create_file('mods/mod.jar', b'rebuilt')
+        os.utime(os.path.join(self.buildDirectory, 'mods', 'mod.jar'), ns=(0, 0))
+
+        statusCode, headers, content = self.request('/mods/mod.jar')
+        self.assertEqual((statusCode, content), (200, b'rebuilt'))
+        self.assertEqual(headers['ETag'], '"{}"'.format(hashlib.sha256(b'rebuilt').hexdigest()))
+
+        self.assertEqual(self.request('/../mods/mod.jar')[0], 404)
+        self.assertEqual(self.request('/mods/missing.jar')[0], 404)
+
+    def test_parse_helpers(self):
+        self.assertEqual(parse_byte_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_byte_range('bytes=10-1000', 100), (10, 99))
+        self.assertIsNone(parse_byte_range('bytes=0-1,5-6', 100))
+        self.assertEqual(parse_serve_address('8080'), ('127.0.0.1', 8080))
+        self.assertEqual(parse_serve_address('0.0.0.0:80'), ('0.0.0.0', 80))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+from sync import SyncMode, SyncOptions, synchronize
+import os
+import tempfile
+import unittest
+
+
+class TestSynchronize(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sourceDirectory = os.path.join(self.directory.name, 'build')
+        self.destinationDirectory = os.path.join(self.directory.name, 'game')
+        self.create_file(self.sourceDirectory, 'mods/mod.jar', b'mod')
+        self.create_file(self.sourceDirectory, 'config/mod.toml', b'value = 1\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_file(self, directory: str, relativePath: str, content: bytes) -> str:
+        filePath = os.path.join(directory, relativePath)
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        with open(filePath, 'wb') as targetFile:
+            targetFile.write(content)
+        return filePath
+
+    def read_file(self, directory: str, relativePath: str) -> bytes:
+        with open(os.path.join(directory, relativePath), 'rb') as targetFile:
+            return targetFile.read()
+
+    def synchronize(self, mode: SyncMode):
+        return synchronize(self.sourceDirectory, self.destinationDirectory, SyncOptions(mode, False, False, 2))
+
+    def test_update_copies_changed_files_and_keeps_extra_files(self):
+        self.synchronize(SyncMode.UPDATE)
+        self.create_file(self.sourceDirectory, 'config/mod.toml', b'value = 2\n')
+        self.create_file(self.destinationDirectory, 'saves/world.dat', b'world')
+
+        result = self.synchronize(SyncMode.UPDATE)
+
+        self.assertEqual((result.copiedCount, result.skippedCount, result.removedCount), (1, 1, 0))
+        self.assertEqual(self.read_file(self.destinationDirectory, 'config/mod.toml'), b'value = 2\n')
+        self.assertEqual(self.read_file(self.destinationDirectory, 'saves/world.dat'), b'world')
+
+    def test_mirror_removes_only_files_absent_from_the_build(self):
+        self.synchronize(SyncMode.MIRROR)
+        os.remove(os.path.join(self.sourceDirectory, 'mods', 'mod.jar'))
+        self.create_file(self.destinationDirectory, 'mods/removed/old.jar', b'old')
+
+        result = self.synchronize(SyncMode.MIRROR)
+
+        self.assertEqual((result.copiedCount, result.skippedCount, result.removedCount), (0, 1, 2))
+        self.assertEqual(os.listdir(os.path.join(self.destinationDirectory, 'mods')), [])
+        self.assertEqual(self.read_file(self.destinationDirectory, 'config/mod.toml'), b'value = 1\n')
+
+    def test_builder_internal_files_are_not_installed(self):
+        self.create_file(self.sourceDirectory, '.bonclok-manifest.json', b'{}')
+
+        result = self.synchronize(SyncMode.UPDATE)
+        self.assertEqual(result.copiedCount, 2)
+        self.assertEqual(sorted(os.listdir(self.destinationDirectory)), [ 'config', 'mods' ])
+
+        # NOTE: The manifest installed by the previous versions is removed by the mirror mode
+        self.create_file(self.destinationDirectory, '.bonclok-manifest.json', b'{}')
+        result = self.synchronize(SyncMode.MIRROR)
+        self.assertEqual(result.removedCount, 1)
+        self.assertEqual(sorted(os.listdir(self.destinationDirectory)), [ 'config', 'mods' ])
+
+    def test_mirror_never_touches_paths_outside_the_destination(self):
+        outsideDirectory = os.path.join(self.directory.name, 'outside')
+        siblingDirectory = self.destinationDirectory + '-backup'
+        self.create_file(outsideDirectory, 'mods/user.jar', b'user')
+        self.create_file(siblingDirectory, 'mods/backup.jar', b'backup')
+        os.makedirs(self.destinationDirectory)
+        os.symlink(outsideDirectory, os.path.join(self.destinationDirectory, 'linked'))
+        os.symlink(os.path.join(outsideDirectory, 'mods', 'user.jar'), os.path.join(self.destinationDirectory, 'user.jar'))
+
+        result = self.synchronize(SyncMode.MIRROR)
+
+        self.assertEqual(result.removedCount, 2)
+        self.assertEqual(sorted(os.listdir(self.destinationDirectory)), [ 'config', 'mods' ])
+        self.assertEqual(self.read_file(outsideDirectory, 'mods/user.jar'), b'user')
+        self.assertEqual(self.read_file(siblingDirectory, 'mods/backup.jar'), b'backup')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+from verify import VERIFY_MMAP_THRESHOLD, verify_build_directory
+import hashlib
+import os
+import tempfile
+import unittest
+
+
+class TestVerifyBuildDirectory(unittest.TestCase):
+    def setUp(self):
+        self.temporaryDirectory = tempfile.TemporaryDirectory()
+        self.buildDirectory = self.temporaryDirectory.name
+        os.mkdir(os.path.join(self.buildDirectory, 'mods'))
+
+    def tearDown(self):
+        self.temporaryDirectory.cleanup()
+
+    def create_file(self, relativePath: str, content: bytes) -> str:
+        with open(os.path.join(self.buildDirectory, relativePath), 'wb') as targetFile:
+            targetFile.write(content)
+
+        return hashlib.sha256(content).hexdigest()
+
+    def test_valid_build(self):
+        largeContent = os.urandom(VERIFY_MMAP_THRESHOLD + 1)
+        expectedFiles = {
+            'api.jar': self.create_file('api.jar', b'api'),
+            'mods/large.jar': self.create_file('mods/large.jar', largeContent),
+            'mods/empty.jar': self.create_file('mods/empty.jar', b''),
+        }
+        self.create_file('.bonclok-manifest.json', b'{}')
+
+        result = verify_build_directory(self.buildDirectory, expectedFiles, jobs=2)
+
+        self.assertTrue(result.is_valid())
+        self.assertEqual(result.verifiedCount, 3)
+        self.assertEqual(result.verifiedBytes, len(largeContent) + 3)
+
+    def test_reports_missing_extra_and_corrupted_files(self):
+        expectedFiles = {
+            'mods/a.jar': self.create_file('mods/a.jar', b'a'),
+            'mods/b.jar': hashlib.sha256(b'b').hexdigest(),
+            'config/c.yaml': None,
+        }
+        self.create_file('mods/a.jar', b'corrupted')
+        self.create_file('mods/extra.jar', b'extra')
+
+        result = verify_build_directory(self.buildDirectory, expectedFiles, jobs=1)
+
+        self.assertFalse(result.is_valid())
+        self.assertEqual(result.corruptedFiles, [ 'mods/a.jar' ])
+        self.assertEqual(result.missingFiles, [ 'config/c.yaml', 'mods/b.jar' ])
+        self.assertEqual(result.extraFiles, [ 'mods/extra.jar' ])
+
+
+if __name__ == '__main__':
+    unittest.main()
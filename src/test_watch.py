@@ -0,0 +1,63 @@
+from test_builder import BuilderTestCase
+from unittest import mock
+from watch import ModpackWatcher
+from logger import Logger
+import io
+import os
+import unittest
+
+
+class TestModpackWatcher(BuilderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.builder = self.create_builder()
+        self.builder.build()
+
+        # NOTE: The poll loop is driven directly, the snapshot is taken the same way the watch loop does before its first check
+        self.watcher = ModpackWatcher(self.builder, Logger(io.StringIO(), False))
+        self.watcher.fileStates = self.watcher._take_snapshot()
+
+    def write_file(self, filePath: str, content: str) -> None:
+        with open(filePath, 'w') as targetFile:
+            targetFile.write(content)
+
+    def poll(self) -> set[str]:
+        changedFilePaths = self.watcher._get_changed_files()
+        if len(changedFilePaths) > 0:
+            self.watcher.apply_changes(changedFilePaths)
+
+        return changedFilePaths
+
+    def test_config_source_change_only_updates_config_files(self):
+        sourcePath = os.path.join(self.directory.name, 'configs', 'mod-0', 'config-0.toml')
+        self.write_file(sourcePath, 'edited = true\n')
+        requestCount = self.server.requestCount
+
+        with mock.patch.object(self.builder, 'update_config_files', wraps=self.builder.update_config_files) as updateConfigFiles, mock.patch.object(self.builder, 'build') as build, mock.patch.object(self.builder, 'reload') as reload:
+            self.assertEqual(self.poll(), { sourcePath })
+
+        updateConfigFiles.assert_called_once_with({ sourcePath })
+        build.assert_not_called()
+        reload.assert_not_called()
+        self.assertEqual(self.server.requestCount, requestCount)
+        with open(os.path.join(self.buildDirectory, 'config', 'mod-0', 'config-0.toml'), 'r') as configFile:
+            self.assertEqual(configFile.read(), 'edited = true\n')
+
+        self.assertEqual(self.poll(), set())
+
+    def test_modpack_change_reloads_and_builds_incrementally(self):
+        self.update_modpack(lambda modpack: modpack['mods'].pop(0))
+        requestCount = self.server.requestCount
+
+        with mock.patch.object(self.builder, 'update_config_files') as updateConfigFiles:
+            self.assertIn(self.watcher.modpackFilePath, self.poll())
+
+        updateConfigFiles.assert_not_called()
+        self.assertEqual(len(self.builder.modpackData.mods), 3)
+        self.assertEqual(self.server.requestCount, requestCount)
+        self.assertFalse(os.path.exists(os.path.join(self.buildDirectory, 'mods', 'mod-0.jar')))
+        self.assertNotIn(os.path.join(self.directory.name, 'configs', 'mod-0', 'config-0.toml'), self.watcher.fileStates)
+
+
+if __name__ == '__main__':
+    unittest.main()
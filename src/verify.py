@@ -0,0 +1,119 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import mmap
+import os
+import time
+from typing import Optional
+
+# The prefix of the builder internal files (manifest, temporary files) which are not part of the verified build
+VERIFY_EXCLUDED_FILE_PREFIX = '.bonclok-'
+
+# The files smaller than this size are read into memory, the larger files are hashed through a memory map
+VERIFY_MMAP_THRESHOLD = 1024 * 1024
+
+# The size of the chunks in which the small files are read
+VERIFY_READ_CHUNK_SIZE = 1024 * 1024
+
+# Exception base class implementation used to raise verification related exceptions
+class VerifyException(Exception):
+    def __init__(self, message: str = "Unexpected build verification failure."):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+# Class used to store the result of the build directory verification, the file paths are relative to the build directory
+class VerificationResult():
+    def __init__(self):
+        self.missingFiles: list[str] = []
+        self.extraFiles: list[str] = []
+        self.corruptedFiles: list[str] = []
+        self.verifiedCount = 0
+        self.verifiedBytes = 0
+        self.elapsedTime = 0.0
+
+    # Check if the build directory is matching the expected files
+    def is_valid(self) -> bool:
+        return len(self.missingFiles) == 0 and len(self.extraFiles) == 0 and len(self.corruptedFiles) == 0
+
+# Calculate the SHA-256 checksum of the file, the large files are hashed directly from a read-only memory map, so the content is not copied into the process memory.
+# The function is executed by the worker processes, None is returned as the checksum if the file can not be read.
+def calculate_file_checksum_mapped(filePath: str) -> tuple[Optional[str], int]:
+    try:
+        with open(filePath, 'rb') as targetFile:
+            fileSize = os.fstat(targetFile.fileno()).st_size
+            if fileSize < VERIFY_MMAP_THRESHOLD:
+                sha256 = hashlib.sha256()
+                while True:
+                    chunk = targetFile.read(VERIFY_READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    sha256.update(chunk)
+
+                return sha256.hexdigest(), fileSize
+
+            with mmap.mmap(targetFile.fileno(), 0, access=mmap.ACCESS_READ) as mappedFile:
+                if hasattr(mappedFile, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mappedFile.madvise(mmap.MADV_SEQUENTIAL)
+
+                return hashlib.sha256(mappedFile).hexdigest(), fileSize
+    except (OSError, ValueError):
+        return None, 0
+
+# Calculate the SHA-256 checksums and sizes of the files in parallel using the specified number of worker processes (all cores by default), the results are returned in the order of the file paths
+def calculate_file_checksums(filePaths: list[str], jobs: Optional[int] = None) -> list[tuple[Optional[str], int]]:
+    workersCount = min(jobs if jobs != None else (os.cpu_count() or 1), len(filePaths))
+    if workersCount <= 1:
+        return [ calculate_file_checksum_mapped(filePath) for filePath in filePaths ]
+
+    with ProcessPoolExecutor(max_workers=workersCount) as executor:
+        return list(executor.map(calculate_file_checksum_mapped, filePaths, chunksize=max(1, len(filePaths) // (workersCount * 4))))
+
+# Helper function used to list the files of the build directory relative to it, the builder internal files are skipped
+def collect_build_files(buildDirectory: str) -> set[str]:
+    buildFiles = set()
+    for dirName, _, files in os.walk(buildDirectory):
+        relativeDirName = os.path.relpath(dirName, buildDirectory)
+        for fileName in files:
+            if fileName.startswith(VERIFY_EXCLUDED_FILE_PREFIX):
+                continue
+
+            buildFiles.add(os.path.normpath(os.path.join(relativeDirName, fileName)).replace(os.sep, '/'))
+
+    return buildFiles
+
+# Verify the build directory against the expected files indexed by the path relative to the build directory (using "/" separators).
+# The files with an expected checksum are hashed in parallel by the specified number of worker processes, the files with a None checksum are only required to exist.
+def verify_build_directory(buildDirectory: str, expectedFiles: dict[str, Optional[str]], jobs: Optional[int] = None) -> VerificationResult:
+    if not os.path.isdir(buildDirectory):
+        raise VerifyException("The build directory: {} does not exist.".format(buildDirectory))
+
+    startTime = time.monotonic()
+    result = VerificationResult()
+    buildFiles = collect_build_files(buildDirectory)
+
+    result.missingFiles = sorted(filePath for filePath in expectedFiles if filePath not in buildFiles)
+    result.extraFiles = sorted(filePath for filePath in buildFiles if filePath not in expectedFiles)
+
+    hashedFiles = [ (filePath, checksum) for filePath, checksum in expectedFiles.items() if checksum != None and filePath in buildFiles ]
+    result.verifiedCount = len(expectedFiles) - len(result.missingFiles) - len(hashedFiles)
+
+    # NOTE: The largest files are scheduled first, so a single large file does not extend the verification after the other workers are done
+    hashedFiles.sort(key=lambda item: os.path.getsize(os.path.join(buildDirectory, item[0])), reverse=True)
+    hashedFilePaths = [ os.path.join(buildDirectory, filePath) for filePath, _ in hashedFiles ]
+
+    checksums = calculate_file_checksums(hashedFilePaths, jobs)
+    for (filePath, expectedChecksum), (checksum, fileSize) in zip(hashedFiles, checksums):
+        if checksum == None or checksum != expectedChecksum.strip().lower():
+            result.corruptedFiles.append(filePath)
+        else:
+            result.verifiedCount += 1
+            result.verifiedBytes += fileSize
+
+    result.corruptedFiles.sort()
+    result.elapsedTime = time.monotonic() - startTime
+    return result
+
+__all__ = [ 'VerifyException', 'VerificationResult', 'calculate_file_checksums', 'collect_build_files', 'verify_build_directory' ]
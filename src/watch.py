@@ -0,0 +1,83 @@
+import os
+import time
+from typing import Optional
+
+from logger import Logger
+from builder import ModpackBuilder, ModpackBuilderException
+
+# The default interval (in seconds) between two checks of the watched files
+DEFAULT_WATCH_INTERVAL = 0.5
+
+# Helper function used to get the state of the watched file used to detect changes, None is returned for a missing file
+def get_file_state(filePath: str) -> Optional[tuple[int, int]]:
+    try:
+        fileStat = os.stat(filePath)
+    except OSError:
+        return None
+
+    return (fileStat.st_mtime_ns, fileStat.st_size)
+
+# Class used to watch the modpack file and the config file sources of a built modpack and apply their changes to the build directories.
+# A change of a config file source only copies the affected config files, a change of the modpack file reloads it and runs an incremental build (which fetches only the changed mods).
+class ModpackWatcher():
+    def __init__(self, builder: ModpackBuilder, logger: Logger, interval: float = DEFAULT_WATCH_INTERVAL):
+        if interval <= 0:
+            raise ModpackBuilderException("The watch interval must be greater than zero.")
+
+        self.builder = builder
+        self.logger = logger
+        self.interval = interval
+        self.modpackFilePath = os.path.abspath(builder.modpackFilePath)
+        self.fileStates: dict[str, Optional[tuple[int, int]]] = {}
+
+    # Take the snapshot of the watched files, the list of the config file sources is refreshed from the currently loaded modpack
+    def _take_snapshot(self) -> dict[str, Optional[tuple[int, int]]]:
+        watchedFilePaths = self.builder.get_config_source_paths()
+        watchedFilePaths.add(self.modpackFilePath)
+        return { filePath: get_file_state(filePath) for filePath in watchedFilePaths }
+
+    # Get the watched files which changed since the previous snapshot
+    def _get_changed_files(self) -> set[str]:
+        currentStates = { filePath: get_file_state(filePath) for filePath in self.fileStates }
+        changedFilePaths = set(filePath for filePath, fileState in currentStates.items() if fileState != self.fileStates[filePath])
+        self.fileStates.update(currentStates)
+        return changedFilePaths
+
+    # Apply the changes of the watched files to the build directories, the failures are logged and the watching continues
+    def apply_changes(self, changedFilePaths: set[str]) -> None:
+        startTime = time.monotonic()
+        try:
+            if self.modpackFilePath in changedFilePaths:
+                self.logger.log_info("The modpack file changed, rebuilding the modpack.")
+                self.builder.reload()
+                self.builder.build()
+            else:
+                self.logger.log_info("{} config file sources changed, updating the build.".format(len(changedFilePaths)))
+                self.builder.update_config_files(changedFilePaths)
+        except (ModpackBuilderException, OSError, ValueError) as exception:
+            self.logger.log_error(exception)
+            return
+        finally:
+            # NOTE: The modpack file may have changed the list of the config file sources, the states of the already watched files are kept, so a change made while the previous one was applied is not missed
+            self.fileStates = { filePath: self.fileStates.get(filePath, fileState) for filePath, fileState in self._take_snapshot().items() }
+
+        self.logger.log_success("Changes applied in: {:.3f}s.".format(time.monotonic() - startTime))
+
+    # Watch the files until the process is interrupted
+    def watch(self) -> None:
+        # NOTE: The clean build flag only applies to the initial build, the rebuilds triggered by the changes are always incremental
+        self.builder.options.cleanBuild = False
+
+        self.fileStates = self._take_snapshot()
+        self.logger.log_success("Watching the modpack file and {} config file sources for changes, press Ctrl+C to stop.".format(len(self.fileStates) - 1))
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                changedFilePaths = self._get_changed_files()
+                if len(changedFilePaths) > 0:
+                    self.apply_changes(changedFilePaths)
+        except KeyboardInterrupt:
+            self.logger.log_info("Watching stopped.")
+
+__all__ = [ 'DEFAULT_WATCH_INTERVAL', 'ModpackWatcher' ]